@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASGI服务入口
+与WSGI版本共用品牌数据、模型路由、限流与创作流水线；模拟处理耗时以 asyncio.sleep 等待，
+生成与分析（CPU密集）交给有界线程池执行，等待中的请求只占用一个协程而不占用线程
+
+用法:
+    uvicorn asgi_app:app --port 8080        （需 pip install uvicorn）
+    python serve.py --server uvicorn --workers 2
+
+提供 /api/ai/models、/api/ai/creations（同步、?stream=1、?async=1）、/api/ai/creations/<taskId>
+与 /api/health；其他接口使用WSGI服务。
+模型并发池（AI_MODEL_CONCURRENCY）与按客户端的并发上限仍然生效，压测大量并发时需相应调大
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from urllib.parse import parse_qsl
+
+import enhanced_ai_creation_server as server
+from json_provider import BACKEND, dumps_bytes, make_loads
+from rate_limiter import NO_ADMISSION, client_key
+from task_queue import STATUS_COMPLETED, STATUS_FAILED
+
+# 执行生成与分析的线程数
+ASGI_THREADS = int(os.environ.get("AI_ASGI_THREADS", "4"))
+# 请求体大小上限（字节）
+MAX_BODY_SIZE = int(os.environ.get("AI_ASGI_MAX_BODY", str(1024 * 1024)))
+# 长轮询查询任务状态的间隔秒数
+POLL_INTERVAL = 0.1
+
+_loads = make_loads(BACKEND)
+_executor = None
+
+
+def get_executor():
+    """获取执行生成与分析的线程池（首次使用时创建）"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix="ai-asgi")
+    return _executor
+
+
+async def run_sync(fn, *args, **kwargs):
+    """在线程池中执行同步函数"""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), partial(fn, *args, **kwargs))
+
+
+class _Headers(dict):
+    """按小写名称保存的请求头"""
+
+    def get(self, name, default=None):
+        return dict.get(self, name.lower(), default)
+
+
+class ASGIRequest(object):
+    """请求信息，提供限流 client_key 所需的 headers 与 remote_addr"""
+
+    __slots__ = ("method", "path", "args", "headers", "remote_addr", "body", "creation_labels")
+
+    def __init__(self, scope, body=b""):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        self.headers = _Headers(
+            (name.decode("latin-1").lower(), value.decode("latin-1")) for name, value in scope.get("headers", ())
+        )
+        client = scope.get("client")
+        self.remote_addr = server.forwarded_client_addr(client[0] if client else None,
+                                                        self.headers.get("X-Forwarded-For"))
+        self.body = body
+        # (创作类型, 模型)，用于创作计数指标
+        self.creation_labels = None
+
+    def json(self):
+        """解析JSON请求体，为空或格式无效时返回None"""
+        if not self.body:
+            return None
+        try:
+            return _loads(self.body)
+        except ValueError:
+            return None
+
+
+class _Responder(object):
+    """发送响应，附加跨域头并记录状态码"""
+
+    __slots__ = ("send", "cors_headers", "status")
+
+    def __init__(self, send, request):
+        self.send = send
+        self.status = None
+        self.cors_headers = cors_headers(request.headers.get("Origin"))
+
+    async def start(self, status, headers):
+        self.status = status
+        raw = [(name.lower().encode("latin-1"), str(value).encode("latin-1")) for name, value in headers.items()]
+        await self.send({"type": "http.response.start", "status": status, "headers": raw + self.cors_headers})
+
+    async def body(self, data, more=False):
+        await self.send({"type": "http.response.body", "body": data, "more_body": more})
+
+    async def respond(self, status, headers, data):
+        headers = dict(headers)
+        headers["Content-Length"] = len(data)
+        await self.start(status, headers)
+        await self.body(data)
+
+    async def json(self, obj, status=200, headers=None):
+        body = dumps_bytes(obj)
+        merged = {"Content-Type": "application/json"}
+        merged.update(headers or {})
+        await self.respond(status, merged, body)
+
+
+def cors_headers(origin):
+    """与Flask-CORS一致的跨域响应头"""
+    if not server.cors_origin_allowed(origin):
+        return []
+    return [(b"access-control-allow-origin", origin.encode("latin-1")), (b"vary", b"Origin")]
+
+
+async def read_body(receive):
+    """读取完整请求体，超过上限时返回None"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return b""
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_SIZE:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def watch_disconnect(receive, disconnected):
+    """请求体读完后等待客户端断开，用于提前结束流式输出"""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            disconnected.set()
+            return
+
+
+# 创作流水线（与WSGI版本的 process_ai_creation / stream_ai_creation 对应）
+
+async def process_ai_creation_async(task_id, brand_data, creation_type, ai_model, prompt, seed=None,
+                                    temperature=None, max_tokens=None, avoid_duplicates=False, unique=False):
+    """执行AI创作：优先取用预生成结果，否则与进行中的相同请求合并，
+    生成与分析在线程池中完成，模拟处理耗时在事件循环中等待
+    """
+    result = server.take_pregenerated(
+        task_id, brand_data, creation_type, ai_model, prompt, seed, temperature, max_tokens
+    )
+    if result is not None:
+        server.record_creation(result)
+        return result
+    key = server.creation_flight_key(
+        brand_data, creation_type, ai_model, prompt, seed, temperature, max_tokens, avoid_duplicates, unique
+    )
+    args = (task_id, brand_data, creation_type, ai_model, prompt, seed, temperature, max_tokens, avoid_duplicates)
+    if key is None:
+        result = await run_ai_creation_async(*args)
+    else:
+        result, shared = await server.creation_flights.do_async(key, run_ai_creation_async, *args)
+        if shared:
+            result = server.share_flight_result(result, task_id, creation_type, ai_model)
+    server.record_creation(result)
+    return result
+
+
+async def run_ai_creation_async(task_id, brand_data, creation_type, ai_model, prompt, seed=None,
+                                temperature=None, max_tokens=None, avoid_duplicates=False):
+    # 模型并发池只在生成与分析期间占用，模拟处理耗时在释放槽位后等待
+    async with server.model_router.route(ai_model).async_slot():
+        result, processing_time = await run_sync(
+            server.prepare_ai_creation, task_id, brand_data, creation_type, ai_model, prompt,
+            seed=seed, temperature=temperature, max_tokens=max_tokens, avoid_duplicates=avoid_duplicates
+        )
+    if processing_time and server.SIMULATE_LATENCY:
+        with server.stage_timer("simulated_latency"):
+            await asyncio.sleep(processing_time)
+        result = result.replace(create_time=datetime.now())
+    return result
+
+
+async def stream_ai_creation_async(responder, disconnected, task_id, brand_data, creation_type, ai_model, prompt,
+                                   seed=None, temperature=None, max_tokens=None, avoid_duplicates=False):
+    """以SSE流式输出创作，事件与WSGI版本相同；客户端断开后停止生成"""
+    await responder.start(200, {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await responder.body(server.stream_start_event(task_id, brand_data), more=True)
+    try:
+        async with server.model_router.route(ai_model).async_slot():
+            result, processing_time = await run_sync(
+                server.prepare_ai_creation, task_id, brand_data, creation_type, ai_model, prompt,
+                seed=seed, temperature=temperature, max_tokens=max_tokens, avoid_duplicates=avoid_duplicates
+            )
+        chunks = server.split_content_chunks(result.content)
+        delay = processing_time / len(chunks) if chunks else processing_time
+        for index, chunk in enumerate(chunks):
+            if delay and server.SIMULATE_LATENCY:
+                await asyncio.sleep(delay)
+            if disconnected.is_set():
+                return
+            await responder.body(server.format_sse("content", {"index": index, "text": chunk}), more=True)
+
+        await responder.body(server.stream_result_event(result), more=True)
+    except Exception as e:
+        await responder.body(server.stream_error_event(task_id, e), more=True)
+    await responder.body(server.format_sse("done", {"taskId": task_id}))
+
+
+# 接口
+
+async def get_ai_models(request, responder, receive):
+    """获取AI模型列表"""
+    status, headers, body = server.ai_models_payload().negotiate(
+        request.headers.get("If-None-Match"), request.headers.get("Accept-Encoding"), server.STATIC_MAX_AGE
+    )
+    await responder.respond(status, headers, body)
+
+
+async def health_check(request, responder, receive):
+    """健康检查"""
+    await responder.json(server.health_status())
+
+
+async def create_ai_creation(request, responder, receive):
+    """创建AI内容，参数、校验与响应内容与WSGI版本共用"""
+    admission = NO_ADMISSION
+    handed_off = False
+    try:
+        params = server.parse_creation_request(request.json(), request.args)
+        request.creation_labels = params.metric_labels
+        if server.RATE_LIMIT_ENABLED:
+            # SQLite限流存储会等待文件锁，放到线程池执行
+            key = client_key(request, server.RATE_LIMIT_API_KEYS)
+            admission = await run_sync(server.admit_client, key, params.ai_model)
+        brand_data = server.resolve_creation_brand(params)
+        task_id = server.generate_task_id()
+
+        if params.mode == "async":
+            # 异步任务与WSGI版本共用后台任务队列，结果可由任一服务查询
+            payload = server.submit_creation_task(task_id, brand_data, params, admission)
+            handed_off = True
+            return await responder.json(payload, 202)
+
+        if params.mode == "stream":
+            disconnected = asyncio.Event()
+            watcher = asyncio.ensure_future(watch_disconnect(receive, disconnected))
+            try:
+                await stream_ai_creation_async(
+                    responder, disconnected, task_id, brand_data, params.creation_type, params.ai_model,
+                    params.prompt, **params.generation_kwargs()
+                )
+            finally:
+                watcher.cancel()
+            return
+
+        result = await process_ai_creation_async(
+            task_id, brand_data, params.creation_type, params.ai_model, params.prompt,
+            unique=params.unique, **params.generation_kwargs()
+        )
+        with server.stage_timer("serialization"):
+            body = dumps_bytes(result)
+        await responder.respond(200, {"Content-Type": "application/json"}, body)
+    except Exception as e:
+        if responder.status is not None:
+            raise
+        status, payload, headers = server.creation_error(e)
+        await responder.json(payload, status, headers)
+    finally:
+        if not handed_off and admission is not NO_ADMISSION:
+            await run_sync(admission.release)
+
+
+async def get_ai_creation(request, responder, receive, task_id):
+    """查询异步创作任务，?wait=秒数 时长轮询等待完成（轮询期间不占用线程）"""
+    try:
+        deadline = time.monotonic() + server.parse_task_wait(request.args)
+    except server.CreationRequestError as e:
+        return await responder.json(e.payload, e.status)
+
+    task = server.creation_queue.get(task_id)
+    while task is not None and task["status"] not in (STATUS_COMPLETED, STATUS_FAILED):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(POLL_INTERVAL, remaining))
+        task = server.creation_queue.get(task_id)
+
+    stored = None
+    if task is None and server.creation_store:
+        stored = await run_sync(server.creation_store.get, task_id)
+    status, payload = server.task_status_payload(task_id, task, stored)
+    await responder.json(payload, status)
+
+
+# 路由：路径 -> {方法: 处理函数}，指标的endpoint标签与Flask路由规则一致
+ROUTES = {
+    "/api/ai/models": {"GET": get_ai_models},
+    "/api/ai/creations": {"POST": create_ai_creation},
+    "/api/health": {"GET": health_check},
+}
+TASK_PREFIX = "/api/ai/creations/"
+TASK_RULE = "/api/ai/creations/<task_id>"
+
+
+def match_route(method, path):
+    """返回 (endpoint标签, 处理函数, 路径参数)；路径不存在时处理函数为None，方法不支持时为False"""
+    handlers = ROUTES.get(path)
+    args = ()
+    endpoint = path
+    if handlers is None and path.startswith(TASK_PREFIX) and "/" not in path[len(TASK_PREFIX):]:
+        handlers = {"GET": get_ai_creation}
+        args = (path[len(TASK_PREFIX):],)
+        endpoint = TASK_RULE
+    if handlers is None:
+        return "unmatched", None, ()
+    return endpoint, handlers.get(method, False), args
+
+
+async def handle_http(scope, receive, send):
+    body = await read_body(receive)
+    request = ASGIRequest(scope, body or b"")
+    responder = _Responder(send, request)
+    if body is None:
+        return await responder.json({"error": "请求体过大"}, 413)
+
+    endpoint, handler, args = match_route(request.method, request.path)
+    if request.method == "OPTIONS" and handler is not None:
+        # 跨域预检
+        allow_headers = request.headers.get("Access-Control-Request-Headers", "")
+        headers = {"Access-Control-Allow-Methods": "GET, POST, OPTIONS"}
+        if allow_headers:
+            headers["Access-Control-Allow-Headers"] = allow_headers
+        return await responder.respond(200, headers, b"")
+
+    start = time.perf_counter()
+    server.HTTP_INFLIGHT.inc(endpoint)
+    try:
+        if handler is None:
+            await responder.json({"error": "接口不存在"}, 404)
+        elif handler is False:
+            await responder.json({"error": "请求方法不支持"}, 405)
+        else:
+            await handler(request, responder, receive, *args)
+    finally:
+        server.HTTP_INFLIGHT.dec(endpoint)
+        server.record_http_metrics(request.method, endpoint, responder.status or 500,
+                                   time.perf_counter() - start, request.creation_labels)
+
+
+async def handle_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # 预先序列化静态响应
+            server.create_app()
+            get_executor()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await asyncio.get_running_loop().run_in_executor(None, shutdown)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def shutdown(wait=True):
+    """停止线程池，等待处理中的任务完成"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+    server.shutdown_executors(wait=wait)
+
+
+async def app(scope, receive, send):
+    """ASGI应用"""
+    if scope["type"] == "http":
+        await handle_http(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await handle_lifespan(receive, send)
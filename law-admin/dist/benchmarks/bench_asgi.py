@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASGI并发基准
+在进程内直接调用ASGI应用，同时发起大量同步创作请求（保留模拟处理耗时），
+测量各并发数下的完成耗时、延迟分位数与线程数；再以tracemalloc重跑一轮测量每个在途请求的内存占用
+（tracemalloc会明显拖慢生成，耗时与延迟取自第一轮）
+
+用法: python benchmarks/bench_asgi.py [--levels 100,1000,5000] [--output asgi.json]
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+import tracemalloc
+
+# 关闭模型并发池与历史存储，只测量服务本身的并发能力
+os.environ.setdefault("AI_MODEL_CONCURRENCY", "0")
+os.environ.setdefault("AI_CREATION_DB", "")
+
+from benchutil import CREATION_TYPES, load_server, summarize_latencies, write_results  # noqa: E402
+
+
+def make_bodies(server, count, offset=0):
+    """不同seed的创作请求体，避免命中结果缓存"""
+    return [
+        server.dumps_bytes({"brandId": i % 5 + 1, "creationType": CREATION_TYPES[i % 2], "seed": offset + i})
+        for i in range(count)
+    ]
+
+
+async def call(app, body, latencies, statuses, peak_threads):
+    """发送一次创作请求，记录延迟与状态码"""
+    sent = []
+    delivered = [False]
+    never = asyncio.get_running_loop().create_future()
+
+    async def receive():
+        if not delivered[0]:
+            delivered[0] = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await never
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/api/ai/creations", "query_string": b"",
+        "headers": [(b"content-type", b"application/json")], "client": ("127.0.0.1", 0),
+    }
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    latencies.append(time.perf_counter() - start)
+    statuses[sent[0]["status"]] = statuses.get(sent[0]["status"], 0) + 1
+    peak_threads[0] = max(peak_threads[0], threading.active_count())
+
+
+async def run_level(app, bodies):
+    latencies = []
+    statuses = {}
+    peak_threads = [threading.active_count()]
+    start = time.perf_counter()
+    await asyncio.gather(*(call(app, body, latencies, statuses, peak_threads) for body in bodies))
+    return latencies, time.perf_counter() - start, statuses, peak_threads[0]
+
+
+def peak_memory(app, bodies):
+    """并发处理全部请求期间的Python内存分配峰值（字节）"""
+    tracemalloc.start()
+    asyncio.run(run_level(app, bodies))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASGI并发基准")
+    parser.add_argument("--levels", default="100,1000,5000", help="逗号分隔的并发请求数")
+    parser.add_argument("--output", help="JSON结果文件路径，不指定时输出到标准输出")
+    args = parser.parse_args()
+
+    server = load_server(simulate_latency=True)
+    import asgi_app
+
+    results = []
+    offset = 0
+    for level in [int(x) for x in args.levels.split(",")]:
+        latencies, elapsed, statuses, threads = asyncio.run(run_level(asgi_app.app, make_bodies(server, level, offset)))
+        summary = summarize_latencies(latencies, elapsed)
+        per_request = peak_memory(asgi_app.app, make_bodies(server, level, offset + level)) / 1024.0 / level
+        offset += 2 * level
+        results.append(dict(summary, concurrency=level, statuses=statuses, threads=threads,
+                            peakKiBPerRequest=round(per_request, 2)))
+        print(f"并发 {level:>6}: 耗时 {elapsed:.2f} 秒  p50 {summary['p50Ms']:.0f} ms  p99 {summary['p99Ms']:.0f} ms  "
+              f"线程 {threads}  每请求峰值内存 {per_request:.1f} KiB  状态 {statuses}")
+    asgi_app.shutdown()
+    write_results(args.output, "asgi", results)
+
+
+if __name__ == "__main__":
+    main()
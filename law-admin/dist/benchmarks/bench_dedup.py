@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+近似重复索引基准
+索引中保存大量指纹时单次查找（nearest）的延迟，以及真实创作内容的指纹计算耗时
+
+用法: python benchmarks/bench_dedup.py [--count 1000000] [--queries 20000] [--output dedup.json]
+"""
+
+import argparse
+import random
+import resource
+import time
+
+from benchutil import CREATION_TYPES, load_server, summarize_latencies, time_calls, write_results
+
+import near_duplicates  # noqa: E402
+from near_duplicates import NUM_PERM, NearDuplicateIndex  # noqa: E402
+
+
+def synthetic_signatures(count, rng, family_size=20, mutate=4):
+    """按族生成指纹：每族一个基准指纹与若干只改动少量值的近似指纹"""
+    base = None
+    for i in range(count):
+        if i % family_size == 0:
+            base = [rng.getrandbits(32) for _ in range(NUM_PERM)]
+            yield tuple(base), i // family_size
+            continue
+        sig = list(base)
+        for index in rng.sample(range(NUM_PERM), mutate):
+            sig[index] = rng.getrandbits(32)
+        yield tuple(sig), i // family_size
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="近似重复索引基准")
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--output", help="JSON结果文件路径，不指定时输出到标准输出")
+    args = parser.parse_args()
+
+    server = load_server()
+    rng = random.Random(0)
+    results = []
+
+    # 真实内容的指纹计算
+    contents = []
+    while len(contents) < 200:
+        try:
+            contents.append(server.build_creation_result(
+                "task_bench", rng.choice(server.brands_data), rng.choice(CREATION_TYPES),
+                "text-generator-v2", "", None, rng
+            ).content)
+        except KeyError:
+            continue
+    counter = [0]
+
+    def one_signature():
+        near_duplicates.signature(contents[counter[0] % len(contents)])
+        counter[0] += 1
+
+    stats = time_calls(one_signature, 5000)
+    results.append(dict(stats, function="signature", creationType="ALL", length=None))
+    print(f"signature            {stats['usPerCall']:>10.2f} us/次")
+
+    # 构建索引
+    before = rss_mb()
+    index = NearDuplicateIndex(capacity=args.count)
+    start = time.perf_counter()
+    stored = []
+    for sig, group in synthetic_signatures(args.count, rng):
+        index.add(sig, group)
+        if len(stored) < args.queries:
+            stored.append((sig, group))
+    build = time.perf_counter() - start
+    grown = rss_mb() - before
+    print(f"构建 {len(index)} 个指纹: {build:.1f} 秒, 内存增长约 {grown:.0f} MiB")
+
+    # 查找：一半为已存在指纹的近似变体，一半为全新指纹
+    queries = []
+    for i in range(args.queries):
+        if i % 2 == 0:
+            sig, group = stored[rng.randrange(len(stored))]
+            sig = list(sig)
+            for position in rng.sample(range(NUM_PERM), 4):
+                sig[position] = rng.getrandbits(32)
+            queries.append((tuple(sig), group))
+        else:
+            queries.append((tuple(rng.getrandbits(32) for _ in range(NUM_PERM)), None))
+
+    for name, group_filter in (("nearest", False), ("nearest_by_group", True)):
+        latencies = []
+        hits = 0
+        for sig, group in queries:
+            t0 = time.perf_counter()
+            score = index.nearest(sig, group if group_filter else None)
+            latencies.append(time.perf_counter() - t0)
+            hits += score >= 0.8
+        summary = summarize_latencies(latencies, sum(latencies))
+        results.append(dict(summary, function=name, creationType="ALL", length=len(index),
+                            nearDuplicateHits=hits))
+        print(f"{name:<20} p50 {summary['p50Ms']:.4f} ms  p99 {summary['p99Ms']:.4f} ms  "
+              f"命中 {hits}/{len(queries) // 2}")
+
+    write_results(args.output, "dedup", results, count=args.count, buildSec=round(build, 2),
+                  indexRssMb=round(grown, 1))
+
+
+if __name__ == "__main__":
+    main()
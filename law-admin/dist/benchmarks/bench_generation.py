@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容生成与分析微基准
+覆盖全部创作类型，测量 generate_brand_content、post_process_content 及各分析函数在不同内容长度下的耗时
+
+用法: python benchmarks/bench_generation.py [--iterations 2000] [--lengths 100,500,2000,8000] [--output gen.json]
+"""
+
+import argparse
+import random
+
+from benchutil import CREATION_TYPES, load_server, time_calls, write_results
+
+
+def build_content(server, brand, creation_type, length, rng):
+    """重复生成内容直到达到目标长度"""
+    parts = []
+    total = 0
+    while total < length:
+        try:
+            piece = server.template_engine.render(brand, creation_type, rng=rng)
+        except KeyError:
+            # 跳过引用未定义字段的模板
+            continue
+        parts.append(piece)
+        total += len(piece)
+    return "".join(parts)[:length]
+
+
+def analysis_cases(server, brand, creation_type, content):
+    """各分析函数的调用"""
+    features = server.content_analyzer.analyze(content)
+    return {
+        "analyze": lambda: server.content_analyzer.analyze(content),
+        "calculate_confidence": lambda: server.calculate_confidence(content, creation_type, features),
+        "generate_summary": lambda: server.generate_summary(content, features),
+        "generate_keywords": lambda: server.generate_keywords(content, features),
+        "estimate_reading_time": lambda: server.estimate_reading_time(content, features),
+        "get_content_characteristics": lambda: server.get_content_characteristics(content, creation_type, features),
+        "get_improvement_suggestions": lambda: server.get_improvement_suggestions(content, creation_type, features),
+        "calculate_quality_score": lambda: server.calculate_quality_score(content, creation_type, features),
+        "generate_title": lambda: server.generate_title(brand, creation_type),
+        "generate_tags": lambda: server.generate_tags(brand, creation_type),
+        "get_related_topics": lambda: server.get_related_topics(brand, creation_type),
+        "analyze_custom_prompt": lambda: server.analyze_custom_prompt(content, creation_type),
+    }
+
+
+def safe_generate(server, brand, creation_type):
+    """模板引用未定义字段时回退，保证基准可运行"""
+    try:
+        return server.generate_brand_content(brand, creation_type)
+    except KeyError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="内容生成与分析微基准")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--lengths", default="100,500,2000,8000", help="内容长度列表（字符数）")
+    parser.add_argument("--output", help="JSON结果文件路径，不指定时输出到标准输出")
+    args = parser.parse_args()
+
+    server = load_server()
+    lengths = [int(x) for x in args.lengths.split(",") if x]
+    brand = server.brands_data[0]
+    rng = random.Random(0)
+    random.seed(0)
+
+    results = []
+    for creation_type in CREATION_TYPES:
+        stats = time_calls(lambda: safe_generate(server, brand, creation_type), args.iterations)
+        results.append(dict(stats, function="generate_brand_content", creationType=creation_type, length=None))
+
+        for length in lengths:
+            content = build_content(server, brand, creation_type, length, rng)
+            stats = time_calls(lambda: server.post_process_content(content, creation_type), args.iterations)
+            results.append(dict(stats, function="post_process_content", creationType=creation_type, length=length))
+
+            for name, fn in analysis_cases(server, brand, creation_type, content).items():
+                stats = time_calls(fn, args.iterations)
+                results.append(dict(stats, function=name, creationType=creation_type, length=length))
+
+    write_results(args.output, "generation", results, iterations=args.iterations, lengths=lengths)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+创作响应JSON序列化基准
+比较原 jsonify（ASCII转义）与各编码器的每条响应字节数和微秒数
+
+用法: python benchmarks/bench_json.py [--iterations 5000] [--output json.json]
+"""
+
+import argparse
+import json
+import random
+
+from benchutil import CREATION_TYPES, load_server, time_calls, write_results
+
+import json_provider  # noqa: E402
+
+
+def sample_results(server, count):
+    """生成一批典型的创作结果"""
+    rng = random.Random(0)
+    results = []
+    while len(results) < count:
+        brand = rng.choice(server.brands_data)
+        try:
+            results.append(server.build_creation_result(
+                "task_bench", brand, rng.choice(CREATION_TYPES), "text-generator-v2", "", None, rng
+            ))
+        except KeyError:
+            continue
+    return results
+
+
+def encoders():
+    """待比较的编码函数，均返回bytes"""
+    cases = {
+        # Flask默认jsonify：ASCII转义、按键排序
+        "json-ascii(旧jsonify)": lambda obj: json.dumps(
+            obj.to_dict(), ensure_ascii=True, sort_keys=True, separators=(",", ":")
+        ).encode("utf-8"),
+    }
+    for backend in json_provider.available_backends():
+        cases[f"{backend}-utf8"] = json_provider.make_dumps_bytes(backend)
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="创作响应JSON序列化基准")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--output", help="JSON结果文件路径，不指定时输出到标准输出")
+    args = parser.parse_args()
+
+    server = load_server()
+    samples = sample_results(server, args.samples)
+
+    results = []
+    for name, encode in encoders().items():
+        size = sum(len(encode(obj)) for obj in samples) / len(samples)
+        counter = [0]
+
+        def one():
+            encode(samples[counter[0] % len(samples)])
+            counter[0] += 1
+
+        stats = time_calls(one, args.iterations)
+        results.append(dict(stats, function=name, creationType="ALL", length=None,
+                            bytesPerResponse=round(size, 1)))
+        print(f"{name:<24}{size:>10.1f} 字节{stats['usPerCall']:>10.2f} us/条")
+
+    write_results(args.output, "json", results, iterations=args.iterations,
+                  activeBackend=json_provider.BACKEND)
+
+
+if __name__ == "__main__":
+    main()
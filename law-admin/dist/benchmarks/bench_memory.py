@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据模型内存基准
+比较普通dict与__slots__记录类型保存大量品牌和缓存创作结果时的内存占用
+
+用法: python benchmarks/bench_memory.py [--count 100000] [--output memory.json]
+"""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+from benchutil import CREATION_TYPES, load_server, write_results
+
+from models import Brand, CreationResult  # noqa: E402
+
+
+def synthetic_brands_blob(server, count):
+    """以内置品牌为样本生成大量品牌的JSON文本，模拟从文件加载"""
+    base = [b.to_dict() for b in server.brands_data]
+    brands = []
+    for i in range(count):
+        brand = dict(base[i % len(base)])
+        brand["id"] = i + 1
+        brand["name"] = f"{brand['name']}{i}"
+        brand["followerCount"] = i
+        brands.append(brand)
+    return json.dumps(brands, ensure_ascii=False)
+
+
+def measure(build):
+    """返回build()结果保留的内存字节数"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, after - before
+
+
+def sample_records(server, count):
+    """生成一批创作结果记录作为缓存内容的来源"""
+    rng = random.Random(0)
+    samples = []
+    while len(samples) < min(count, 500):
+        try:
+            samples.append(server.build_creation_result(
+                "task_bench", rng.choice(server.brands_data), rng.choice(CREATION_TYPES),
+                "text-generator-v2", "", None, rng
+            ))
+        except KeyError:
+            continue
+    return samples
+
+
+def legacy_result_dict(record, index):
+    """原实现的结果dict（每条结果独立的brandInfo、列表与时间字符串）"""
+    return record.replace(task_id=f"task_{index}").to_dict()
+
+
+def record_copy(record, index):
+    """与原实现等价的独立记录（列表字段为新元组）"""
+    return CreationResult(
+        task_id=f"task_{index}",
+        status=record.status,
+        processing_time=record.processing_time,
+        title=record.title,
+        content=record.content,
+        summary=record.summary,
+        creation_type=record.creation_type,
+        ai_model=record.ai_model,
+        confidence=record.confidence,
+        tags=tuple(record.tags),
+        keywords=tuple(record.keywords),
+        reading_time=record.reading_time,
+        word_count=record.word_count,
+        characteristics=tuple(record.characteristics),
+        suggestions=tuple(record.suggestions),
+        related_topics=tuple(record.related_topics),
+        brand=record.brand,
+        create_time=record.create_time.replace(),
+        quality_score=record.quality_score,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据模型内存基准")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--output", help="JSON结果文件路径，不指定时输出到标准输出")
+    args = parser.parse_args()
+
+    server = load_server()
+    blob = synthetic_brands_blob(server, args.count)
+
+    _, brand_dicts = measure(lambda: json.loads(blob))
+    _, brand_records = measure(lambda: [Brand.from_dict(b) for b in json.loads(blob)])
+
+    samples = sample_records(server, args.count)
+    _, result_dicts = measure(
+        lambda: [legacy_result_dict(samples[i % len(samples)], i) for i in range(args.count)]
+    )
+    _, result_records = measure(
+        lambda: [record_copy(samples[i % len(samples)], i) for i in range(args.count)]
+    )
+
+    results = []
+    for name, dict_bytes, record_bytes in (
+        ("brands", brand_dicts, brand_records),
+        ("cachedResults", result_dicts, result_records),
+    ):
+        results.append({
+            "function": name,
+            "creationType": "ALL",
+            "length": args.count,
+            "dictBytes": dict_bytes,
+            "recordBytes": record_bytes,
+            "bytesPerItemDict": round(dict_bytes / args.count, 1),
+            "bytesPerItemRecord": round(record_bytes / args.count, 1),
+            "saving": f"{(1 - record_bytes / dict_bytes) * 100:.1f}%" if dict_bytes else "n/a",
+        })
+        print(f"{name:<14} dict {dict_bytes / 1048576:8.1f} MiB   记录 {record_bytes / 1048576:8.1f} MiB   "
+              f"节省 {results[-1]['saving']}")
+
+    write_results(args.output, "memory", results, count=args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动基准
+每轮启动一个新的解释器导入服务模块（-X importtime），按顶层包汇总导入耗时，
+并读取服务模块记录的各初始化阶段耗时；中位数超出预算时以状态码1退出，可用于CI
+
+用法: python benchmarks/bench_startup.py [--runs 5] [--budget-ms 300] [--top 15] [--output startup.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchutil import DIST_DIR, write_results
+
+PROBE = (
+    "import json, time\n"
+    "start = time.perf_counter()\n"
+    "import {module} as server\n"
+    "elapsed = (time.perf_counter() - start) * 1000.0\n"
+    "startup = getattr(server, 'startup', None)\n"
+    "print(json.dumps({{'importMs': elapsed, 'startup': startup.report() if startup else None}}))\n"
+)
+
+
+def parse_importtime(stderr):
+    """-X importtime 输出按顶层包汇总自身耗时（毫秒）"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        top = name.strip().split(".", 1)[0]
+        totals[top] = totals.get(top, 0.0) + int(self_us) / 1000.0
+    return totals
+
+
+def run_once(module):
+    env = dict(os.environ)
+    env.setdefault("AI_CREATION_DB", "")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        cwd=DIST_DIR, env=env, capture_output=True, text=True
+    )
+    wall = (time.perf_counter() - start) * 1000.0
+    if proc.returncode != 0:
+        raise SystemExit(f"导入 {module} 失败:\n{proc.stderr[-2000:]}")
+    probe = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        "wallMs": wall,
+        "importMs": probe["importMs"],
+        "packages": parse_importtime(proc.stderr),
+        "phases": {p["name"]: p["ms"] for p in (probe["startup"] or {}).get("phases", [])},
+    }
+
+
+def median_of(runs, key):
+    names = {}
+    for run in runs:
+        for name in run[key]:
+            names.setdefault(name, None)
+    return {name: statistics.median(run[key].get(name, 0.0) for run in runs) for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动基准")
+    parser.add_argument("--module", default="enhanced_ai_creation_server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("AI_STARTUP_BUDGET_MS", "0")) or None,
+                        help="服务模块导入耗时预算（中位数），默认读取 AI_STARTUP_BUDGET_MS")
+    parser.add_argument("--top", type=int, default=15, help="列出导入耗时最多的顶层包个数")
+    parser.add_argument("--output", help="JSON结果文件路径，不指定时输出到标准输出")
+    args = parser.parse_args()
+
+    # 第一轮可能需要生成字节码缓存，不计入结果
+    run_once(args.module)
+    runs = [run_once(args.module) for _ in range(max(1, args.runs))]
+
+    wall = statistics.median(run["wallMs"] for run in runs)
+    imported = statistics.median(run["importMs"] for run in runs)
+    packages = sorted(median_of(runs, "packages").items(), key=lambda item: -item[1])
+    phases = median_of(runs, "phases")
+
+    print(f"进程总耗时 {wall:.1f} ms，导入 {args.module} {imported:.1f} ms（{len(runs)} 轮中位数）")
+    print(f"\n{'顶层包':<32}{'导入ms':>10}")
+    for name, ms in packages[:args.top]:
+        print(f"{name:<32}{ms:>10.2f}")
+    if phases:
+        print(f"\n{'启动阶段':<32}{'ms':>10}")
+        for name, ms in phases.items():
+            print(f"{name:<32}{ms:>10.2f}")
+
+    results = (
+        [{"function": "startup", "component": "total", "ms": round(imported, 3)},
+         {"function": "startup", "component": "process", "ms": round(wall, 3)}]
+        + [{"function": "phase", "component": name, "ms": round(ms, 3)} for name, ms in phases.items()]
+        + [{"function": "import", "component": name, "ms": round(ms, 3)} for name, ms in packages]
+    )
+    within = args.budget_ms is None or imported <= args.budget_ms
+    write_results(args.output, "startup", results, module=args.module, runs=len(runs),
+                  budgetMs=args.budget_ms, withinBudget=within)
+    if not within:
+        print(f"冷启动 {imported:.1f} ms 超出预算 {args.budget_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
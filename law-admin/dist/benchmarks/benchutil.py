@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试公共工具：计时、分位数统计与JSON结果输出
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+DIST_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if DIST_DIR not in sys.path:
+    sys.path.insert(0, DIST_DIR)
+
+CREATION_TYPES = ["STORY", "INTRODUCTION", "CRAFT", "CULTURE", "HISTORY", "MODERN"]
+
+
+def load_server(simulate_latency=False, rate_limit=False):
+    """导入服务模块，默认关闭模拟处理耗时与限流（压测请求都来自同一客户端）"""
+    import enhanced_ai_creation_server as server
+    server.SIMULATE_LATENCY = simulate_latency
+    server.RATE_LIMIT_ENABLED = rate_limit
+    return server
+
+
+def percentile(sorted_values, pct):
+    """最近秩分位数，输入需已排序"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize_latencies(latencies, elapsed):
+    """延迟列表（秒）汇总为毫秒分位数与吞吐"""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "elapsedSec": round(elapsed, 4),
+        "reqPerSec": round(count / elapsed, 2) if elapsed else 0.0,
+        "meanMs": round(sum(values) / count * 1000, 4) if count else 0.0,
+        "p50Ms": round(percentile(values, 50) * 1000, 4),
+        "p95Ms": round(percentile(values, 95) * 1000, 4),
+        "p99Ms": round(percentile(values, 99) * 1000, 4),
+        "maxMs": round(values[-1] * 1000, 4) if count else 0.0,
+    }
+
+
+def time_calls(fn, iterations):
+    """重复调用fn，返回每次调用的微秒数与每秒次数"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "usPerCall": round(elapsed / iterations * 1e6, 3),
+        "callsPerSec": round(iterations / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def environment():
+    """运行环境信息，便于比较不同机器上的结果"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def write_results(path, name, results, **meta):
+    """写入JSON结果文件；path为空时输出到标准输出"""
+    payload = {"benchmark": name, "environment": environment()}
+    payload.update(meta)
+    payload["results"] = results
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"结果已写入 {path}")
+    else:
+        print(text)
+    return payload
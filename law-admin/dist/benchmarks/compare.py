@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+比较两次基准结果
+支持 bench_generation.py 与 load_test.py 输出的JSON文件
+
+用法: python benchmarks/compare.py before.json after.json
+"""
+
+import argparse
+import json
+
+LOAD_METRICS = ["reqPerSec", "meanMs", "p50Ms", "p95Ms", "p99Ms", "maxMs"]
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def change(before, after):
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare_load(before, after):
+    print(f"{'指标':<12}{'之前':>14}{'之后':>14}{'变化':>10}")
+    for metric in LOAD_METRICS:
+        b = before["results"].get(metric, 0)
+        a = after["results"].get(metric, 0)
+        print(f"{metric:<12}{b:>14.3f}{a:>14.3f}{change(b, a):>10}")
+
+
+def compare_generation(before, after):
+    def key(row):
+        return (row["function"], row["creationType"], row.get("length"))
+
+    old = {key(row): row for row in before["results"]}
+    print(f"{'函数':<30}{'类型':<14}{'长度':>7}{'之前us':>12}{'之后us':>12}{'变化':>10}")
+    for row in after["results"]:
+        prev = old.get(key(row))
+        if prev is None:
+            continue
+        b, a = prev["usPerCall"], row["usPerCall"]
+        length = row.get("length") or "-"
+        print(f"{row['function']:<30}{row['creationType']:<14}{length!s:>7}{b:>12.3f}{a:>12.3f}{change(b, a):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较两次基准结果")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    if before.get("benchmark") != after.get("benchmark"):
+        raise SystemExit("两个结果文件的基准类型不一致")
+    if before["benchmark"] == "load_test":
+        compare_load(before, after)
+    else:
+        compare_generation(before, after)
+
+
+if __name__ == "__main__":
+    main()
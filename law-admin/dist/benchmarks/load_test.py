@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+创作API压测
+并发发送创作请求，统计p50/p95/p99延迟与每秒请求数
+
+模式:
+    inprocess  通过Flask测试客户端在进程内调用（不含网络开销）
+    http       通过HTTP请求本地服务；未指定 --url 时在后台线程启动一个本地服务
+
+用法:
+    python benchmarks/load_test.py --mode inprocess --requests 2000 --concurrency 16
+    python benchmarks/load_test.py --mode http --url http://127.0.0.1:8080 --simulate-latency
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from benchutil import CREATION_TYPES, load_server, summarize_latencies, write_results
+
+
+def build_payloads(server, count, seed):
+    """随机生成品牌与创作类型组合的请求体"""
+    rng = random.Random(seed)
+    brand_ids = [b["id"] for b in server.brands_data]
+    model_ids = [m["id"] for m in server.ai_models]
+    return [
+        {
+            "brandId": rng.choice(brand_ids),
+            "creationType": rng.choice(CREATION_TYPES),
+            "aiModel": rng.choice(model_ids),
+            "prompt": rng.choice(["", "详细介绍历史", "简洁的工艺说明", "讲一个传承故事"]),
+        }
+        for _ in range(count)
+    ]
+
+
+class InProcessClient(object):
+    """每个线程独立的Flask测试客户端"""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def post(self, path, payload):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.post(path, json=payload)
+        return response.status_code
+
+
+class HttpClient(object):
+    """每个线程复用一个keep-alive连接"""
+
+    def __init__(self, base_url):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.local = threading.local()
+
+    def post(self, path, payload):
+        body = json.dumps(payload).encode("utf-8")
+        for attempt in range(2):
+            conn = getattr(self.local, "conn", None)
+            if conn is None:
+                conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self.local.conn = None
+                if attempt:
+                    raise
+
+
+def start_local_server(app):
+    """在后台线程启动本地多线程服务，返回 (地址, 关闭函数)"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    httpd = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{httpd.server_port}", httpd.shutdown
+
+
+def run_load(client, path, payloads, concurrency):
+    """并发执行全部请求，返回延迟、状态码统计与总耗时"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def one(payload):
+        start = time.perf_counter()
+        try:
+            status = client.post(path, payload)
+        except Exception:
+            status = "error"
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, payloads))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="创作API压测")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--url", help="http模式下的服务地址，不指定时启动本地服务")
+    parser.add_argument("--path", default="/api/ai/creations")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--simulate-latency", action="store_true",
+                        help="保留1.5~3秒的模拟处理耗时（外部服务由其 AI_CREATION_SIMULATE_LATENCY 控制）")
+    parser.add_argument("--output", help="JSON结果文件路径，不指定时输出到标准输出")
+    args = parser.parse_args()
+
+    server = load_server(simulate_latency=args.simulate_latency)
+    stop = None
+    if args.mode == "inprocess":
+        client = InProcessClient(server.app)
+        target = "inprocess"
+    else:
+        target = args.url
+        if not target:
+            target, stop = start_local_server(server.app)
+        client = HttpClient(target)
+
+    try:
+        if args.warmup:
+            run_load(client, args.path, build_payloads(server, args.warmup, args.seed + 1), args.concurrency)
+        latencies, statuses, elapsed = run_load(
+            client, args.path, build_payloads(server, args.requests, args.seed), args.concurrency
+        )
+    finally:
+        if stop:
+            stop()
+
+    results = summarize_latencies(latencies, elapsed)
+    results["statusCodes"] = statuses
+    write_results(
+        args.output, "load_test", results,
+        mode=args.mode, target=target, endpoint=args.path,
+        concurrency=args.concurrency, simulateLatency=args.simulate_latency
+    )
+
+
+if __name__ == "__main__":
+    main()
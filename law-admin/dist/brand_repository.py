@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+品牌数据仓库
+按ID、规范化名称、分类和状态建立索引，支持从JSON/SQLite文件加载与热更新
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import unicodedata
+
+from models import Brand
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def normalize_brand_name(name):
+    """规范化品牌名称：全半角统一、去除空白、英文小写"""
+    if not name:
+        return ""
+    name = unicodedata.normalize("NFKC", str(name))
+    return "".join(name.split()).lower()
+
+
+def normalize_brand_id(brand_id):
+    """统一品牌ID类型，数字字符串按整数处理；其他类型（列表、字典、布尔值等）返回None"""
+    if isinstance(brand_id, str):
+        brand_id = brand_id.strip()
+        return int(brand_id) if brand_id.isdigit() else None
+    if isinstance(brand_id, int) and not isinstance(brand_id, bool):
+        return brand_id
+    return None
+
+
+def load_brands_file(path):
+    """从JSON或SQLite文件读取品牌列表"""
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        import sqlite3  # 延迟导入：只有SQLite数据文件需要
+        conn = sqlite3.connect(path)
+        try:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute("SELECT * FROM brands")]
+        finally:
+            conn.close()
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("brands", [])
+    if not isinstance(data, list):
+        raise ValueError("品牌数据格式无效")
+    return data
+
+
+class _BrandIndex(object):
+    """一次加载生成的只读索引，重新加载时整体替换"""
+
+    __slots__ = ("brands", "by_id", "by_name", "by_category", "by_status")
+
+    def __init__(self, brands):
+        self.brands = [Brand.from_dict(b) for b in brands]
+        self.by_id = {}
+        self.by_name = {}
+        self.by_category = {}
+        self.by_status = {}
+        for brand in self.brands:
+            brand_id = normalize_brand_id(brand.get("id"))
+            if brand_id is not None:
+                self.by_id[brand_id] = brand
+            name = normalize_brand_name(brand.get("name"))
+            if name:
+                self.by_name.setdefault(name, brand)
+            self.by_category.setdefault(brand.get("category"), []).append(brand)
+            self.by_status.setdefault(brand.get("status"), []).append(brand)
+
+
+class BrandRepository(object):
+    """带索引的品牌仓库
+
+    brands           内置品牌数据，未配置文件或文件加载失败时使用
+    source           品牌数据文件路径（.json / .db / .sqlite）
+    reload_interval  检查文件修改时间的最小间隔秒数，0表示不自动热更新
+    lazy             为True时数据文件推迟到首次查询时加载，缩短冷启动
+    """
+
+    def __init__(self, brands=None, source=None, reload_interval=0, lazy=False):
+        self.source = source
+        self.reload_interval = float(reload_interval)
+        self._fallback = list(brands or [])
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._mtime = None
+        self._last_check = 0.0
+        # 每次重新加载递增，供依赖品牌数据的缓存判断是否失效
+        self.version = 0
+        self._index = _BrandIndex(self._fallback)
+        self._loaded = not source
+        if source and not lazy:
+            self.reload()
+
+    def reload(self):
+        """从数据文件重新加载并替换索引，返回加载的品牌数量"""
+        if not self.source:
+            self._index = _BrandIndex(self._fallback)
+            self.version += 1
+            return len(self._fallback)
+
+        with self._lock:
+            mtime = os.path.getmtime(self.source)
+            index = _BrandIndex(load_brands_file(self.source))
+            self._index = index
+            self.version += 1
+            self._mtime = mtime
+            self._last_check = time.time()
+            self._loaded = True
+        return len(index.brands)
+
+    def _ensure_loaded(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            import sqlite3
+            try:
+                self.reload()
+            except (OSError, ValueError, sqlite3.Error) as e:
+                # 只尝试一次：继续使用内置品牌，热更新检测到文件变化时再加载
+                self._loaded = True
+                self._last_check = time.time()
+                try:
+                    self._mtime = os.path.getmtime(self.source)
+                except OSError:
+                    pass
+                sys.stderr.write(f"品牌数据文件 {self.source} 加载失败，使用内置品牌数据: {e}\n")
+
+    def _maybe_reload(self):
+        if not self._loaded:
+            self._ensure_loaded()
+            return
+        if not self.source or self.reload_interval <= 0:
+            return
+        now = time.time()
+        if now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+        try:
+            changed = os.path.getmtime(self.source) != self._mtime
+        except OSError:
+            return
+        if changed:
+            import sqlite3
+            try:
+                self.reload()
+            except (OSError, ValueError, sqlite3.Error):
+                # 文件写入中或格式错误时保留当前索引
+                pass
+
+    def get(self, brand_id):
+        """按ID查找品牌，ID无效时返回None"""
+        self._maybe_reload()
+        brand_id = normalize_brand_id(brand_id)
+        return self._index.by_id.get(brand_id) if brand_id is not None else None
+
+    def find_by_name(self, name):
+        """按名称查找品牌"""
+        self._maybe_reload()
+        return self._index.by_name.get(normalize_brand_name(name))
+
+    def resolve(self, brand_id=None, brand_name=None):
+        """优先按ID、其次按名称查找品牌"""
+        brand = self.get(brand_id) if brand_id not in (None, "") else None
+        if brand is None and brand_name:
+            brand = self.find_by_name(brand_name)
+        return brand
+
+    def find_by_category(self, category):
+        """按分类列出品牌"""
+        self._maybe_reload()
+        return list(self._index.by_category.get(category, []))
+
+    def find_by_status(self, status):
+        """按状态列出品牌"""
+        self._maybe_reload()
+        return list(self._index.by_status.get(status, []))
+
+    def all(self):
+        """全部品牌"""
+        self._maybe_reload()
+        return list(self._index.brands)
+
+    def current_version(self):
+        """检查热更新后返回当前数据版本"""
+        self._maybe_reload()
+        return self.version
+
+    def categories(self):
+        """全部分类"""
+        self._maybe_reload()
+        return [c for c in self._index.by_category if c is not None]
+
+    def __len__(self):
+        if not self._loaded:
+            self._ensure_loaded()
+        return len(self._index.brands)
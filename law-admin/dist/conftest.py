@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试配置：导入服务模块前关闭创作历史、预生成与模拟耗时，测试不写入临时目录也不启动后台生成
+运行: cd law-admin/dist && python -m pytest -q
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("AI_CREATION_DB", "")
+os.environ.setdefault("AI_PREGEN_ENABLED", "0")
+os.environ.setdefault("AI_CREATION_SIMULATE_LATENCY", "0")
+
+
+class FakeClock(object):
+    """可手动推进的时钟，替换模块中的 time 以测试过期与补充"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
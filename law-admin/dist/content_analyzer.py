@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容分析器
+对生成内容只做一次扫描，输出供各评分/摘要函数共享的特征对象
+"""
+
+from keyword_matcher import KeywordMatcher
+
+SENTENCE_END = "。"
+
+
+class ContentFeatures(object):
+    """一次分析得到的内容特征"""
+
+    __slots__ = ("text", "length", "sentence_count", "unique_chars", "unique_ratio", "hit_counts")
+
+    def __init__(self, text, length, sentence_count, unique_chars, hit_counts):
+        self.text = text
+        self.length = length
+        self.sentence_count = sentence_count
+        self.unique_chars = unique_chars
+        self.unique_ratio = unique_chars / length if length else 0.0
+        self.hit_counts = hit_counts
+
+    @property
+    def hits(self):
+        """出现过的词汇集合"""
+        return frozenset(self.hit_counts)
+
+    def has(self, term):
+        """词汇表中的词是否出现在内容中"""
+        return term in self.hit_counts
+
+
+class ContentAnalyzer(object):
+    """按固定词汇表分析内容
+
+    vocabulary  需要统计命中情况的词汇，或已编译的 KeywordMatcher
+    """
+
+    def __init__(self, vocabulary=()):
+        if isinstance(vocabulary, KeywordMatcher):
+            self.matcher = vocabulary
+        else:
+            self.matcher = KeywordMatcher(vocabulary)
+
+    def analyze(self, content):
+        """分析内容，返回 ContentFeatures"""
+        return ContentFeatures(
+            content,
+            len(content),
+            content.count(SENTENCE_END),
+            len(set(content)),
+            self.matcher.counts(content)
+        )
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+创作历史存储
+SQLite（WAL模式）保存已完成的创作结果：请求线程只把结果放入队列，
+后台线程批量写入；支持按品牌、类型分页浏览与标题、正文、关键词的全文检索
+"""
+
+import base64
+import json
+import os
+import queue
+import re
+import threading
+import time
+from functools import lru_cache
+
+from json_provider import dumps
+
+# 中日韩字符逐字切分后写入全文索引，单字、双字的中文查询也能命中
+_CJK_REGEX = r'([㐀-鿿豈-﫿])'
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS creations (
+        task_id TEXT PRIMARY KEY,
+        brand_id INTEGER,
+        brand_name TEXT,
+        creation_type TEXT,
+        ai_model TEXT,
+        title TEXT,
+        quality_score INTEGER,
+        created_at REAL NOT NULL,
+        payload TEXT NOT NULL,
+        fingerprint BLOB
+    )""",
+    "CREATE INDEX IF NOT EXISTS creations_created ON creations (created_at)",
+    "CREATE INDEX IF NOT EXISTS creations_brand ON creations (brand_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS creations_type ON creations (creation_type, created_at)",
+    # 无内容FTS表，rowid与creations一致，只保存索引
+    "CREATE VIRTUAL TABLE IF NOT EXISTS creations_fts USING fts5(title, content, keywords, content='')",
+)
+
+_STOP = object()
+
+
+def new_task_id():
+    """生成任务ID：秒级时间戳加64位随机数，同一秒内并发生成也不会冲突"""
+    return f"task_{int(time.time())}_{os.urandom(8).hex()}"
+
+
+@lru_cache(maxsize=None)
+def _cjk_pattern():
+    # 大范围字符类编译需数毫秒，推迟到首次使用，不计入冷启动
+    return re.compile(_CJK_REGEX)
+
+
+def segment(text):
+    """全文索引分词：中日韩字符逐字分隔，其余交给FTS5默认分词"""
+    return _cjk_pattern().sub(r' \1 ', text or "")
+
+
+def build_match_query(text):
+    """用户查询转为FTS5表达式：每个空格分隔的词作为短语，多个词同时命中"""
+    phrases = []
+    for term in text.split():
+        tokens = segment(term).split()
+        if tokens:
+            phrases.append('"' + " ".join(tokens).replace('"', '""') + '"')
+    return " AND ".join(phrases)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """解析分页游标，应为size个数字；格式无效时抛出ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("cursor无效")
+    if not isinstance(values, list) or len(values) != size or not all(
+            isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        raise ValueError("cursor无效")
+    return values
+
+
+class CreationStore(object):
+    """创作历史存储
+
+    path            SQLite文件路径
+    batch_size      每次事务最多写入的条数
+    flush_interval  攒批等待的最长秒数
+    max_pending     待写入队列上限，写入跟不上时丢弃新结果而不阻塞请求
+    """
+
+    def __init__(self, path, batch_size=100, flush_interval=0.5, max_pending=10000):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self._queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writer = None
+        self._writer_pid = None
+        self._schema_ready = False
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        # fork后的子进程不能复用父进程的连接
+        if conn is None or self._local.pid != os.getpid():
+            import sqlite3  # 延迟导入：首次读写历史时才加载
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(creations)")}
+                if "fingerprint" not in columns:
+                    conn.execute("ALTER TABLE creations ADD COLUMN fingerprint BLOB")
+                self._schema_ready = True
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # 写入
+
+    def save(self, result):
+        """异步保存创作结果，不阻塞调用方；队列已满时丢弃并计数"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(result)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _ensure_writer(self):
+        # 后台线程延迟到首次写入时启动，fork后的子进程重新启动
+        if self._writer is not None and self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer is None or self._writer_pid != os.getpid():
+                self._writer = threading.Thread(target=self._run_writer, name="creation-store", daemon=True)
+                self._writer_pid = os.getpid()
+                self._writer.start()
+
+    def _run_writer(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                written = 0
+                for result in batch:
+                    written += self._insert(conn, result)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            with self._lock:
+                self.errors += len(batch)
+                self.last_error = str(e)
+            return
+        with self._lock:
+            self.written += written
+
+    def _insert(self, conn, result):
+        brand = result.brand
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO creations (task_id, brand_id, brand_name, creation_type, ai_model, "
+            "title, quality_score, created_at, payload, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                result.task_id, brand.id, brand.name, result.creation_type, result.ai_model,
+                result.title, result.quality_score, result.create_time.timestamp(),
+                dumps(result.to_dict()), result.fingerprint
+            )
+        )
+        if cursor.rowcount != 1:
+            return 0
+        conn.execute(
+            "INSERT INTO creations_fts (rowid, title, content, keywords) VALUES (?, ?, ?, ?)",
+            (cursor.lastrowid, segment(result.title), segment(result.content), segment(" ".join(result.keywords)))
+        )
+        return 1
+
+    def flush(self):
+        """等待已提交的结果全部写入"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """写完剩余结果后停止后台线程"""
+        if self._writer is not None and self._writer.is_alive() and self._writer_pid == os.getpid():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._writer = None
+
+    # 查询
+
+    def get(self, task_id):
+        """按任务ID读取完整结果，不存在时返回None"""
+        row = self._connect().execute(
+            "SELECT payload FROM creations WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, cursor=None, limit=20, brand_id=None, creation_type=None):
+        """按创建时间倒序分页，返回 (结果列表, 下一页游标)"""
+        where = []
+        params = []
+        if brand_id is not None:
+            where.append("brand_id = ?")
+            params.append(brand_id)
+        if creation_type:
+            where.append("creation_type = ?")
+            params.append(creation_type)
+        if cursor:
+            created_at, rowid = decode_cursor(cursor, 2)
+            where.append("(created_at < ? OR (created_at = ? AND rowid < ?))")
+            params.extend((created_at, created_at, rowid))
+        sql = "SELECT rowid, created_at, payload FROM creations"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, rowid DESC LIMIT ?"
+        params.append(limit + 1)
+        rows = self._connect().execute(sql, params).fetchall()
+        next_cursor = encode_cursor([rows[limit - 1][1], rows[limit - 1][0]]) if len(rows) > limit else None
+        return [json.loads(row[2]) for row in rows[:limit]], next_cursor
+
+    def search(self, text, cursor=None, limit=20, brand_id=None, creation_type=None):
+        """全文检索标题、正文与关键词，按相关度排序，返回 (结果列表, 下一页游标)"""
+        match = build_match_query(text)
+        if not match:
+            return [], None
+        offset = 0
+        if cursor:
+            (offset,) = decode_cursor(cursor, 1)
+            if not isinstance(offset, int) or offset < 0:
+                raise ValueError("cursor无效")
+        sql = (
+            "SELECT c.payload FROM creations_fts f JOIN creations c ON c.rowid = f.rowid "
+            "WHERE creations_fts MATCH ?"
+        )
+        params = [match]
+        if brand_id is not None:
+            sql += " AND c.brand_id = ?"
+            params.append(brand_id)
+        if creation_type:
+            sql += " AND c.creation_type = ?"
+            params.append(creation_type)
+        sql += " ORDER BY bm25(creations_fts, 5.0, 1.0, 3.0), c.created_at DESC LIMIT ? OFFSET ?"
+        params.extend((limit + 1, offset))
+        rows = self._connect().execute(sql, params).fetchall()
+        next_cursor = encode_cursor([offset + limit]) if len(rows) > limit else None
+        return [json.loads(row[0]) for row in rows[:limit]], next_cursor
+
+    def recent_fingerprints(self, limit):
+        """最近limit条结果的 (品牌ID, 指纹bytes)，按创建时间倒序"""
+        return self._connect().execute(
+            "SELECT brand_id, fingerprint FROM creations WHERE fingerprint IS NOT NULL "
+            "ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "path": self.path,
+                "pending": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "lastError": self.last_error,
+            }
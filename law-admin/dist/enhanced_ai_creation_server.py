@@ -5,16 +5,274 @@
 提供更丰富、专业的AI内容生成功能
 """
 
-from flask import Flask, jsonify, request
+# 冷启动计时从导入依赖前开始
+from startup_profiler import StartupProfiler
+startup = StartupProfiler()
+
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 import json
+import os
 import random
 from datetime import datetime, timedelta
 import time
 import re
+import tempfile
+import threading
+import unicodedata
+
+from brand_repository import BrandRepository
+from content_analyzer import ContentAnalyzer
+from creation_store import CreationStore, new_task_id
+from generation_backends import ModelBusyError, ModelRoute, ModelRouter, StandInBackend, TemplateBackend, tempered
+from json_provider import FastJSONProvider, dumps_bytes
+from keyword_matcher import KeywordMatcher
+from metrics import OVERFLOW_LABEL, MetricsRegistry, StageTimer
+import near_duplicates
+from near_duplicates import NearDuplicateIndex
+from models import AIModel, Brand, CreationResult
+from pregeneration import PregenerationPool
+from rate_limiter import (NO_ADMISSION, RateLimit, RateLimiter, RateLimitExceeded, api_key_digest, client_key,
+                          create_store)
+from request_profiler import RequestProfiler
+from response_cache import LRUTTLCache
+from singleflight import SingleFlight
+from static_payloads import StaticPayload, StaticPayloadStore
+from suggestion_index import SuggestionIndex
+from template_engine import TemplateEngine
+from task_queue import CreationTaskQueue, QueueFullError, STATUS_COMPLETED, STATUS_FAILED
+startup.mark("imports")
 
 app = Flask(__name__)
-CORS(app, origins=['*'])
+# 使用可选的高速JSON编码器，输出不转义的UTF-8
+app.json = FastJSONProvider(app)
+# 允许的跨域来源，多个以逗号分隔
+AI_CORS_ORIGINS = [o.strip() for o in os.environ.get("AI_CORS_ORIGINS", "*").split(",") if o.strip()]
+CORS(app, origins=AI_CORS_ORIGINS)
+# 部署在反向代理之后时，按代理层数从X-Forwarded-For取客户端IP（限流按IP计量）
+# 未设置时以连接来源为客户端IP，代理之后所有客户端会共用同一个限流额度
+AI_TRUSTED_PROXIES = int(os.environ.get("AI_TRUSTED_PROXIES", "0"))
+if AI_TRUSTED_PROXIES:
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=AI_TRUSTED_PROXIES)
+
+def cors_origin_allowed(origin):
+    """来源是否在 AI_CORS_ORIGINS 内（与Flask-CORS的判断一致，供ASGI服务使用）"""
+    return bool(origin) and ("*" in AI_CORS_ORIGINS or origin in AI_CORS_ORIGINS)
+
+def forwarded_client_addr(remote_addr, forwarded_for):
+    """与ProxyFix一致：按可信代理层数从X-Forwarded-For取客户端IP（供ASGI服务使用）"""
+    if AI_TRUSTED_PROXIES and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",")]
+        if len(hops) >= AI_TRUSTED_PROXIES:
+            return hops[-AI_TRUSTED_PROXIES]
+    return remote_addr
+
+# 是否模拟AI处理耗时（压测与基准测试时可设为0关闭）
+SIMULATE_LATENCY = os.environ.get("AI_CREATION_SIMULATE_LATENCY", "1") != "0"
+
+# 异步创作任务队列配置
+CREATION_WORKERS = int(os.environ.get("AI_CREATION_WORKERS", "4"))
+CREATION_QUEUE_SIZE = int(os.environ.get("AI_CREATION_QUEUE_SIZE", "64"))
+CREATION_RESULT_TTL = float(os.environ.get("AI_CREATION_RESULT_TTL", "600"))
+# 长轮询最长等待秒数
+CREATION_MAX_WAIT = float(os.environ.get("AI_CREATION_MAX_WAIT", "30"))
+# 批量创作配置
+BATCH_MAX_ITEMS = int(os.environ.get("AI_CREATION_BATCH_MAX_ITEMS", "50"))
+BATCH_WORKERS = int(os.environ.get("AI_CREATION_BATCH_WORKERS", "8"))
+# 创作接口限流：每个客户端每秒补充的令牌数、桶容量与并发请求上限
+# 默认关闭；开启后按客户端IP计量，部署在反向代理之后时必须同时设置 AI_TRUSTED_PROXIES
+RATE_LIMIT_ENABLED = os.environ.get("AI_RATE_LIMIT_ENABLED", "0") != "0"
+DEFAULT_RATE_LIMIT = RateLimit(
+    rate=float(os.environ.get("AI_RATE_LIMIT_RATE", "0.5")),
+    burst=float(os.environ.get("AI_RATE_LIMIT_BURST", "10")),
+    concurrency=int(os.environ.get("AI_RATE_LIMIT_CONCURRENCY", "4"))
+)
+# 按Key计量的API Key，多个以逗号分隔；请求携带其他Key时仍按IP计量
+RATE_LIMIT_API_KEYS = frozenset(
+    api_key_digest(key.strip()) for key in os.environ.get("AI_API_KEYS", "").split(",") if key.strip()
+)
+# 按模型覆盖限额，JSON格式：{"cultural-ai": {"rate": 0.2, "burst": 5, "concurrency": 2}}
+MODEL_RATE_LIMITS = {
+    model: RateLimit.from_dict(limit, DEFAULT_RATE_LIMIT)
+    for model, limit in json.loads(os.environ.get("AI_RATE_LIMITS", "{}")).items()
+}
+
+# 创作历史数据库，设为空字符串时不保存
+AI_CREATION_DB = os.environ.get("AI_CREATION_DB", os.path.join(tempfile.gettempdir(), "jinmai_ai_creations.db"))
+# 历史列表单页最大条数
+CREATION_PAGE_MAX = 100
+# 近似重复检测：相似度达到阈值视为重复，去重模式下最多重新生成的次数，内存中保留的指纹数
+DEDUP_THRESHOLD = float(os.environ.get("AI_DEDUP_THRESHOLD", "0.8"))
+DEDUP_MAX_RETRIES = int(os.environ.get("AI_DEDUP_MAX_RETRIES", "3"))
+DEDUP_INDEX_SIZE = int(os.environ.get("AI_DEDUP_INDEX_SIZE", "100000"))
+# 合并进行中的相同创作请求，请求可传 "unique": true 单独生成
+COALESCE_ENABLED = os.environ.get("AI_COALESCE_ENABLED", "1") != "0"
+# 预生成结果池：为请求频繁的 (品牌, 类型, 模型) 在后台预先生成结果，默认参数的请求直接取用
+PREGEN_ENABLED = os.environ.get("AI_PREGEN_ENABLED", "1") != "0"
+PREGEN_POOL_SIZE = int(os.environ.get("AI_PREGEN_POOL_SIZE", "4"))
+PREGEN_LOW_WATERMARK = int(os.environ.get("AI_PREGEN_LOW_WATERMARK", "2"))
+PREGEN_MEMORY_MB = float(os.environ.get("AI_PREGEN_MEMORY_MB", "32"))
+PREGEN_WORKERS = int(os.environ.get("AI_PREGEN_WORKERS", "1"))
+# 请求剖析：按比例抽样，或请求头 X-Profile-Token 与令牌一致时剖析；两者均未配置时不注册任何钩子
+PROFILE_SAMPLE_RATE = float(os.environ.get("AI_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOKEN = os.environ.get("AI_PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get("AI_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "jinmai_profiles"))
+PROFILE_KEEP = int(os.environ.get("AI_PROFILE_KEEP", "50"))
+# 冷启动耗时预算（毫秒），超出时在标准错误输出各阶段耗时；0表示不检查
+STARTUP_BUDGET_MS = float(os.environ.get("AI_STARTUP_BUDGET_MS", "0")) or None
+
+creation_queue = CreationTaskQueue(
+    max_workers=CREATION_WORKERS,
+    max_pending=CREATION_QUEUE_SIZE,
+    result_ttl=CREATION_RESULT_TTL
+)
+_batch_executor = None
+dedup_index = NearDuplicateIndex(capacity=DEDUP_INDEX_SIZE)
+_dedup_index_warming = False
+_dedup_index_lock = threading.Lock()
+creation_store = CreationStore(
+    AI_CREATION_DB,
+    batch_size=int(os.environ.get("AI_CREATION_DB_BATCH", "100")),
+    flush_interval=float(os.environ.get("AI_CREATION_DB_FLUSH_INTERVAL", "0.5"))
+) if AI_CREATION_DB else None
+# 多进程部署时设为 sqlite:<路径> 共享限额
+rate_limiter = RateLimiter(
+    create_store(os.environ.get("AI_RATE_LIMIT_STORE", "memory")),
+    DEFAULT_RATE_LIMIT,
+    MODEL_RATE_LIMITS
+)
+
+# 请求与创作阶段指标
+metrics_registry = MetricsRegistry(max_series=int(os.environ.get("AI_METRICS_MAX_SERIES", "1000")))
+HTTP_REQUESTS = metrics_registry.counter(
+    "http_requests_total", "HTTP请求数", ("method", "endpoint", "status"))
+HTTP_LATENCY = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP请求处理耗时", ("method", "endpoint"))
+HTTP_INFLIGHT = metrics_registry.gauge(
+    "http_requests_in_flight", "处理中的HTTP请求数", ("endpoint",))
+CREATIONS = metrics_registry.counter(
+    "ai_creations_total", "创作请求数", ("creation_type", "ai_model", "status"))
+CREATION_STAGE_LATENCY = metrics_registry.histogram(
+    "ai_creation_stage_seconds", "创作各阶段耗时", ("stage",))
+CREATIONS_PREGENERATED = metrics_registry.counter(
+    "ai_creations_pregenerated_total", "由预生成结果池提供的创作数", ("creation_type", "ai_model"))
+CREATIONS_COALESCED = metrics_registry.counter(
+    "ai_creations_coalesced_total", "合并到进行中相同请求的创作数", ("creation_type", "ai_model"))
+RATE_LIMITED = metrics_registry.counter(
+    "ai_rate_limited_total", "限流拒绝的创作请求数", ("ai_model", "reason"))
+metrics_registry.gauge(
+    "ai_creation_queue_inflight", "异步队列中未完成的任务数",
+    callback=lambda: {(): creation_queue.stats()["inflight"]})
+startup.mark("app")
+
+def record_http_metrics(method, endpoint, status, elapsed, creation_labels=None):
+    """记录一次HTTP请求的耗时、状态码与创作计数，WSGI与ASGI服务共用"""
+    HTTP_LATENCY.observe(elapsed, method, endpoint)
+    HTTP_REQUESTS.inc(method, endpoint, status)
+    if creation_labels:
+        CREATIONS.inc(creation_labels[0], creation_labels[1], status)
+
+def stage_timer(stage):
+    """记录创作阶段耗时"""
+    return StageTimer(CREATION_STAGE_LATENCY, stage)
+
+def creation_metric_labels(creation_type, ai_model):
+    """创作指标的 (类型, 模型) 标签，未登记的类型与模型记为 other，避免任意请求参数产生新序列"""
+    if not isinstance(creation_type, str) or creation_type not in ai_creation_templates:
+        creation_type = OVERFLOW_LABEL
+    if not isinstance(ai_model, str) or ai_model not in model_router:
+        ai_model = OVERFLOW_LABEL
+    return creation_type, ai_model
+
+@app.before_request
+def start_request_metrics():
+    """记录请求开始时间与处理中请求数"""
+    g.metrics_start = time.perf_counter()
+    g.metrics_endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    HTTP_INFLIGHT.inc(g.metrics_endpoint)
+
+@app.after_request
+def record_request_metrics(response):
+    """记录请求耗时、状态码与创作计数"""
+    start = g.pop("metrics_start", None)
+    if start is not None:
+        record_http_metrics(request.method, g.metrics_endpoint, response.status_code,
+                            time.perf_counter() - start, g.pop("creation_labels", None))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    endpoint = g.pop("metrics_endpoint", None)
+    if endpoint is not None:
+        HTTP_INFLIGHT.dec(endpoint)
+
+request_profiler = RequestProfiler(PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_TOKEN, PROFILE_KEEP)
+
+def start_request_profile():
+    """抽样选中或携带令牌的请求开始剖析"""
+    profile = request_profiler.start(request.headers.get("X-Profile-Token"))
+    if profile is not None:
+        g.profile = profile
+        g.profile_start = time.perf_counter()
+
+def finish_request_profile(response):
+    """停止剖析并写入剖析文件，响应头 X-Profile-Id 为记录ID
+
+    流式响应只剖析到响应头返回为止
+    """
+    profile = g.pop("profile", None)
+    if profile is not None:
+        duration = time.perf_counter() - g.pop("profile_start")
+        try:
+            record = request_profiler.finish(profile, request.method, request.path, response.status_code, duration)
+        except OSError:
+            return response
+        response.headers["X-Profile-Id"] = record["id"]
+    return response
+
+def abandon_request_profile(exc):
+    profile = g.pop("profile", None)
+    if profile is not None:
+        request_profiler.abandon(profile)
+
+def list_request_profiles():
+    """最近剖析的请求中耗时最长的，?limit= 条数
+
+    需携带 X-Profile-Token；未配置令牌时拒绝查看（反向代理后无法可靠判断请求是否来自本机）
+    """
+    if not request_profiler.token:
+        return jsonify({
+            "error": "无权查看剖析记录",
+            "message": "服务未配置剖析令牌",
+            "suggestion": "请设置 AI_PROFILE_TOKEN 后携带 X-Profile-Token 查看，或直接读取剖析目录中的文件"
+        }), 403
+    if not request_profiler.authorized(request.headers.get("X-Profile-Token")):
+        return jsonify({
+            "error": "无权查看剖析记录",
+            "message": "缺少或错误的 X-Profile-Token",
+            "suggestion": "请携带服务配置的剖析令牌"
+        }), 403
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), PROFILE_KEEP)
+    except ValueError:
+        return jsonify({"error": "limit参数无效"}), 400
+    return jsonify({"profiles": request_profiler.slowest(limit), "profiler": request_profiler.stats()})
+
+if request_profiler.enabled:
+    app.before_request(start_request_profile)
+    app.after_request(finish_request_profile)
+    app.teardown_request(abandon_request_profile)
+    app.add_url_rule('/api/debug/profiles', view_func=list_request_profiles)
+
+# 指定seed的创作结果缓存
+creation_cache = LRUTTLCache(
+    maxsize=int(os.environ.get("AI_CREATION_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("AI_CREATION_CACHE_TTL", "3600"))
+)
+
+# 进行中的相同创作请求合并
+creation_flights = SingleFlight(enabled=COALESCE_ENABLED)
 
 # 品牌数据库
 brands_data = [
@@ -99,6 +357,16 @@ brands_data = [
         "craftsmanship": "传统泥塑技艺"
     }
 ]
+brands_data = [Brand.from_dict(b) for b in brands_data]
+
+# 品牌索引仓库；配置 AI_BRANDS_FILE 时从JSON/SQLite文件加载，并按间隔检查文件变更热更新
+# 数据文件推迟到首次查询时加载
+brand_repository = BrandRepository(
+    brands_data,
+    source=os.environ.get("AI_BRANDS_FILE") or None,
+    reload_interval=float(os.environ.get("AI_BRANDS_RELOAD_INTERVAL", "5")),
+    lazy=True
+)
 
 # AI创作模板
 ai_creation_templates = {
@@ -242,13 +510,37 @@ ai_models = [
         "temperature_range": [0.2, 0.6]
     }
 ]
+ai_models = [AIModel.from_dict(m) for m in ai_models]
 
-def generate_brand_content(brand_data, creation_type, custom_prompt=""):
-    """生成品牌相关内容"""
-    if creation_type not in ai_creation_templates:
-        return generate_generic_content(brand_data, creation_type, custom_prompt)
-    
-    template_data = {
+# 流式输出的分句规则：句末标点或换行处切分
+CONTENT_CHUNK_PATTERN = re.compile(r'[^。！？\n]*(?:[。！？]+|\n+|$)')
+
+# 内容分析词汇表
+IMPORTANT_WORDS = ["传承", "创新", "历史", "文化", "工艺", "品质", "发展"]
+
+# 自定义提示意图词
+PROMPT_INTENT_TERMS = {
+    "detailed": ["详细的", "详细"],
+    "simple": ["简单", "简洁"],
+    "professional": ["专业", "深度"],
+    "story": ["故事", "经历"],
+    "history": ["历史", "由来"],
+    "culture": ["文化", "内涵"],
+    "craft": ["工艺", "制作"],
+    "modern": ["现代", "发展"]
+}
+
+# 提示意图与内容关键词共用一个预编译的多关键词匹配自动机
+vocabulary_matcher = KeywordMatcher(
+    IMPORTANT_WORDS + ["故事", "制作"] +
+    [term for terms in PROMPT_INTENT_TERMS.values() for term in terms]
+)
+content_analyzer = ContentAnalyzer(vocabulary_matcher)
+startup.mark("data")
+
+def get_brand_template_context(brand_data):
+    """获取品牌相关的静态模板字段，同一品牌可重复使用"""
+    return {
         "brand_name": brand_data["name"],
         "founder": brand_data["founder"],
         "year": brand_data["establishmentYear"],
@@ -260,57 +552,69 @@ def generate_brand_content(brand_data, creation_type, custom_prompt=""):
         "years": datetime.now().year - brand_data["establishmentYear"],
         "historical_period": get_historical_period(brand_data["establishmentYear"]),
         "location": "天津",
-        "craft_steps": random.choice(ai_creation_templates["CRAFT"]["craft_steps"]),
-        "craft_materials": random.choice(ai_creation_templates["CRAFT"]["craft_materials"]),
-        "cultural_connotation": random.choice(ai_creation_templates["CULTURE"]["cultural_connotations"]),
-        "regional_characteristics": random.choice(ai_creation_templates["CULTURE"]["regional_characteristics"]),
-        "historical_events": random.choice(ai_creation_templates["HISTORY"]["historical_events"]),
         "traditional_features": "传统工艺的精髓",
-        "modern_innovations": random.choice(ai_creation_templates["MODERN"]["modern_innovations"]),
         "core_values": "品质至上，传承为本",
-        "modern_elements": random.choice(ai_creation_templates["MODERN"]["modern_elements"]),
         "traditional_charm": "历史文化的深厚底蕴",
         "modern_appeal": "现代审美的时尚元素",
-        "founder_story": random.choice(ai_creation_templates["STORY"]["founder_stories"]),
-        "story_event": random.choice(ai_creation_templates["STORY"]["story_events"]),
         "historical_changes": "时代的变迁和社会的发展",
         "historical_memories": "珍贵的历史记忆",
         "cultural_spirit": "传承创新的文化精神",
         "modern_context": "现代社会的发展进程"
     }
+
+# 预编译模板引擎：随机候选字段与按需计算字段
+template_engine = TemplateEngine(
+    ai_creation_templates,
+    get_brand_template_context,
+    choice_fields={
+        "craft_steps": ai_creation_templates["CRAFT"]["craft_steps"],
+        "craft_materials": ai_creation_templates["CRAFT"]["craft_materials"],
+        "cultural_connotation": ai_creation_templates["CULTURE"]["cultural_connotations"],
+        "regional_characteristics": ai_creation_templates["CULTURE"]["regional_characteristics"],
+        "historical_events": ai_creation_templates["HISTORY"]["historical_events"],
+        "modern_innovations": ai_creation_templates["MODERN"]["modern_innovations"],
+        "modern_elements": ai_creation_templates["MODERN"]["modern_elements"],
+        "founder_story": ai_creation_templates["STORY"]["founder_stories"],
+        "story_event": ai_creation_templates["STORY"]["story_events"]
+    },
+    lazy_fields={
+        # 如果有自定义提示，进行智能融合
+        "custom_requirement": lambda brand_data, creation_type, custom_prompt: analyze_custom_prompt(custom_prompt, creation_type)
+    }
+)
+
+def generate_brand_content(brand_data, creation_type, custom_prompt="", brand_context=None, rng=random):
+    """生成品牌相关内容
+
+    brand_context 为 get_brand_template_context 的预计算结果，批量创作时按品牌共享
+    rng 为随机数来源，传入 random.Random(seed) 时结果可复现
+    """
+    if creation_type not in template_engine:
+        return generate_generic_content(brand_data, creation_type, custom_prompt)
     
-    # 如果有自定义提示，进行智能融合
-    if custom_prompt:
-        template_data["custom_requirement"] = analyze_custom_prompt(custom_prompt, creation_type)
-    
-    # 选择并生成内容
-    template = random.choice(ai_creation_templates[creation_type]["templates"])
-    content = template.format(**template_data)
+    # 选择模板并只计算其引用的字段
+    with stage_timer("generation"):
+        content = template_engine.render(brand_data, creation_type, custom_prompt, brand_context, rng)
     
     # 后处理优化
-    content = post_process_content(content, creation_type)
+    with stage_timer("post_processing"):
+        content = post_process_content(content, creation_type, rng)
     
     return content
 
 def analyze_custom_prompt(prompt, creation_type):
     """分析用户自定义提示"""
-    prompt_lower = prompt.lower()
+    # 一次扫描提取全部命中词，再映射为意图
+    hits = vocabulary_matcher.hits(prompt)
     
-    # 提取关键词和意图
     keywords = {
-        "detailed": "详细的" in prompt_lower or "详细" in prompt_lower,
-        "simple": "简单" in prompt_lower or "简洁" in prompt_lower,
-        "professional": "专业" in prompt_lower or "深度" in prompt_lower,
-        "story": "故事" in prompt_lower or "经历" in prompt_lower,
-        "history": "历史" in prompt_lower or "由来" in prompt_lower,
-        "culture": "文化" in prompt_lower or "内涵" in prompt_lower,
-        "craft": "工艺" in prompt_lower or "制作" in prompt_lower,
-        "modern": "现代" in prompt_lower or "发展" in prompt_lower
+        intent: any(term in hits for term in terms)
+        for intent, terms in PROMPT_INTENT_TERMS.items()
     }
     
     return keywords
 
-def post_process_content(content, creation_type):
+def post_process_content(content, creation_type, rng=random):
     """内容后处理"""
     # 移除多余的空格和换行
     content = re.sub(r'\s+', ' ', content)
@@ -318,15 +622,15 @@ def post_process_content(content, creation_type):
     
     # 根据类型调整格式
     if creation_type == "STORY":
-        content = add_story_elements(content)
+        content = add_story_elements(content, rng)
     elif creation_type == "CRAFT":
-        content = add_craft_details(content)
+        content = add_craft_details(content, rng)
     elif creation_type == "CULTURE":
-        content = add_cultural_depth(content)
+        content = add_cultural_depth(content, rng)
     
     return content.strip()
 
-def add_story_elements(content):
+def add_story_elements(content, rng=random):
     """添加故事元素"""
     story_openings = [
         "在古老的天津卫，",
@@ -342,12 +646,12 @@ def add_story_elements(content):
         "传承不息，创新不止，这就是{brand_name}的魅力所在。"
     ]
     
-    if not content.startswith("在") and random.random() < 0.3:
-        content = random.choice(story_openings) + content
+    if not content.startswith("在") and rng.random() < 0.3:
+        content = rng.choice(story_openings) + content
     
     return content
 
-def add_craft_details(content):
+def add_craft_details(content, rng=random):
     """添加工艺细节"""
     craft_details = [
         "每一道工序都需要精湛的技艺",
@@ -356,13 +660,13 @@ def add_craft_details(content):
         "传统工艺的精髓在于细节的把握"
     ]
     
-    if "工序" in content and random.random() < 0.4:
-        detail = random.choice(craft_details)
+    if "工序" in content and rng.random() < 0.4:
+        detail = rng.choice(craft_details)
         content = content.replace("工序", f"工序（{detail}）")
     
     return content
 
-def add_cultural_depth(content):
+def add_cultural_depth(content, rng=random):
     """添加文化深度"""
     cultural_quotes = [
         "这正体现了中华传统文化的深厚底蕴",
@@ -371,8 +675,8 @@ def add_cultural_depth(content):
         "文化的力量在于传承，传承的意义在于发展"
     ]
     
-    if random.random() < 0.3:
-        quote = random.choice(cultural_quotes)
+    if rng.random() < 0.3:
+        quote = rng.choice(cultural_quotes)
         content += f"\n\n{quote}，{content.split('。')[-2] if '。' in content else '这种文化精神'}值得我们深入思考和传承发扬。"
     
     return content
@@ -394,99 +698,964 @@ def generate_generic_content(brand_data, creation_type, custom_prompt):
     """生成通用内容"""
     return f"{brand_data['name']}是{brand_data['category']}领域的知名品牌，始创于{brand_data['establishmentYear']}年。{custom_prompt or '这是一个关于传承与创新的故事。'}"
 
+# 按模型路由生成：每个模型独立的后端、输出预算、温度范围与并发池
+MODEL_CONCURRENCY = int(os.environ.get("AI_MODEL_CONCURRENCY", "4"))
+MODEL_WAIT_TIMEOUT = float(os.environ.get("AI_MODEL_WAIT_TIMEOUT", "2"))
+# 按模型配置生成后端，"default" 为未单独配置的模型，JSON格式：
+# {"story-teller": {"backend": "standin", "latency": [0.5, 1.5], "concurrency": 2}}
+MODEL_BACKENDS = json.loads(os.environ.get("AI_MODEL_BACKENDS", "{}"))
+
+template_backend = TemplateBackend(generate_brand_content)
+
+def build_generation_backend(config):
+    """按配置创建生成后端"""
+    name = config.get("backend", "template")
+    if name == "template":
+        return template_backend
+    if name == "standin":
+        latency = config.get("latency", 1.0)
+        low, high = (latency, latency) if isinstance(latency, (int, float)) else latency
+        return StandInBackend(template_backend, low, high)
+    raise ValueError(f"不支持的生成后端: {name}")
+
+def build_model_route(model_id, model=None):
+    """创建模型路由，未登记的模型不限制输出长度与温度"""
+    config = MODEL_BACKENDS.get(model_id, MODEL_BACKENDS.get("default", {}))
+    return ModelRoute(
+        model_id,
+        build_generation_backend(config),
+        max_tokens=model.max_tokens if model else None,
+        temperature_range=model.temperature_range if model else None,
+        concurrency=config.get("concurrency", MODEL_CONCURRENCY),
+        wait_timeout=config.get("waitTimeout", MODEL_WAIT_TIMEOUT)
+    )
+
+model_router = ModelRouter(build_model_route("default"), [build_model_route(m.id, m) for m in ai_models])
+metrics_registry.gauge(
+    "ai_model_generations_active", "各模型正在生成的请求数", ("ai_model",),
+    callback=lambda: {(name,): route["active"] for name, route in model_router.stats().items()})
+
+# 预序列化的静态响应（模型列表、品牌元数据）
+STATIC_MAX_AGE = int(os.environ.get("AI_STATIC_MAX_AGE", "300"))
+static_payloads = StaticPayloadStore()
+
+def ai_models_payload():
+    """模型列表静态响应，运行期不变"""
+    return static_payloads.get("models", 0, lambda: ai_models)
+
+def brands_payload():
+    """品牌元数据静态响应，品牌数据热更新后重新生成"""
+    return static_payloads.get("brands", brand_repository.current_version(), brand_repository.all)
+
+# 各创作类型的标签
+TYPE_TAGS = {
+    "STORY": ["品牌故事", "历史文化", "传承发展"],
+    "INTRODUCTION": ["品牌介绍", "产品特色", "文化内涵"],
+    "CRAFT": ["传统工艺", "制作技艺", "工匠精神"],
+    "CULTURE": ["文化内涵", "非遗传承", "文化价值"],
+    "HISTORY": ["历史传承", "发展历程", "时代变迁"],
+    "MODERN": ["现代发展", "传承创新", "新时代"]
+}
+
+# 各创作类型的相关主题
+TYPE_TOPICS = {
+    "STORY": ["品牌传承故事", "创业历史", "人物传记"],
+    "INTRODUCTION": ["品牌文化", "产品特色", "市场定位"],
+    "CRAFT": ["传统技艺", "工匠精神", "工艺传承"],
+    "CULTURE": ["文化内涵", "历史价值", "文化保护"],
+    "HISTORY": ["历史变迁", "时代发展", "文化传承"],
+    "MODERN": ["创新发展", "现代转型", "品牌建设"]
+}
+
+# 创作建议：提示词中的 {brand} 为品牌名占位符，由前端替换
+SUGGESTION_TYPE_PROMPTS = {
+    "STORY": ["以{brand}的创立经过为主线，写一个温情的品牌故事"],
+    "INTRODUCTION": ["用简洁生动的语言介绍{brand}的招牌产品"],
+    "CRAFT": ["按制作顺序讲解{brand}的传统工艺"],
+    "CULTURE": ["解读{brand}背后的天津地方文化"],
+    "HISTORY": ["按时间线梳理{brand}的百年历程"],
+    "MODERN": ["讲述{brand}如何在新时代传承创新"]
+}
+# 模板引用某字段时对应的提示词
+SUGGESTION_FIELD_PROMPTS = {
+    "founder": "讲述{brand}创始人的创业经历",
+    "founder_story": "刻画{brand}创始人坚守品质的匠心",
+    "story_event": "描写{brand}发展历程中的关键时刻",
+    "specialty": "突出{brand}最有特色的产品与口碑",
+    "year": "回顾{brand}自创立以来的发展历程",
+    "years": "回顾{brand}自创立以来的发展历程",
+    "cultural_value": "阐述{brand}的文化价值",
+    "craftsmanship": "介绍{brand}代代相传的手艺",
+    "craft_steps": "详细描述{brand}的制作工序",
+    "craft_materials": "介绍{brand}在选料上的讲究",
+    "craft_time": "讲讲{brand}制作过程中的火候与时间",
+    "cultural_connotation": "挖掘{brand}蕴含的文化内涵",
+    "regional_characteristics": "结合天津的地域特色讲述{brand}",
+    "historical_period": "结合创立时的时代背景讲述{brand}",
+    "historical_events": "讲述{brand}亲历的历史事件",
+    "modern_innovations": "介绍{brand}近年来的创新举措",
+    "modern_elements": "展现{brand}融合的现代元素",
+    "traditional_features": "对比{brand}坚持的传统与新变化",
+    "core_values": "提炼{brand}的核心价值观"
+}
+# 指定品牌时按品牌字段生成的提示词
+SUGGESTION_BRAND_PROMPTS = (
+    ("specialty", "突出{brand}的{value}"),
+    ("craftsmanship", "介绍{brand}的{value}"),
+    ("culturalValue", "从“{value}”的角度解读{brand}")
+)
+SUGGESTION_FORMATS = ("prompts", "full")
+SUGGESTION_CACHE_SIZE = int(os.environ.get("AI_SUGGESTION_CACHE_SIZE", "1024"))
+
+def get_brand_suggestion_details(brand_data, creation_type):
+    """品牌相关的提示词、相关主题与标签"""
+    prompts = [
+        template.replace("{value}", brand_data[field])
+        for field, template in SUGGESTION_BRAND_PROMPTS
+        if brand_data.get(field)
+    ]
+    return prompts, get_related_topics(brand_data, creation_type), generate_tags(brand_data, creation_type)
+
+_suggestion_index = None
+
+def get_suggestion_index():
+    """获取创作建议索引（首次使用时构建，需解析全部模板）"""
+    global _suggestion_index
+    if _suggestion_index is None:
+        with startup.phase("suggestion_index"):
+            _suggestion_index = SuggestionIndex(
+                {t: template_engine.fields(t) for t in template_engine.creation_types},
+                SUGGESTION_TYPE_PROMPTS,
+                SUGGESTION_FIELD_PROMPTS,
+                TYPE_TOPICS,
+                TYPE_TAGS,
+                brand_details=get_brand_suggestion_details
+            )
+    return _suggestion_index
+
+# 品牌相关建议的序列化结果
+suggestion_payload_cache = LRUTTLCache(maxsize=SUGGESTION_CACHE_SIZE, ttl=STATIC_MAX_AGE * 12)
+
+def suggestion_payload(creation_type, output_format, brand_data=None):
+    """创作建议的静态响应，未指定品牌时运行期不变"""
+    def build():
+        entry = get_suggestion_index().get(creation_type, brand_data)
+        return entry["prompts"] if output_format == "prompts" else entry
+    
+    if brand_data is None:
+        return static_payloads.get(f"suggestions:{creation_type}:{output_format}", 0, build)
+    
+    key = (brand_data["id"], creation_type, output_format, brand_repository.current_version())
+    payload = suggestion_payload_cache.get(key)
+    if payload is None:
+        payload = StaticPayload.from_object(build())
+        suggestion_payload_cache.set(key, payload)
+    return payload
+
 # API端点
 @app.route('/api/ai/models')
 def get_ai_models():
     """获取AI模型列表 - 增强版"""
-    return jsonify(ai_models)
+    return ai_models_payload().response(request, STATIC_MAX_AGE)
+
+@app.route('/api/brands')
+def get_brands():
+    """获取品牌元数据列表"""
+    return brands_payload().response(request, STATIC_MAX_AGE)
+
+@app.route('/api/ai/suggestions')
+def get_ai_suggestions():
+    """创作建议
+
+    默认返回提示词数组（{brand} 为品牌名占位符）；format=full 时返回提示词、相关主题与标签；
+    传入 brandId 或 brandName 时加入该品牌的建议
+    """
+    creation_type = request.args.get('creationType') or 'STORY'
+    suggestion_index = get_suggestion_index()
+    if creation_type not in suggestion_index:
+        return jsonify({
+            "error": "创作类型无效",
+            "message": f"可选类型: {', '.join(suggestion_index.creation_types)}"
+        }), 400
+    
+    output_format = request.args.get('format', 'prompts')
+    if output_format not in SUGGESTION_FORMATS:
+        return jsonify({"error": "format参数无效", "message": "可选: prompts, full"}), 400
+    
+    brand_data = None
+    brand_id = request.args.get('brandId')
+    brand_name = request.args.get('brandName', '')
+    if brand_id or brand_name:
+        brand_data = brand_repository.resolve(brand_id, brand_name)
+        if not brand_data:
+            return jsonify({"error": "品牌不存在"}), 404
+    
+    return suggestion_payload(creation_type, output_format, brand_data).response(request, STATIC_MAX_AGE)
+
+# 创作请求的解析、校验与响应内容，WSGI与ASGI服务共用，两者只负责收发
+
+class CreationRequestError(Exception):
+    """创作请求无法处理：status 为HTTP状态码，payload 为响应内容，headers 为附加响应头"""
+
+    def __init__(self, status, payload, headers=None):
+        Exception.__init__(self, payload.get("message", payload["error"]))
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+
+class CreationParams(object):
+    """已校验的创作请求参数，mode 为同步 sync、异步 async 或流式 stream"""
+
+    __slots__ = ("brand_id", "brand_name", "creation_type", "ai_model", "prompt", "seed", "temperature",
+                 "max_tokens", "avoid_duplicates", "unique", "mode")
+
+    @property
+    def metric_labels(self):
+        return creation_metric_labels(self.creation_type, self.ai_model)
+
+    def generation_kwargs(self):
+        """process_ai_creation 的生成参数"""
+        return {
+            "seed": self.seed,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "avoid_duplicates": self.avoid_duplicates,
+        }
+
+def flag_enabled(args, data, name):
+    """判断查询参数或请求体中的开关是否开启"""
+    if args.get(name, '').lower() in ("1", "true", "yes"):
+        return True
+    return data.get(name) is True
+
+def parse_creation_request(data, args):
+    """校验创作请求体与查询参数，返回 CreationParams；参数无效时抛出 CreationRequestError(400)"""
+    if not data or not isinstance(data, dict):
+        raise CreationRequestError(400, {"error": "请求数据不能为空"})
+    
+    params = CreationParams()
+    params.brand_id = data.get('brandId')
+    params.brand_name = data.get('brandName') or ''
+    params.creation_type = data.get('creationType', 'STORY')
+    params.ai_model = data.get('aiModel', 'text-generator-v2')
+    params.prompt = data.get('prompt') or ''
+    for name, value in (("brandName", params.brand_name), ("creationType", params.creation_type),
+                        ("aiModel", params.ai_model), ("prompt", params.prompt)):
+        if not isinstance(value, str):
+            raise CreationRequestError(400, {"error": "请求参数无效", "message": f"{name}必须是字符串"})
+    if params.brand_id is not None and (isinstance(params.brand_id, bool)
+                                        or not isinstance(params.brand_id, (int, str))):
+        raise CreationRequestError(400, {"error": "请求参数无效", "message": "brandId必须是整数或字符串"})
+    
+    try:
+        params.seed = parse_seed(data.get('seed'))
+    except ValueError as e:
+        raise CreationRequestError(400, {"error": "seed参数无效", "message": str(e)})
+    
+    route = model_router.route(params.ai_model)
+    try:
+        params.temperature = route.resolve_temperature(data.get('temperature'))
+        params.max_tokens = route.resolve_max_tokens(data.get('maxTokens'))
+    except ValueError as e:
+        raise CreationRequestError(400, {"error": "生成参数无效", "message": str(e)})
+    
+    params.avoid_duplicates = flag_enabled(args, data, 'avoidDuplicates')
+    params.unique = flag_enabled(args, data, 'unique')
+    if flag_enabled(args, data, 'async'):
+        params.mode = "async"
+    elif flag_enabled(args, data, 'stream'):
+        params.mode = "stream"
+    else:
+        params.mode = "sync"
+    return params
+
+def resolve_creation_brand(params):
+    """查找品牌数据（按ID或名称），不存在时抛出 CreationRequestError(404)"""
+    with stage_timer("lookup"):
+        brand_data = brand_repository.resolve(params.brand_id, params.brand_name)
+    if not brand_data:
+        raise CreationRequestError(404, {"error": "品牌不存在"})
+    return brand_data
+
+def submit_creation_task(task_id, brand_data, params, admission):
+    """提交异步创作任务，返回202响应内容；任务结束时释放准入，队列已满时抛出QueueFullError"""
+    task = creation_queue.submit(
+        task_id, run_admitted, admission, process_ai_creation,
+        task_id, brand_data, params.creation_type, params.ai_model, params.prompt,
+        unique=params.unique, **params.generation_kwargs()
+    )
+    return {
+        "taskId": task_id,
+        "status": task["status"],
+        "pollUrl": f"/api/ai/creations/{task_id}"
+    }
+
+def creation_error(exc):
+    """创作请求异常对应的 (状态码, 响应内容, 附加响应头)"""
+    if isinstance(exc, CreationRequestError):
+        return exc.status, exc.payload, exc.headers
+    if isinstance(exc, RateLimitExceeded):
+        return 429, rate_limited_payload(exc), {"Retry-After": exc.retry_after_header}
+    if isinstance(exc, QueueFullError):
+        return 429, {
+            "error": "创作任务过多",
+            "message": "当前排队任务已满",
+            "suggestion": "请稍后重试"
+        }, {"Retry-After": "1"}
+    if isinstance(exc, ModelBusyError):
+        return 503, {
+            "error": "模型繁忙",
+            "message": str(exc),
+            "suggestion": "请稍后重试或选择其他模型"
+        }, {"Retry-After": str(int(exc.retry_after))}
+    return 500, {
+        "error": "AI创作失败",
+        "message": str(exc),
+        "suggestion": "请检查输入参数或稍后重试"
+    }, {}
+
+def parse_task_wait(args):
+    """任务查询的长轮询秒数，限制在 CREATION_MAX_WAIT 内"""
+    try:
+        wait = float(args.get('wait', 0))
+    except ValueError:
+        raise CreationRequestError(400, {"error": "wait参数无效"})
+    return max(0.0, min(wait, CREATION_MAX_WAIT))
+
+def task_status_payload(task_id, task, stored=None):
+    """任务查询的 (状态码, 响应内容)；task 为队列中的任务快照，已不在队列时使用创作历史 stored"""
+    if task is None:
+        if stored is None:
+            return 404, {"error": "任务不存在或已过期"}
+        return 200, stored
+    
+    if task["status"] == STATUS_COMPLETED:
+        return 200, task["result"]
+    
+    if task["status"] == STATUS_FAILED:
+        return 500, {
+            "taskId": task_id,
+            "status": STATUS_FAILED,
+            "error": "AI创作失败",
+            "message": task["error"],
+            "suggestion": "请检查输入参数或稍后重试"
+        }
+    
+    return 200, {
+        "taskId": task_id,
+        "status": task["status"],
+        "submitTime": datetime.fromtimestamp(task["submitTime"]).isoformat()
+    }
+
+def stream_start_event(task_id, brand_data):
+    return format_sse("start", {
+        "taskId": task_id,
+        "status": "PROCESSING",
+        "brandInfo": Brand.from_dict(brand_data).info()
+    })
+
+def stream_result_event(result):
+    """流式输出完成：保存创作历史并发送分析元数据（正文已逐句发送）"""
+    result = result.replace(create_time=datetime.now())
+    record_creation(result)
+    return format_sse("result", result.to_dict(include_content=False))
+
+def stream_error_event(task_id, exc):
+    return format_sse("error", {
+        "taskId": task_id,
+        "status": STATUS_FAILED,
+        "error": "AI创作失败",
+        "message": str(exc)
+    })
+
+def creation_error_response(exc):
+    """创作请求异常的Flask响应"""
+    status, payload, headers = creation_error(exc)
+    response = jsonify(payload)
+    response.headers.update(headers)
+    return response, status
 
 @app.route('/api/ai/creations', methods=['POST'])
 def create_ai_creation():
-    """创建AI内容 - 增强版"""
+    """创建AI内容 - 增强版
+
+    默认同步返回创作结果；传入 ?async=1 或请求体 "async": true 时
+    立即返回taskId，结果通过 GET /api/ai/creations/<taskId> 查询；
+    传入 ?stream=1 或 "stream": true 时以Server-Sent Events逐句输出；
+    同步与异步模式下与进行中的相同请求共享一次生成，传入 "unique": true 时单独生成
+    """
+    # 异步与流式模式下并发槽位在任务或响应结束时释放
+    admission = NO_ADMISSION
+    handed_off = False
     try:
-        data = request.get_json()
+        params = parse_creation_request(request.get_json(silent=True), request.args)
+        g.creation_labels = params.metric_labels
+        admission = admit_creation(params.ai_model)
+        brand_data = resolve_creation_brand(params)
+        task_id = generate_task_id()
         
-        if not data:
-            return jsonify({"error": "请求数据不能为空"}), 400
+        if params.mode == "async":
+            payload = submit_creation_task(task_id, brand_data, params, admission)
+            handed_off = True
+            return jsonify(payload), 202
         
-        brand_id = data.get('brandId')
-        brand_name = data.get('brandName', '')
-        creation_type = data.get('creationType', 'STORY')
-        ai_model = data.get('aiModel', 'text-generator-v2')
-        prompt = data.get('prompt', '')
+        if params.mode == "stream":
+            response = Response(
+                stream_ai_creation(task_id, brand_data, params.creation_type, params.ai_model, params.prompt,
+                                   **params.generation_kwargs()),
+                mimetype='text/event-stream',
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+            response.call_on_close(admission.release)
+            handed_off = True
+            return response
         
-        # 查找品牌数据
-        brand_data = None
-        if brand_id:
-            brand_data = next((b for b in brands_data if b['id'] == brand_id), None)
+        result = process_ai_creation(
+            task_id, brand_data, params.creation_type, params.ai_model, params.prompt,
+            unique=params.unique, **params.generation_kwargs()
+        )
+        with stage_timer("serialization"):
+            return jsonify(result)
+    except Exception as e:
+        return creation_error_response(e)
+    finally:
+        if not handed_off:
+            admission.release()
+
+@app.route('/api/ai/creations/<task_id>')
+def get_ai_creation(task_id):
+    """查询异步创作任务，?wait=秒数 时长轮询等待完成"""
+    try:
+        wait = parse_task_wait(request.args)
+    except CreationRequestError as e:
+        return creation_error_response(e)
+    
+    task = creation_queue.wait(task_id, wait) if wait else creation_queue.get(task_id)
+    # 队列中已过期或非异步创建的任务，从创作历史中读取
+    stored = creation_store.get(task_id) if task is None and creation_store else None
+    status, payload = task_status_payload(task_id, task, stored)
+    return jsonify(payload), status
+
+@app.route('/api/ai/creations', methods=['GET'])
+def list_ai_creations():
+    """创作历史：按创建时间倒序分页，传入q时按标题、正文、关键词全文检索
+
+    查询参数 cursor（上一页返回的nextCursor）、limit、brandId、creationType、q、includeContent
+    """
+    if creation_store is None:
+        return jsonify({"error": "创作历史未启用", "suggestion": "请设置 AI_CREATION_DB"}), 404
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), CREATION_PAGE_MAX))
+        brand_id = request.args.get('brandId')
+        brand_id = int(brand_id) if brand_id else None
+    except ValueError:
+        return jsonify({"error": "limit或brandId参数无效"}), 400
+    
+    query = request.args.get('q', '').strip()
+    options = {
+        "cursor": request.args.get('cursor') or None,
+        "limit": limit,
+        "brand_id": brand_id,
+        "creation_type": request.args.get('creationType') or None
+    }
+    try:
+        if query:
+            items, next_cursor = creation_store.search(query, **options)
+        else:
+            items, next_cursor = creation_store.list(**options)
+    except ValueError as e:
+        return jsonify({"error": "cursor参数无效", "message": str(e)}), 400
+    
+    if request.args.get('includeContent', '').lower() not in ("1", "true", "yes"):
+        for item in items:
+            item["result"].pop("content", None)
+    return jsonify({"items": items, "nextCursor": next_cursor})
+
+@app.route('/api/ai/creations:batch', methods=['POST'])
+def create_ai_creations_batch():
+    """批量创建AI内容
+
+    请求体 {"items": [{brandId, creationType, aiModel, prompt}, ...]}
+    默认按提交顺序返回全部结果；?stream=1 或 "stream": true 时以NDJSON逐条输出完成的结果
+    单条失败不影响其他条目
+    """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('items'), list) or not data['items']:
+        return jsonify({"error": "items不能为空"}), 400
+    
+    items = data['items']
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({
+            "error": "批量条目过多",
+            "message": f"单次最多{BATCH_MAX_ITEMS}条",
+            "suggestion": "请拆分后分批提交"
+        }), 400
+    
+    # 批量请求按条目数计费，条目使用同一模型时按该模型限额，否则按默认限额
+    models = {item.get('aiModel', 'text-generator-v2') for item in items
+              if isinstance(item, dict) and isinstance(item.get('aiModel', ''), str)}
+    try:
+        admission = admit_creation(models.pop() if len(models) == 1 else None, cost=len(items))
+    except RateLimitExceeded as e:
+        return creation_error_response(e)
+    
+    # 同一品牌的查找与模板上下文只计算一次
+    brand_cache = {}
+    executor = get_batch_executor()
+    futures = [
+        executor.submit(run_batch_item, index, item, brand_cache)
+        for index, item in enumerate(items)
+    ]
+    
+    if is_flag_enabled(data, 'stream'):
+        from concurrent.futures import as_completed
         
+        def generate():
+            for future in as_completed(futures):
+                yield dumps_bytes(future.result()) + b"\n"
+        response = Response(generate(), mimetype='application/x-ndjson')
+        response.call_on_close(admission.release)
+        return response
+    
+    with admission:
+        results = [future.result() for future in futures]
+    succeeded = sum(1 for r in results if r["status"] == STATUS_COMPLETED)
+    return jsonify({
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    })
+
+def get_batch_executor():
+    """获取批量创作线程池（首次使用时创建）"""
+    global _batch_executor
+    if _batch_executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="ai-batch")
+    return _batch_executor
+
+def resolve_batch_brand(brand_id, brand_name, brand_cache):
+    """批量创作中按品牌缓存查找结果与模板上下文"""
+    key = (brand_id, brand_name)
+    if key not in brand_cache:
+        brand_data = brand_repository.resolve(brand_id, brand_name)
+        context = template_engine.brand_context(brand_data) if brand_data else None
+        brand_cache[key] = (brand_data, context)
+    return brand_cache[key]
+
+def run_batch_item(index, item, brand_cache):
+    """执行单个批量条目，异常转为条目级错误"""
+    try:
+        if not isinstance(item, dict):
+            raise ValueError("条目格式无效")
+        # 条目开关只从条目自身读取，不受批量请求的查询参数影响
+        params = parse_creation_request(item, {})
+        brand_data, brand_context = resolve_batch_brand(params.brand_id, params.brand_name, brand_cache)
         if not brand_data:
-            return jsonify({"error": "品牌不存在"}), 404
-        
-        # 模拟AI处理时间
-        processing_time = random.uniform(1.5, 3.0)
-        time.sleep(processing_time)
-        
-        # 生成内容
-        content = generate_brand_content(brand_data, creation_type, prompt)
-        
-        # 生成标题
-        title = generate_title(brand_data, creation_type)
-        
-        # 计算置信度
-        confidence = calculate_confidence(content, creation_type)
-        
-        # 生成相关标签
-        tags = generate_tags(brand_data, creation_type)
-        
-        # 生成摘要
-        summary = generate_summary(content)
-        
-        # 生成关键词
-        keywords = generate_keywords(content)
-        
-        # 生成阅读时间预估
-        reading_time = estimate_reading_time(content)
+            return {"index": index, "status": STATUS_FAILED, "error": "品牌不存在"}
         
-        result = {
-            "taskId": f"task_{int(time.time())}_{random.randint(1000, 9999)}",
-            "status": "COMPLETED",
-            "processingTime": round(processing_time, 2),
-            "result": {
-                "title": title,
-                "content": content,
-                "summary": summary,
-                "type": creation_type,
-                "aiModel": ai_model,
-                "confidence": confidence,
-                "tags": tags,
-                "keywords": keywords,
-                "readingTime": reading_time,
-                "wordCount": len(content),
-                "characteristics": get_content_characteristics(content, creation_type),
-                "suggestions": get_improvement_suggestions(content, creation_type),
-                "relatedTopics": get_related_topics(brand_data, creation_type)
-            },
-            "brandInfo": {
-                "id": brand_data["id"],
-                "name": brand_data["name"],
-                "category": brand_data["category"],
-                "culturalValue": brand_data.get("culturalValue", "")
-            },
-            "createTime": datetime.now().isoformat(),
-            "qualityScore": calculate_quality_score(content, creation_type)
+        result = process_ai_creation(
+            generate_task_id(), brand_data, params.creation_type, params.ai_model, params.prompt,
+            brand_context, unique=params.unique, **params.generation_kwargs()
+        )
+        CREATIONS.inc(*params.metric_labels, 200)
+        output = result.to_dict()
+        output["index"] = index
+        return output
+    except Exception as e:
+        return {
+            "index": index,
+            "status": STATUS_FAILED,
+            "error": "AI创作失败",
+            "message": str(e)
         }
+
+def admit_creation(ai_model, cost=1):
+    """当前请求的创作准入检查，超限时抛出RateLimitExceeded；关闭限流时返回空准入"""
+    if not RATE_LIMIT_ENABLED:
+        return NO_ADMISSION
+    return admit_client(client_key(request, RATE_LIMIT_API_KEYS), ai_model, cost)
+
+def admit_client(key, ai_model, cost=1):
+    """按客户端标识做准入检查并记录限流指标"""
+    try:
+        return rate_limiter.admit(key, ai_model, cost)
+    except RateLimitExceeded as e:
+        # 按限额桶名称计数，避免任意模型名导致指标标签膨胀
+        RATE_LIMITED.inc(rate_limiter.limit_for(ai_model)[0], e.reason)
+        raise
+
+def rate_limited_payload(exc):
+    """限流拒绝的响应内容"""
+    if exc.reason == "concurrency":
+        message = f"同时进行的创作请求不能超过{exc.limit.concurrency}个"
+    else:
+        message = "创作请求过于频繁"
+    return {
+        "error": "请求过多",
+        "message": message,
+        "suggestion": f"请在{exc.retry_after_header}秒后重试"
+    }
+
+def run_admitted(admission, fn, *args, **kwargs):
+    """在后台执行已准入的任务，结束后释放并发槽位"""
+    with admission:
+        return fn(*args, **kwargs)
+
+def is_flag_enabled(data, name):
+    """判断当前请求的查询参数或请求体中的开关是否开启"""
+    return flag_enabled(request.args, data, name)
+
+def generate_task_id():
+    """生成任务ID"""
+    return new_task_id()
+
+def parse_seed(value):
+    """校验请求中的seed，支持整数或字符串，未提供时返回None"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError("seed必须为整数或字符串")
+    return value
+
+def normalize_prompt(prompt):
+    """规范化提示词用于缓存键：全半角统一并合并空白"""
+    return " ".join(unicodedata.normalize("NFKC", prompt or "").split())
+
+def make_creation_cache_key(brand_data, creation_type, ai_model, prompt, seed, temperature=None, max_tokens=None,
+                            avoid_duplicates=False):
+    """创作结果缓存键"""
+    return (brand_data["id"], creation_type, ai_model, normalize_prompt(prompt), seed,
+            temperature, max_tokens, avoid_duplicates)
+
+def prepare_ai_creation(task_id, brand_data, creation_type, ai_model, prompt, brand_context=None, seed=None,
+                        temperature=None, max_tokens=None, avoid_duplicates=False):
+    """生成创作结果（不含模拟耗时），返回 (结果, 模拟处理秒数)
+
+    指定seed时结果可复现，并按 (品牌, 类型, 模型, 提示词, seed, 生成参数) 缓存，命中时跳过生成与分析且处理秒数为0
+    """
+    cache_key = None
+    if seed is not None:
+        cache_key = make_creation_cache_key(
+            brand_data, creation_type, ai_model, prompt, seed, temperature, max_tokens, avoid_duplicates
+        )
+        cached = creation_cache.get(cache_key)
+        if cached is not None:
+            return cached.replace(task_id=task_id, processing_time=0.0, create_time=datetime.now()), 0.0
+    
+    rng = random.Random(seed) if seed is not None else random
+    
+    # 模拟AI处理时间
+    processing_time = rng.uniform(1.5, 3.0)
+    
+    result = build_creation_result(
+        task_id, brand_data, creation_type, ai_model, prompt, brand_context, rng,
+        temperature, max_tokens, avoid_duplicates
+    )
+    result = result.replace(processing_time=round(processing_time, 2))
+    
+    if cache_key is not None:
+        creation_cache.set(cache_key, result)
+    return result, processing_time
+
+def creation_flight_key(brand_data, creation_type, ai_model, prompt, seed, temperature=None, max_tokens=None,
+                        avoid_duplicates=False, unique=False):
+    """相同请求合并的键，None表示单独生成
+
+    unique 的请求与未指定seed的 avoidDuplicates 请求各自需要不同的内容，不参与合并
+    """
+    if unique or (avoid_duplicates and seed is None):
+        return None
+    return make_creation_cache_key(
+        brand_data, creation_type, ai_model, prompt, seed, temperature, max_tokens, avoid_duplicates
+    )
+
+def share_flight_result(result, task_id, creation_type, ai_model):
+    """合并得到的结果换成本请求的taskId与创建时间"""
+    CREATIONS_COALESCED.inc(*creation_metric_labels(creation_type, ai_model))
+    return result.replace(task_id=task_id, create_time=datetime.now())
+
+def pregeneration_key(brand_data, creation_type, ai_model, prompt, seed, temperature=None, max_tokens=None):
+    """可由预生成结果池提供结果的请求返回池键，否则返回None
+
+    只有未指定seed、提示词为空且生成参数均为模型默认值的已知模型与类型请求，结果才与预先生成的等价
+    """
+    if seed is not None or normalize_prompt(prompt):
+        return None
+    if ai_model not in model_router or creation_type not in template_engine:
+        return None
+    route = model_router.route(ai_model)
+    if temperature != route.default_temperature or max_tokens != route.max_tokens:
+        return None
+    return (brand_data["id"], creation_type, ai_model)
+
+def take_pregenerated(task_id, brand_data, creation_type, ai_model, prompt, seed, temperature=None, max_tokens=None):
+    """从预生成结果池取出结果并换成本请求的taskId，不可用时返回None"""
+    key = pregeneration_key(brand_data, creation_type, ai_model, prompt, seed, temperature, max_tokens)
+    if key is None:
+        return None
+    result = pregeneration_pool.take(key)
+    if result is None:
+        return None
+    CREATIONS_PREGENERATED.inc(*creation_metric_labels(creation_type, ai_model))
+    return claim_pregenerated(result, brand_data).replace(task_id=task_id, create_time=datetime.now())
+
+def claim_pregenerated(result, brand_data):
+    """交付池内结果时才登记指纹，并按交付时的索引重新计算原创度"""
+    similarity = dedup_index.add(near_duplicates.from_bytes(result.fingerprint), brand_data["id"])
+    originality_score = round(1 - similarity, 2)
+    features = content_analyzer.analyze(result.content)
+    # characteristics 按 (style, tone, complexity, originality) 保存
+    characteristics = result.characteristics[:-1] + (
+        get_content_originality(result.content, features, originality_score),
+    )
+    return result.replace(originality_score=originality_score, characteristics=characteristics)
+
+def pregenerate_creation(key):
+    """后台生成一个池内结果：占用模型并发池，不模拟处理耗时
+
+    生成时避免与已交付结果近似重复，但指纹不加入索引，交付时由 claim_pregenerated 登记
+    """
+    brand_id, creation_type, ai_model = key
+    brand_data = brand_repository.get(brand_id)
+    route = model_router.route(ai_model)
+    with route.slot():
+        return build_creation_result(
+            "", brand_data, creation_type, ai_model, "", None, random,
+            route.default_temperature, route.max_tokens, avoid_duplicates=True, register=False
+        )
+
+def pregenerated_size(result):
+    """池内结果占用字节数的估算：序列化长度加指纹"""
+    return len(result.to_json()) + len(result.fingerprint or b"")
+
+pregeneration_pool = PregenerationPool(
+    pregenerate_creation, pregenerated_size,
+    capacity=PREGEN_POOL_SIZE,
+    low_watermark=PREGEN_LOW_WATERMARK,
+    memory_budget=int(PREGEN_MEMORY_MB * 1024 * 1024),
+    workers=PREGEN_WORKERS,
+    enabled=PREGEN_ENABLED
+)
+
+def process_ai_creation(task_id, brand_data, creation_type, ai_model, prompt, brand_context=None, seed=None,
+                        temperature=None, max_tokens=None, avoid_duplicates=False, unique=False):
+    """执行AI创作：占用模型并发池生成内容并完成分析，再模拟处理耗时
+
+    预生成结果池中有可用结果时直接返回；否则与进行中的相同请求合并为一次生成（unique 时单独生成）；
+    模型并发池已满且等待超时时抛出ModelBusyError
+    """
+    result = take_pregenerated(task_id, brand_data, creation_type, ai_model, prompt, seed, temperature, max_tokens)
+    if result is not None:
+        record_creation(result)
+        return result
+    key = creation_flight_key(
+        brand_data, creation_type, ai_model, prompt, seed, temperature, max_tokens, avoid_duplicates, unique
+    )
+    args = (task_id, brand_data, creation_type, ai_model, prompt, brand_context, seed,
+            temperature, max_tokens, avoid_duplicates)
+    if key is None:
+        result = run_ai_creation(*args)
+    else:
+        result, shared = creation_flights.do(key, run_ai_creation, *args)
+        if shared:
+            result = share_flight_result(result, task_id, creation_type, ai_model)
+    record_creation(result)
+    return result
+
+def run_ai_creation(task_id, brand_data, creation_type, ai_model, prompt, brand_context=None, seed=None,
+                    temperature=None, max_tokens=None, avoid_duplicates=False):
+    """生成结果并等待模拟处理耗时，不保存历史
+
+    模型并发池只在生成与分析期间占用，模拟处理耗时在释放槽位后等待
+    """
+    with model_router.route(ai_model).slot():
+        result, processing_time = prepare_ai_creation(
+            task_id, brand_data, creation_type, ai_model, prompt, brand_context, seed,
+            temperature, max_tokens, avoid_duplicates
+        )
+    if processing_time and SIMULATE_LATENCY:
+        with stage_timer("simulated_latency"):
+            simulate_processing(processing_time)
+        result = result.replace(create_time=datetime.now())
+    return result
+
+def record_creation(result):
+    """保存到创作历史（后台批量写入，不阻塞请求）"""
+    if creation_store is not None:
+        creation_store.save(result)
+
+def simulate_processing(seconds):
+    """模拟AI处理耗时，SIMULATE_LATENCY关闭时立即返回"""
+    if SIMULATE_LATENCY:
+        time.sleep(seconds)
+
+def split_content_chunks(content):
+    """按句切分内容，用于流式输出"""
+    return [chunk for chunk in CONTENT_CHUNK_PATTERN.findall(content) if chunk]
+
+def format_sse(event, data):
+    """格式化Server-Sent Events消息"""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps_bytes(data) + b"\n\n"
+
+def stream_ai_creation(task_id, brand_data, creation_type, ai_model, prompt, seed=None,
+                       temperature=None, max_tokens=None, avoid_duplicates=False):
+    """以SSE流式输出创作：先发送任务与品牌信息，再逐句发送内容，最后发送分析元数据"""
+    yield stream_start_event(task_id, brand_data)
+    try:
+        with model_router.route(ai_model).slot():
+            result, processing_time = prepare_ai_creation(
+                task_id, brand_data, creation_type, ai_model, prompt,
+                seed=seed, temperature=temperature, max_tokens=max_tokens,
+                avoid_duplicates=avoid_duplicates
+            )
         
-        return jsonify(result)
+        # 模拟处理耗时分摊到每一句的生成过程中，不占用模型并发池
+        chunks = split_content_chunks(result.content)
+        delay = processing_time / len(chunks) if chunks else processing_time
+        for index, chunk in enumerate(chunks):
+            if delay:
+                simulate_processing(delay)
+            yield format_sse("content", {"index": index, "text": chunk})
         
+        yield stream_result_event(result)
     except Exception as e:
-        return jsonify({
-            "error": "AI创作失败",
-            "message": str(e),
-            "suggestion": "请检查输入参数或稍后重试"
-        }), 500
+        yield stream_error_event(task_id, e)
+    yield format_sse("done", {"taskId": task_id})
+
+def build_creation_result(task_id, brand_data, creation_type, ai_model, prompt, brand_context=None, rng=random,
+                          temperature=None, max_tokens=None, avoid_duplicates=False, register=True):
+    """由模型对应的后端生成内容并完成全部分析，返回 CreationResult
+
+    temperature 调整模板与润色的随机程度，max_tokens 为输出预算（与模型上限取较小值），
+    avoid_duplicates 时与同品牌近期结果过于相似的内容会重新生成；
+    register 为False时指纹不加入近似重复索引（结果尚未交付，由交付方登记）
+    """
+    # 生成内容
+    route = model_router.route(ai_model)
+    rng = tempered(rng, temperature)
+    content, signature, duplicate_similarity = generate_distinct_content(
+        route, brand_data, creation_type, prompt, brand_context, rng, max_tokens, avoid_duplicates, register
+    )
+    return analyze_creation(
+        task_id, brand_data, creation_type, ai_model, content, rng,
+        originality_score=round(1 - duplicate_similarity, 2),
+        fingerprint=near_duplicates.to_bytes(signature)
+    )
+
+def analyze_creation(task_id, brand_data, creation_type, ai_model, content, rng=random, originality_score=None,
+                     fingerprint=None):
+    """对已生成的正文生成标题并完成全部分析，返回 CreationResult
+
+    originality_score 为与已有结果比对得到的原创度，None时按内容特征估计
+    """
+    # 一次性分析内容特征，供后续各项评估共享
+    with stage_timer("analyze"):
+        features = content_analyzer.analyze(content)
+    
+    # 生成标题
+    with stage_timer("title"):
+        title = generate_title(brand_data, creation_type, rng)
+    
+    # 计算置信度
+    with stage_timer("confidence"):
+        confidence = calculate_confidence(content, creation_type, features)
+    
+    # 生成相关标签
+    with stage_timer("tags"):
+        tags = generate_tags(brand_data, creation_type)
+    
+    # 生成摘要
+    with stage_timer("summary"):
+        summary = generate_summary(content, features)
+    
+    # 生成关键词
+    with stage_timer("keywords"):
+        keywords = generate_keywords(content, features)
+    
+    # 生成阅读时间预估
+    with stage_timer("reading_time"):
+        reading_time = estimate_reading_time(content, features)
+    
+    with stage_timer("characteristics"):
+        characteristics = get_content_characteristics(content, creation_type, features, originality_score)
+    
+    with stage_timer("suggestions"):
+        suggestions = get_improvement_suggestions(content, creation_type, features)
+    
+    with stage_timer("related_topics"):
+        related_topics = get_related_topics(brand_data, creation_type)
+    
+    with stage_timer("quality_score"):
+        quality_score = calculate_quality_score(content, creation_type, features)
+    
+    return CreationResult.create(
+        task_id=task_id,
+        title=title,
+        content=content,
+        summary=summary,
+        creation_type=creation_type,
+        ai_model=ai_model,
+        confidence=confidence,
+        tags=tags,
+        keywords=keywords,
+        reading_time=reading_time,
+        word_count=features.length,
+        characteristics=characteristics,
+        suggestions=suggestions,
+        related_topics=related_topics,
+        brand=Brand.from_dict(brand_data),
+        quality_score=quality_score,
+        originality_score=originality_score,
+        fingerprint=fingerprint
+    )
 
-def generate_title(brand_data, creation_type):
+def generate_distinct_content(route, brand_data, creation_type, prompt, brand_context, rng, max_tokens,
+                              avoid_duplicates=False, register=True):
+    """生成内容并与同品牌近期结果比对，返回 (内容, 指纹, 与已有结果的最高相似度)
+
+    avoid_duplicates 时相似度达到 DEDUP_THRESHOLD 则重新生成，最多 DEDUP_MAX_RETRIES 次，
+    均未低于阈值时取相似度最低的一次；register 时将选中内容的指纹加入索引
+    """
+    ensure_dedup_index_warm()
+    brand_id = brand_data["id"]
+    attempts = 1 + (DEDUP_MAX_RETRIES if avoid_duplicates else 0)
+    best = None
+    for _ in range(attempts):
+        content = route.generate(brand_data, creation_type, prompt, brand_context, rng, max_tokens)
+        with stage_timer("fingerprint"):
+            signature = near_duplicates.signature(content)
+            score = dedup_index.nearest(signature, brand_id)
+        if best is None or score < best[2]:
+            best = (content, signature, score)
+        if score < DEDUP_THRESHOLD:
+            break
+    if register:
+        dedup_index.add(best[1], brand_id)
+    return best
+
+def ensure_dedup_index_warm():
+    """首次使用时在后台从创作历史载入近期指纹"""
+    global _dedup_index_warming
+    if _dedup_index_warming or creation_store is None:
+        return
+    with _dedup_index_lock:
+        # 并发的首批请求只启动一次载入
+        if _dedup_index_warming:
+            return
+        _dedup_index_warming = True
+    threading.Thread(target=warm_dedup_index, name="dedup-warmup", daemon=True).start()
+
+def warm_dedup_index():
+    try:
+        rows = creation_store.recent_fingerprints(DEDUP_INDEX_SIZE)
+    except Exception:
+        return
+    for brand_id, fingerprint in reversed(rows):
+        dedup_index.add(near_duplicates.from_bytes(fingerprint), brand_id)
+
+def generate_title(brand_data, creation_type, rng=random):
     """生成标题"""
     title_templates = {
         "STORY": [
@@ -522,16 +1691,17 @@ def generate_title(brand_data, creation_type):
     }
     
     templates = title_templates.get(creation_type, [f"{brand_data['name']}：精彩内容"])
-    return random.choice(templates)
+    return rng.choice(templates)
 
-def calculate_confidence(content, creation_type):
+def calculate_confidence(content, creation_type, features=None):
     """计算置信度"""
+    features = features or content_analyzer.analyze(content)
     base_confidence = 0.75
     
     # 根据内容长度调整
-    if len(content) > 500:
+    if features.length > 500:
         base_confidence += 0.1
-    elif len(content) < 100:
+    elif features.length < 100:
         base_confidence -= 0.1
     
     # 根据类型调整
@@ -551,28 +1721,20 @@ def generate_tags(brand_data, creation_type):
     """生成标签"""
     base_tags = [brand_data["category"], "天津传统文化", "老字号品牌"]
     
-    type_tags = {
-        "STORY": ["品牌故事", "历史文化", "传承发展"],
-        "INTRODUCTION": ["品牌介绍", "产品特色", "文化内涵"],
-        "CRAFT": ["传统工艺", "制作技艺", "工匠精神"],
-        "CULTURE": ["文化内涵", "非遗传承", "文化价值"],
-        "HISTORY": ["历史传承", "发展历程", "时代变迁"],
-        "MODERN": ["现代发展", "传承创新", "新时代"]
-    }
-    
-    tags = base_tags + type_tags.get(creation_type, [])
+    tags = base_tags + TYPE_TAGS.get(creation_type, [])
     
     # 添加品牌特色标签
     if "非遗" in brand_data.get("culturalValue", ""):
         tags.append("非物质文化遗产")
     
-    return list(set(tags))  # 去重
+    return list(dict.fromkeys(tags))  # 去重并保持顺序
 
-def generate_summary(content):
+def generate_summary(content, features=None):
     """生成摘要"""
+    length = features.length if features else len(content)
     # 取前200字符作为摘要，确保完整性
     summary = content[:200]
-    if len(content) > 200:
+    if length > 200:
         # 找到最后一个完整的句子
         last_period = summary.rfind('。')
         if last_period > 100:
@@ -582,32 +1744,33 @@ def generate_summary(content):
     
     return summary
 
-def generate_keywords(content):
+def generate_keywords(content, features=None):
     """生成关键词"""
+    features = features or content_analyzer.analyze(content)
     # 简单的关键词提取
     keywords = ["天津", "传统文化", "老字号", "品牌故事"]
     
     # 从内容中提取重要词汇
-    important_words = ["传承", "创新", "历史", "文化", "工艺", "品质", "发展"]
-    found_words = [word for word in important_words if word in content]
+    found_words = [word for word in IMPORTANT_WORDS if features.has(word)]
     
     keywords.extend(found_words)
-    return list(set(keywords))[:8]  # 最多8个关键词
+    return list(dict.fromkeys(keywords))[:8]  # 最多8个关键词
 
-def estimate_reading_time(content):
+def estimate_reading_time(content, features=None):
     """估算阅读时间"""
     # 假设平均阅读速度为每分钟300字
-    words = len(content)
+    words = features.length if features else len(content)
     minutes = max(1, words // 300)
     return f"{minutes}分钟"
 
-def get_content_characteristics(content, creation_type):
+def get_content_characteristics(content, creation_type, features=None, originality_score=None):
     """获取内容特征"""
+    features = features or content_analyzer.analyze(content)
     return {
         "style": get_content_style(content, creation_type),
         "tone": get_content_tone(content, creation_type),
-        "complexity": get_content_complexity(content),
-        "originality": get_content_originality(content)
+        "complexity": get_content_complexity(content, features),
+        "originality": get_content_originality(content, features, originality_score)
     }
 
 def get_content_style(content, creation_type):
@@ -633,39 +1796,45 @@ def get_content_tone(content, creation_type):
     else:
         return "专业权威"
 
-def get_content_complexity(content):
+def get_content_complexity(content, features=None):
     """获取内容复杂度"""
-    if len(content) > 800:
+    length = features.length if features else len(content)
+    if length > 800:
         return "高"
-    elif len(content) > 400:
+    elif length > 400:
         return "中"
     else:
         return "低"
 
-def get_content_originality(content):
-    """获取内容原创度"""
+def get_content_originality(content, features=None, originality_score=None):
+    """获取内容原创度，originality_score 为与同品牌历史结果比对得到的原创度分数（0~1）"""
+    features = features or content_analyzer.analyze(content)
+    # 与历史结果近似重复
+    if originality_score is not None and originality_score <= 1 - DEDUP_THRESHOLD:
+        return "低"
     # 基于内容长度和独特性评估
-    if len(content) > 600 and len(set(content)) > len(content) * 0.7:
+    if features.length > 600 and features.unique_ratio > 0.7:
         return "高"
-    elif len(content) > 300:
+    elif features.length > 300:
         return "中"
     else:
         return "基础"
 
-def get_improvement_suggestions(content, creation_type):
+def get_improvement_suggestions(content, creation_type, features=None):
     """获取改进建议"""
+    features = features or content_analyzer.analyze(content)
     suggestions = []
     
-    if len(content) < 200:
+    if features.length < 200:
         suggestions.append("可以增加更多细节描述，让内容更加丰富")
     
-    if "。" not in content or content.count("。") < 3:
+    if features.sentence_count < 3:
         suggestions.append("建议增加更多段落分隔，提高可读性")
     
-    if creation_type == "STORY" and "故事" not in content:
+    if creation_type == "STORY" and not features.has("故事"):
         suggestions.append("故事类内容可以增加更多情节元素")
     
-    if creation_type == "CRAFT" and ("工艺" not in content or "制作" not in content):
+    if creation_type == "CRAFT" and (not features.has("工艺") or not features.has("制作")):
         suggestions.append("工艺类内容可以详细描述制作过程")
     
     if not suggestions:
@@ -685,33 +1854,24 @@ def get_related_topics(brand_data, creation_type):
         "非物质文化遗产保护"
     ]
     
-    # 类型相关主题
-    type_topics = {
-        "STORY": ["品牌传承故事", "创业历史", "人物传记"],
-        "INTRODUCTION": ["品牌文化", "产品特色", "市场定位"],
-        "CRAFT": ["传统技艺", "工匠精神", "工艺传承"],
-        "CULTURE": ["文化内涵", "历史价值", "文化保护"],
-        "HISTORY": ["历史变迁", "时代发展", "文化传承"],
-        "MODERN": ["创新发展", "现代转型", "品牌建设"]
-    }
-    
     topics.extend(base_topics)
-    topics.extend(type_topics.get(creation_type, []))
+    topics.extend(TYPE_TOPICS.get(creation_type, []))
     
-    return list(set(topics))[:6]  # 最多6个相关主题
+    return list(dict.fromkeys(topics))[:6]  # 最多6个相关主题
 
-def calculate_quality_score(content, creation_type):
+def calculate_quality_score(content, creation_type, features=None):
     """计算内容质量分数"""
+    features = features or content_analyzer.analyze(content)
     score = 75  # 基础分数
     
     # 长度评分
-    if len(content) > 500:
+    if features.length > 500:
         score += 10
-    elif len(content) > 300:
+    elif features.length > 300:
         score += 5
     
     # 完整性评分
-    if "。" in content and content.count("。") >= 3:
+    if features.sentence_count >= 3:
         score += 5
     
     # 类型相关性评分
@@ -728,24 +1888,87 @@ def calculate_quality_score(content, creation_type):
     return min(score, 100)  # 最高100分
 
 # 其他API端点保持不变
-@app.route('/api/health')
-def health_check():
-    """健康检查"""
-    return jsonify({
+def health_status():
+    """健康检查内容，WSGI与ASGI服务共用"""
+    return {
         "status": "UP",
         "timestamp": datetime.now().isoformat(),
         "service": "Jinmai AI Creation API",
         "version": "2.0.0",
-        "features": ["AI内容生成", "多模型支持", "智能优化"]
-    })
+        "features": ["AI内容生成", "多模型支持", "智能优化", "异步任务队列"],
+        "taskQueue": creation_queue.stats(),
+        "models": model_router.stats(),
+        "creationStore": creation_store.stats() if creation_store else {"enabled": False},
+        "dedupIndex": dedup_index.stats(),
+        "coalescing": creation_flights.stats(),
+        "pregeneration": pregeneration_pool.stats(),
+        "profiling": request_profiler.stats() if request_profiler.enabled else {"enabled": False},
+        "rateLimit": rate_limiter.stats() if RATE_LIMIT_ENABLED else {"enabled": False},
+        "startup": startup.report()
+    }
+
+@app.route('/api/health')
+def health_check():
+    """健康检查"""
+    return jsonify(health_status())
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Prometheus文本格式的请求与创作阶段指标"""
+    return Response(metrics_registry.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/ai/cache/stats')
+def get_cache_stats():
+    """创作结果缓存命中统计"""
+    return jsonify(creation_cache.stats())
 
 # 其他端点代码保持不变...
 
+def shutdown_executors(wait=True):
+    """关闭后台线程池，等待处理中的任务完成"""
+    creation_queue.shutdown(wait=wait)
+    if _batch_executor is not None:
+        _batch_executor.shutdown(wait=wait)
+    pregeneration_pool.shutdown()
+    if creation_store is not None:
+        creation_store.close()
+
+def rate_limit_summary():
+    """启动信息中的限流说明，返回 (说明, 是否需要提醒)"""
+    if not RATE_LIMIT_ENABLED:
+        return "限流: 已关闭", False
+    summary = (f"限流: 每客户端 {DEFAULT_RATE_LIMIT.rate:g}次/秒  突发: {DEFAULT_RATE_LIMIT.burst:g}  "
+               f"并发: {DEFAULT_RATE_LIMIT.concurrency}")
+    if AI_TRUSTED_PROXIES:
+        return f"{summary}  客户端IP: X-Forwarded-For（可信代理{AI_TRUSTED_PROXIES}层）", False
+    return (f"{summary}  客户端IP: 连接来源；部署在反向代理之后时请设置 AI_TRUSTED_PROXIES，"
+            f"否则所有客户端共用同一额度"), True
+
+def create_app():
+    """应用工厂：返回已加载品牌、模板与模型的应用
+
+    全局数据在模块导入时完成加载，多进程服务在fork前调用即可由各进程写时复制共享；
+    后台线程池延迟到首次使用时创建，不会在fork前启动线程
+    """
+    app.extensions["ai_creation_state"] = {
+        "models": len(ai_models),
+        "brands": len(brand_repository),
+        "templates": len(ai_creation_templates),
+        "rate_limit": rate_limit_summary()
+    }
+    app.extensions["ai_creation_shutdown"] = shutdown_executors
+    # 启动时预先序列化静态响应
+    ai_models_payload()
+    brands_payload()
+    for creation_type in get_suggestion_index().creation_types:
+        for output_format in SUGGESTION_FORMATS:
+            suggestion_payload(creation_type, output_format)
+    return app
+
+startup.mark("routes")
+startup.finish(STARTUP_BUDGET_MS)
+
 if __name__ == '__main__':
-    print("🚀 启动津脉智坊增强版AI创作API服务器...")
-    print("📋 AI模型已加载:", len(ai_models))
-    print("📋 品牌数据已加载:", len(brands_data))
-    print("📋 创作模板已加载:", len(ai_creation_templates))
-    print("✨ 服务器启动成功！")
-    
-    app.run(host='0.0.0.0', port=8080, debug=False)
\ No newline at end of file
+    # 生产服务入口见 serve.py，支持多进程、多线程与优雅退出
+    from serve import run
+    run(create_app())
\ No newline at end of file
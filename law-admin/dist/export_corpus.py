@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线批量导出创作语料
+按 品牌 × 创作类型 × seed 直接调用生成与分析函数（不经过HTTP与模拟耗时），
+任务按连续区间分块交给多进程池，完成的块立即追加写入JSONL/CSV，并定期保存断点，中断后可续跑
+
+用法:
+    python export_corpus.py --seeds 1000 --output corpus.jsonl
+    python export_corpus.py --brands 1,2 --types STORY,HISTORY --seeds 500 --output corpus.csv --workers 8
+
+同一 (品牌, 类型, seed, 模型, temperature) 的正文与标题和 POST /api/ai/creations 指定seed时一致；
+导出不与历史结果比对近似重复，originalityScore 为空。
+断点文件为 <输出文件>.ckpt，记录已完成的块与输出文件的有效长度；参数与断点不一致时需 --restart 重新开始
+"""
+
+import argparse
+import csv
+import gc
+import io
+import json
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+
+from generation_backends import tempered, truncate_to_tokens
+from json_provider import dumps
+
+CSV_COLUMNS = (
+    "taskId", "brandId", "brandName", "creationType", "aiModel", "seed", "title", "summary", "content",
+    "tags", "keywords", "wordCount", "readingTime", "confidence", "qualityScore",
+    "style", "tone", "complexity", "originality"
+)
+
+# 工作进程内的导出参数与服务模块，由 init_worker 设置
+_worker = {}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="离线批量导出创作语料")
+    parser.add_argument("--output", required=True, help="输出文件，.csv 为CSV，其他为JSONL")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="输出格式，默认按文件扩展名判断")
+    parser.add_argument("--brands", help="逗号分隔的品牌ID，默认全部品牌")
+    parser.add_argument("--types", help="逗号分隔的创作类型，默认全部类型")
+    parser.add_argument("--seeds", type=int, default=100, help="每个 品牌×类型 生成的seed个数")
+    parser.add_argument("--seed-start", type=int, default=0, help="起始seed")
+    parser.add_argument("--model", default="text-generator-v2", help="AI模型，决定输出token上限与默认温度")
+    parser.add_argument("--temperature", type=float, help="生成温度，默认取模型温度范围的中点")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="工作进程数")
+    parser.add_argument("--chunk-size", type=int, default=200, help="每个工作块包含的创作条数")
+    parser.add_argument("--checkpoint-interval", type=float, default=5.0, help="保存断点的最小间隔秒数")
+    parser.add_argument("--restart", action="store_true", help="忽略已有断点并覆盖输出文件")
+    parser.add_argument("--quiet", action="store_true", help="不显示进度")
+    return parser.parse_args(argv)
+
+
+class ExportPlan(object):
+    """导出任务空间：第 i 条对应 (品牌, 类型, seed)，按品牌、类型、seed 的顺序排列
+
+    同一块内的条目大多属于同一品牌，品牌模板字段只需计算一次
+    """
+
+    def __init__(self, brand_ids, creation_types, seed_start, seeds, chunk_size):
+        self.brand_ids = list(brand_ids)
+        self.creation_types = list(creation_types)
+        self.seed_start = seed_start
+        self.seeds = seeds
+        self.chunk_size = max(1, chunk_size)
+        self.total = len(self.brand_ids) * len(self.creation_types) * seeds
+        self.chunks = (self.total + self.chunk_size - 1) // self.chunk_size
+
+    def item(self, index):
+        """第index条的 (品牌ID, 创作类型, seed)"""
+        per_brand = len(self.creation_types) * self.seeds
+        brand_index, rest = divmod(index, per_brand)
+        type_index, seed_index = divmod(rest, self.seeds)
+        return self.brand_ids[brand_index], self.creation_types[type_index], self.seed_start + seed_index
+
+    def chunk_range(self, chunk):
+        start = chunk * self.chunk_size
+        return start, min(start + self.chunk_size, self.total)
+
+    def signature(self, **extra):
+        """用于校验断点与本次参数一致"""
+        values = {
+            "brands": self.brand_ids, "types": self.creation_types, "seedStart": self.seed_start,
+            "seeds": self.seeds, "chunkSize": self.chunk_size,
+        }
+        values.update(extra)
+        return values
+
+
+# 工作进程
+
+def init_worker(plan, ai_model, temperature, output_format):
+    # Ctrl+C 由主进程处理，工作进程随进程池终止
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import enhanced_ai_creation_server as server
+    route = server.model_router.route(ai_model)
+    _worker.update(
+        server=server, plan=plan, ai_model=ai_model, output_format=output_format,
+        temperature=route.resolve_temperature(temperature), max_tokens=route.resolve_max_tokens(None),
+        brands={}
+    )
+
+
+def worker_brand(brand_id):
+    """品牌记录与静态模板字段，同一工作进程内按品牌缓存"""
+    cached = _worker["brands"].get(brand_id)
+    if cached is None:
+        server = _worker["server"]
+        brand_data = server.brand_repository.get(brand_id)
+        cached = _worker["brands"][brand_id] = (brand_data, server.get_brand_template_context(brand_data))
+    return cached
+
+
+def generate_record(brand_id, creation_type, seed):
+    """生成一条语料；随机数的使用顺序与指定seed的创作接口相同"""
+    server = _worker["server"]
+    brand_data, brand_context = worker_brand(brand_id)
+    rng = random.Random(seed)
+    # 创作接口先抽取模拟处理耗时，保持同一seed的随机序列一致
+    rng.uniform(1.5, 3.0)
+    rng = tempered(rng, _worker["temperature"])
+    content = server.generate_brand_content(brand_data, creation_type, "", brand_context, rng)
+    content = truncate_to_tokens(content, _worker["max_tokens"])
+    task_id = f"corpus_{brand_id}_{creation_type}_{seed}"
+    return server.analyze_creation(task_id, brand_data, creation_type, _worker["ai_model"], content, rng)
+
+
+def to_csv_row(record, seed):
+    result = record["result"]
+    characteristics = result["characteristics"]
+    return [
+        record["taskId"], record["brandInfo"]["id"], record["brandInfo"]["name"], result["type"],
+        result["aiModel"], seed, result["title"], result["summary"], result["content"],
+        "|".join(result["tags"]), "|".join(result["keywords"]), result["wordCount"], result["readingTime"],
+        result["confidence"], record["qualityScore"], characteristics["style"], characteristics["tone"],
+        characteristics["complexity"], characteristics["originality"],
+    ]
+
+
+def run_chunk(chunk):
+    """生成一个块并在工作进程内完成序列化，返回 (块序号, 输出文本, 成功条数, 失败信息列表)"""
+    plan = _worker["plan"]
+    start, end = plan.chunk_range(chunk)
+    csv_output = _worker["output_format"] == "csv"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if csv_output else None
+    errors = []
+    written = 0
+    for index in range(start, end):
+        brand_id, creation_type, seed = plan.item(index)
+        try:
+            record = generate_record(brand_id, creation_type, seed).to_dict()
+        except Exception as e:
+            errors.append(f"{brand_id}/{creation_type}/{seed}: {type(e).__name__}: {e}")
+            continue
+        record["seed"] = seed
+        if csv_output:
+            writer.writerow(to_csv_row(record, seed))
+        else:
+            buffer.write(dumps(record))
+            buffer.write("\n")
+        written += 1
+    return chunk, buffer.getvalue(), written, errors
+
+
+# 断点
+
+class Checkpoint(object):
+    """已完成的块与输出文件有效长度；原子替换写入"""
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self.done = set()
+        self.offset = 0
+        self.written = 0
+        self.failed = 0
+        self._saved_at = time.monotonic()
+
+    def load(self):
+        """读取已有断点，参数不一致时抛出ValueError"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("signature") != self.signature:
+            raise ValueError("断点参数与本次导出不一致，使用 --restart 重新开始")
+        self.done = set(data["done"])
+        self.offset = data["offset"]
+        self.written = data.get("written", 0)
+        self.failed = data.get("failed", 0)
+
+    def due(self, interval):
+        """距上次保存已超过interval秒"""
+        return time.monotonic() - self._saved_at >= interval
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "signature": self.signature, "done": sorted(self.done), "offset": self.offset,
+                "written": self.written, "failed": self.failed,
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._saved_at = time.monotonic()
+
+
+class Progress(object):
+    """标准错误上的单行进度：完成条数、速率与预计剩余时间"""
+
+    def __init__(self, total, done=0, quiet=False):
+        self.total = total
+        self.done = done
+        self.initial = done
+        self.quiet = quiet
+        self.start = time.monotonic()
+        self._shown_at = 0.0
+
+    def update(self, count, force=False):
+        self.done += count
+        now = time.monotonic()
+        if self.quiet or (not force and now - self._shown_at < 0.5):
+            return
+        self._shown_at = now
+        elapsed = now - self.start
+        rate = (self.done - self.initial) / elapsed if elapsed else 0.0
+        remaining = (self.total - self.done) / rate if rate else 0.0
+        percent = self.done * 100.0 / self.total if self.total else 100.0
+        sys.stderr.write(f"\r{self.done}/{self.total} ({percent:.1f}%)  {rate:.0f} 条/秒  剩余约 {remaining:.0f} 秒   ")
+        sys.stderr.flush()
+
+    def finish(self):
+        if not self.quiet:
+            self.update(0, force=True)
+            sys.stderr.write("\n")
+
+
+def export(args):
+    """执行导出，返回 (成功条数, 失败条数)"""
+    import enhanced_ai_creation_server as server
+
+    output_format = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    if args.brands:
+        brand_ids = [int(b) for b in args.brands.split(",")]
+    else:
+        brand_ids = [brand["id"] for brand in server.brand_repository.all()]
+    creation_types = args.types.split(",") if args.types else list(server.ai_creation_templates)
+    for brand_id in brand_ids:
+        if server.brand_repository.get(brand_id) is None:
+            raise SystemExit(f"品牌不存在: {brand_id}")
+    route = server.model_router.route(args.model)
+    try:
+        route.resolve_temperature(args.temperature)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    plan = ExportPlan(brand_ids, creation_types, args.seed_start, args.seeds, args.chunk_size)
+    checkpoint = Checkpoint(args.output + ".ckpt", plan.signature(
+        model=args.model, temperature=args.temperature, format=output_format
+    ))
+    if not args.restart and os.path.exists(checkpoint.path):
+        try:
+            checkpoint.load()
+        except ValueError as e:
+            raise SystemExit(str(e))
+
+    # 截断到最后一次断点时的有效长度，丢弃写入后未记入断点的块
+    out = open(args.output, "r+b" if checkpoint.offset and os.path.exists(args.output) else "wb")
+    out.truncate(checkpoint.offset)
+    out.seek(checkpoint.offset)
+    if checkpoint.offset == 0 and output_format == "csv":
+        out.write((",".join(CSV_COLUMNS) + "\r\n").encode("utf-8"))
+
+    pending = [chunk for chunk in range(plan.chunks) if chunk not in checkpoint.done]
+    done_items = sum(end - start for start, end in map(plan.chunk_range, checkpoint.done))
+    progress = Progress(plan.total, done_items, args.quiet)
+    errors = []
+
+    # 父进程已加载品牌、模板与模型，fork后由工作进程写时复制共享
+    server.brand_repository.all()
+    gc.collect()
+    gc.freeze()
+    pool = multiprocessing.Pool(
+        processes=max(1, args.workers), initializer=init_worker,
+        initargs=(plan, args.model, args.temperature, output_format)
+    )
+    try:
+        for chunk, text, written, chunk_errors in pool.imap_unordered(run_chunk, pending):
+            out.write(text.encode("utf-8"))
+            checkpoint.done.add(chunk)
+            checkpoint.offset = out.tell()
+            checkpoint.written += written
+            checkpoint.failed += len(chunk_errors)
+            errors.extend(chunk_errors[:max(0, 10 - len(errors))])
+            progress.update(written + len(chunk_errors))
+            if checkpoint.due(args.checkpoint_interval):
+                # 先落盘输出再记录断点，断点中的长度总是指向已写入的数据
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint.save()
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        out.flush()
+        os.fsync(out.fileno())
+        out.close()
+        checkpoint.save()
+        progress.finish()
+
+    for message in errors:
+        sys.stderr.write(f"生成失败 {message}\n")
+    return checkpoint.written, checkpoint.failed
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.monotonic()
+    try:
+        written, failed = export(args)
+    except KeyboardInterrupt:
+        sys.stderr.write("已中断，重新运行相同命令可从断点继续\n")
+        sys.exit(130)
+    elapsed = time.monotonic() - start
+    print(f"导出完成: {written} 条，失败 {failed} 条，用时 {elapsed:.1f} 秒 -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
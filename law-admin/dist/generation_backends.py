@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按模型路由的内容生成后端
+每个AI模型对应一个生成后端、输出token预算、温度范围与独立的并发池，
+慢模型占满自己的并发池时不会挤占其他模型
+"""
+
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+
+# 中日韩字符每字计一个token，连续的字母数字计一个token，其余非空白符号各计一个
+_TOKEN_REGEX = r'[㐀-鿿豈-﫿]|[A-Za-z0-9_]+|[^\sA-Za-z0-9_]'
+# 截断时优先停在句末
+_SENTENCE_END = "。！？!?\n"
+
+# 温度为该值时保持模板原有的随机分布
+NEUTRAL_TEMPERATURE = 0.5
+
+
+@lru_cache(maxsize=None)
+def _token_pattern():
+    # 大范围字符类编译需数毫秒，推迟到首次使用，不计入冷启动
+    return re.compile(_TOKEN_REGEX)
+
+
+def count_tokens(text):
+    """估算文本的token数"""
+    return sum(1 for _ in _token_pattern().finditer(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """截断到max_tokens以内，尽量在最后一个完整句子处结束"""
+    if not max_tokens:
+        return text
+    end = None
+    for index, match in enumerate(_token_pattern().finditer(text)):
+        if index == max_tokens:
+            end = match.start()
+            break
+    if end is None:
+        return text
+    cut = text[:end]
+    sentence_end = max(cut.rfind(mark) for mark in _SENTENCE_END)
+    if sentence_end >= len(cut) // 2:
+        cut = cut[:sentence_end + 1]
+    return cut.rstrip()
+
+
+class TemperatureRandom(object):
+    """按温度调整随机性的随机数来源
+
+    温度低于0.5时 choice 偏向候选列表靠前的项，温度越低越接近固定选择第一项；
+    random() 返回值按温度缩放，温度越高，"rng.random() < p" 形式的润色越容易触发
+    """
+
+    def __init__(self, rng, temperature):
+        self._rng = rng
+        self.temperature = max(0.01, float(temperature))
+        self._exponent = self.temperature / NEUTRAL_TEMPERATURE
+
+    def random(self):
+        return self._rng.random() ** self._exponent
+
+    def choice(self, seq):
+        if self.temperature >= NEUTRAL_TEMPERATURE:
+            return self._rng.choice(seq)
+        skew = NEUTRAL_TEMPERATURE / self.temperature
+        return seq[min(len(seq) - 1, int(len(seq) * self._rng.random() ** skew))]
+
+    def uniform(self, a, b):
+        return self._rng.uniform(a, b)
+
+
+def tempered(rng, temperature):
+    """按温度包装随机数来源，未指定温度时原样返回"""
+    if temperature is None:
+        return rng
+    return TemperatureRandom(rng, temperature)
+
+
+class GenerationBackend(object):
+    """生成后端接口：返回指定品牌与创作类型的正文"""
+
+    name = None
+
+    def generate(self, brand_data, creation_type, prompt, brand_context, rng):
+        raise NotImplementedError
+
+
+class TemplateBackend(GenerationBackend):
+    """模板生成器（默认后端）
+
+    render  fn(brand_data, creation_type, prompt, brand_context, rng) -> 正文
+    """
+
+    name = "template"
+
+    def __init__(self, render):
+        self.render = render
+
+    def generate(self, brand_data, creation_type, prompt, brand_context, rng):
+        return self.render(brand_data, creation_type, prompt, brand_context, rng)
+
+
+class StandInBackend(GenerationBackend):
+    """本地替身后端：按配置的耗时等待后由内部后端生成，用于容量测试
+
+    等待时长在 [min_latency, max_latency] 间均匀取值，不消耗请求的随机数来源，
+    指定seed时生成内容与内部后端一致
+    """
+
+    name = "standin"
+
+    def __init__(self, inner, min_latency=1.0, max_latency=None, sleep=time.sleep):
+        self.inner = inner
+        self.min_latency = max(0.0, float(min_latency))
+        self.max_latency = max(self.min_latency, float(max_latency if max_latency is not None else min_latency))
+        self._sleep = sleep
+        self._random = random.Random()
+
+    def generate(self, brand_data, creation_type, prompt, brand_context, rng):
+        self._sleep(self._random.uniform(self.min_latency, self.max_latency))
+        return self.inner.generate(brand_data, creation_type, prompt, brand_context, rng)
+
+
+class ModelBusyError(Exception):
+    """模型并发池已满且等待超时"""
+
+    def __init__(self, model_id, retry_after=1.0):
+        Exception.__init__(self, f"模型 {model_id} 当前繁忙")
+        self.model_id = model_id
+        self.retry_after = retry_after
+
+
+class ModelRoute(object):
+    """单个模型的生成后端、参数约束与并发池
+
+    max_tokens         输出token上限，None表示不限
+    temperature_range  (最小, 最大)，None表示不校验
+    concurrency        同时生成的请求数上限，0表示不限
+    wait_timeout       并发池已满时的最长等待秒数
+    """
+
+    def __init__(self, model_id, backend, max_tokens=None, temperature_range=None,
+                 concurrency=0, wait_timeout=5.0):
+        self.model_id = model_id
+        self.backend = backend
+        self.max_tokens = max_tokens
+        self.temperature_range = tuple(temperature_range) if temperature_range else None
+        self.concurrency = max(0, int(concurrency))
+        self.wait_timeout = float(wait_timeout)
+        self._semaphore = threading.BoundedSemaphore(self.concurrency) if self.concurrency else None
+        self._lock = threading.Lock()
+        self.active = 0
+        self.rejected = 0
+
+    @property
+    def default_temperature(self):
+        """未指定温度时取模型温度范围的中点"""
+        if self.temperature_range is None:
+            return None
+        low, high = self.temperature_range
+        return round((low + high) / 2, 4)
+
+    def resolve_temperature(self, value):
+        """校验请求的温度，未指定时返回默认温度；超出模型范围时抛出ValueError"""
+        if value is None:
+            return self.default_temperature
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("temperature必须是数字")
+        if self.temperature_range is not None:
+            low, high = self.temperature_range
+            if not low <= value <= high:
+                raise ValueError(f"模型 {self.model_id} 的temperature范围为 {low}~{high}")
+        return float(value)
+
+    def resolve_max_tokens(self, value):
+        """请求的输出上限与模型上限取较小值；非正整数时抛出ValueError"""
+        if value is None:
+            return self.max_tokens
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            raise ValueError("maxTokens必须是正整数")
+        return min(value, self.max_tokens) if self.max_tokens else value
+
+    def generate(self, brand_data, creation_type, prompt, brand_context, rng, max_tokens=None):
+        """调用后端生成正文并截断到输出预算内"""
+        content = self.backend.generate(brand_data, creation_type, prompt, brand_context, rng)
+        return truncate_to_tokens(content, max_tokens or self.max_tokens)
+
+    def slot(self):
+        """占用模型并发池的一个位置"""
+        return _RouteSlot(self)
+
+    def async_slot(self):
+        """在协程中占用模型并发池的一个位置，等待期间不阻塞事件循环"""
+        return _AsyncRouteSlot(self)
+
+    def _acquire(self):
+        if self._semaphore is not None and not self._semaphore.acquire(timeout=self.wait_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise ModelBusyError(self.model_id)
+        with self._lock:
+            self.active += 1
+
+    async def _acquire_async(self):
+        # 与同步模式共用同一信号量：非阻塞尝试，失败时按指数退避让出事件循环直到超时
+        if self._semaphore is not None and not self._semaphore.acquire(blocking=False):
+            import asyncio
+            deadline = time.monotonic() + self.wait_timeout
+            delay = 0.005
+            while not self._semaphore.acquire(blocking=False):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._lock:
+                        self.rejected += 1
+                    raise ModelBusyError(self.model_id)
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.1)
+        with self._lock:
+            self.active += 1
+
+    def _release(self):
+        with self._lock:
+            self.active -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "maxTokens": self.max_tokens,
+            "temperatureRange": list(self.temperature_range) if self.temperature_range else None,
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "rejected": self.rejected,
+        }
+
+
+class _RouteSlot(object):
+    __slots__ = ("route",)
+
+    def __init__(self, route):
+        self.route = route
+
+    def __enter__(self):
+        self.route._acquire()
+        return self.route
+
+    def __exit__(self, *exc):
+        self.route._release()
+
+
+class _AsyncRouteSlot(object):
+    __slots__ = ("route",)
+
+    def __init__(self, route):
+        self.route = route
+
+    async def __aenter__(self):
+        await self.route._acquire_async()
+        return self.route
+
+    async def __aexit__(self, *exc):
+        self.route._release()
+
+
+class ModelRouter(object):
+    """按模型ID选择生成路由，未登记的模型使用默认路由"""
+
+    def __init__(self, default_route, routes=()):
+        self.default_route = default_route
+        self.routes = {route.model_id: route for route in routes}
+
+    def route(self, model_id):
+        return self.routes.get(model_id, self.default_route)
+
+    def __contains__(self, model_id):
+        return model_id in self.routes
+
+    def stats(self):
+        stats = {model_id: route.stats() for model_id, route in self.routes.items()}
+        stats["default"] = self.default_route.stats()
+        return stats
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON序列化层
+优先使用已安装的高速编码器（orjson / ujson），否则回退到标准库；输出不转义的UTF-8
+"""
+
+import json
+import os
+from datetime import date, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # 可选依赖
+    ujson = None
+
+BACKENDS = ("orjson", "ujson", "json")
+
+
+def available_backends():
+    """当前环境可用的编码器"""
+    installed = {"orjson": orjson is not None, "ujson": ujson is not None, "json": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def select_backend(name=None):
+    """选择编码器：指定名称不可用时回退到标准库，auto按性能优先"""
+    name = (name or os.environ.get("AI_JSON_BACKEND", "auto")).lower()
+    available = available_backends()
+    if name == "auto":
+        return available[0]
+    return name if name in available else "json"
+
+
+def _default(obj):
+    """序列化结果对象及Flask默认支持的类型
+
+    日期时间统一输出ISO 8601（与orjson内置格式相同），不使用Flask默认的HTTP日期格式，
+    保证不同编码器输出一致
+    """
+    to_dict = getattr(obj, "to_dict", None)
+    if callable(to_dict):
+        return to_dict()
+    if isinstance(obj, (date, time)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+def make_dumps_bytes(backend):
+    """返回 obj -> UTF-8 bytes 的紧凑编码函数"""
+    if backend == "orjson":
+        option = orjson.OPT_NON_STR_KEYS
+
+        def dumps_bytes(obj):
+            return orjson.dumps(obj, default=_default, option=option)
+    elif backend == "ujson":
+        def dumps_bytes(obj):
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False,
+                               default=_default).encode("utf-8")
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+
+        def dumps_bytes(obj):
+            return encoder.encode(obj).encode("utf-8")
+    return dumps_bytes
+
+
+def make_loads(backend):
+    """返回解析函数"""
+    if backend == "orjson":
+        return orjson.loads
+    if backend == "ujson":
+        return ujson.loads
+    return json.loads
+
+
+BACKEND = select_backend()
+dumps_bytes = make_dumps_bytes(BACKEND)
+
+
+def dumps(obj):
+    """编码为str"""
+    return dumps_bytes(obj).decode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON提供器：jsonify直接写入编码后的字节，不做ASCII转义"""
+
+    ensure_ascii = False
+    sort_keys = False
+    backend = BACKEND
+
+    def __init__(self, app):
+        DefaultJSONProvider.__init__(self, app)
+        self._dumps_bytes = make_dumps_bytes(self.backend)
+        self._loads = make_loads(self.backend)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+            return json.dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return self._loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多关键词匹配器（Aho–Corasick自动机）
+词汇表预编译为自动机，一次扫描文本即可得到全部命中词及位置
+"""
+
+from collections import deque
+
+
+class KeywordMatcher(object):
+    """多模式匹配自动机
+
+    terms        词汇列表，重复词只保留一次
+    ignore_case  匹配前是否将文本转为小写（词汇同样转为小写）
+    """
+
+    def __init__(self, terms, ignore_case=True):
+        self.ignore_case = ignore_case
+        self.terms = tuple(dict.fromkeys(t for t in terms if t))
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for index, term in enumerate(self.terms):
+            self._add(term.lower() if ignore_case else term, index)
+        self._build()
+
+    def _add(self, term, index):
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (index,)
+
+    def _build(self):
+        # 广度优先建立失败指针，并把后缀状态的输出合并到当前状态
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text):
+        """依次产出 (起始位置, 词)"""
+        if self.ignore_case:
+            text = text.lower()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        terms = self.terms
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                for index in output[state]:
+                    term = terms[index]
+                    yield pos - len(term) + 1, term
+
+    def find_all(self, text):
+        """全部命中 [(起始位置, 词), ...]"""
+        return list(self.iter_matches(text))
+
+    def counts(self, text):
+        """各命中词的出现次数"""
+        result = {}
+        for _, term in self.iter_matches(text):
+            result[term] = result.get(term, 0) + 1
+        return result
+
+    def positions(self, text):
+        """各命中词的起始位置列表"""
+        result = {}
+        for pos, term in self.iter_matches(text):
+            result.setdefault(term, []).append(pos)
+        return result
+
+    def hits(self, text):
+        """出现过的词集合"""
+        return frozenset(term for _, term in self.iter_matches(text))
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑数据模型
+品牌、AI模型与创作结果的不可变记录类型，使用__slots__减少内存，分类等重复字符串做驻留
+"""
+
+import sys
+from datetime import datetime
+
+from json_provider import dumps_bytes
+
+# 取值范围有限、在大量记录间重复的字段，加载时驻留共享
+_INTERNED_BRAND_FIELDS = ("category", "status", "culturalValue", "craftsmanship", "founder")
+
+CHARACTERISTIC_KEYS = ("style", "tone", "complexity", "originality")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Record(object):
+    """不可变记录基类：JSON字段名与属性名一一对应，支持只读的字典式访问"""
+
+    __slots__ = ()
+    # (JSON字段名, 属性名)
+    FIELDS = ()
+    _KEY_TO_ATTR = {}
+
+    def __init__(self, **values):
+        for key, attr in self.FIELDS:
+            object.__setattr__(self, attr, values.get(attr))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} 不可修改")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} 不可修改")
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(**{attr: data.get(key) for key, attr in cls.FIELDS})
+
+    def __getitem__(self, key):
+        attr = self._KEY_TO_ATTR.get(key)
+        value = getattr(self, attr) if attr else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        attr = self._KEY_TO_ATTR.get(key)
+        value = getattr(self, attr) if attr else None
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def keys(self):
+        return [key for key, attr in self.FIELDS if getattr(self, attr) is not None]
+
+    def to_dict(self):
+        result = {}
+        for key, attr in self.FIELDS:
+            value = getattr(self, attr)
+            if value is not None:
+                result[key] = list(value) if isinstance(value, tuple) else value
+        return result
+
+    def to_json(self):
+        return dumps_bytes(self.to_dict())
+
+    def replace(self, **changes):
+        """返回修改部分字段后的新记录"""
+        values = {attr: getattr(self, attr) for _, attr in self.FIELDS}
+        values.update(changes)
+        return type(self)(**values)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for _, attr in self.FIELDS)
+
+    def __hash__(self):
+        return hash((type(self).__name__, getattr(self, self.FIELDS[0][1])))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({getattr(self, self.FIELDS[0][1])!r})"
+
+
+def _record_fields(fields):
+    return tuple(fields), {key: attr for key, attr in fields}
+
+
+class Brand(_Record):
+    """品牌记录"""
+
+    FIELDS, _KEY_TO_ATTR = _record_fields([
+        ("id", "id"),
+        ("name", "name"),
+        ("description", "description"),
+        ("category", "category"),
+        ("establishmentYear", "establishment_year"),
+        ("founder", "founder"),
+        ("specialty", "specialty"),
+        ("imageUrl", "image_url"),
+        ("status", "status"),
+        ("rating", "rating"),
+        ("storyCount", "story_count"),
+        ("followerCount", "follower_count"),
+        ("culturalValue", "cultural_value"),
+        ("craftsmanship", "craftsmanship"),
+    ])
+    __slots__ = tuple(attr for _, attr in FIELDS)
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        values = {attr: data.get(key) for key, attr in cls.FIELDS}
+        for key in _INTERNED_BRAND_FIELDS:
+            attr = cls._KEY_TO_ATTR[key]
+            values[attr] = _intern(values[attr])
+        return cls(**values)
+
+    def info(self):
+        """创作结果中的品牌摘要"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category": self.category,
+            "culturalValue": self.cultural_value or ""
+        }
+
+
+class AIModel(_Record):
+    """AI模型配置记录"""
+
+    FIELDS, _KEY_TO_ATTR = _record_fields([
+        ("id", "id"),
+        ("name", "name"),
+        ("type", "type"),
+        ("description", "description"),
+        ("status", "status"),
+        ("capabilities", "capabilities"),
+        ("max_tokens", "max_tokens"),
+        ("temperature_range", "temperature_range"),
+    ])
+    __slots__ = tuple(attr for _, attr in FIELDS)
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        values = {attr: data.get(key) for key, attr in cls.FIELDS}
+        values["type"] = _intern(values["type"])
+        values["status"] = _intern(values["status"])
+        for attr in ("capabilities", "temperature_range"):
+            if values[attr] is not None:
+                values[attr] = tuple(_intern(v) for v in values[attr])
+        return cls(**values)
+
+
+class CreationResult(_Record):
+    """创作结果记录
+
+    品牌信息以 Brand 引用保存，缓存大量结果时不重复复制品牌字段；
+    列表字段保存为元组，内容特征保存为按 CHARACTERISTIC_KEYS 排列的元组
+    """
+
+    FIELDS, _KEY_TO_ATTR = _record_fields([
+        ("taskId", "task_id"),
+        ("status", "status"),
+        ("processingTime", "processing_time"),
+        ("title", "title"),
+        ("content", "content"),
+        ("summary", "summary"),
+        ("type", "creation_type"),
+        ("aiModel", "ai_model"),
+        ("confidence", "confidence"),
+        ("tags", "tags"),
+        ("keywords", "keywords"),
+        ("readingTime", "reading_time"),
+        ("wordCount", "word_count"),
+        ("characteristics", "characteristics"),
+        ("suggestions", "suggestions"),
+        ("relatedTopics", "related_topics"),
+        ("brand", "brand"),
+        ("createTime", "create_time"),
+        ("qualityScore", "quality_score"),
+        ("originalityScore", "originality_score"),
+        # MinHash指纹（bytes），只用于持久化与去重，不输出
+        ("fingerprint", "fingerprint"),
+    ])
+    __slots__ = tuple(attr for _, attr in FIELDS)
+
+    # 输出时放在 "result" 下的字段
+    _RESULT_FIELDS = (
+        ("title", "title"), ("content", "content"), ("summary", "summary"),
+        ("type", "creation_type"), ("aiModel", "ai_model"), ("confidence", "confidence"),
+        ("tags", "tags"), ("keywords", "keywords"), ("readingTime", "reading_time"),
+        ("wordCount", "word_count"), ("characteristics", "characteristics"),
+        ("suggestions", "suggestions"), ("relatedTopics", "related_topics"),
+    )
+
+    @classmethod
+    def create(cls, **values):
+        """从生成流程的输出构造记录"""
+        for attr in ("tags", "keywords", "suggestions", "related_topics"):
+            values[attr] = tuple(values[attr])
+        characteristics = values["characteristics"]
+        if isinstance(characteristics, dict):
+            values["characteristics"] = tuple(characteristics[k] for k in CHARACTERISTIC_KEYS)
+        values["creation_type"] = _intern(values["creation_type"])
+        values["ai_model"] = _intern(values["ai_model"])
+        values.setdefault("status", "COMPLETED")
+        values.setdefault("processing_time", 0.0)
+        values.setdefault("create_time", datetime.now())
+        return cls(**values)
+
+    def result_dict(self, include_content=True):
+        """"result" 部分"""
+        result = {}
+        for key, attr in self._RESULT_FIELDS:
+            if key == "content" and not include_content:
+                continue
+            value = getattr(self, attr)
+            if attr == "characteristics":
+                value = dict(zip(CHARACTERISTIC_KEYS, value))
+            elif isinstance(value, tuple):
+                value = list(value)
+            result[key] = value
+        return result
+
+    def to_dict(self, include_content=True):
+        """API响应结构"""
+        create_time = self.create_time
+        return {
+            "taskId": self.task_id,
+            "status": self.status,
+            "processingTime": self.processing_time,
+            "result": self.result_dict(include_content),
+            "brandInfo": self.brand.info(),
+            "createTime": create_time.isoformat() if isinstance(create_time, datetime) else create_time,
+            "qualityScore": self.quality_score,
+            "originalityScore": self.originality_score
+        }
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+近似重复检测
+按字符n-gram计算MinHash指纹，用LSH分段索引查找相似的历史结果，
+相似度为两段内容n-gram集合Jaccard系数的估计值
+"""
+
+import hashlib
+import re
+import struct
+import threading
+from array import array
+from functools import lru_cache
+
+# 指纹长度（哈希函数个数）与LSH分段：32 = 8段 × 每段4个值
+NUM_PERM = 32
+BANDS = 8
+SHINGLE_SIZE = 3
+
+_WHITESPACE = re.compile(r'\s+')
+_unpack = struct.Struct(f"<{NUM_PERM}I").unpack
+
+
+@lru_cache(maxsize=65536)
+def _shingle_hashes(shingle):
+    # 一次SHAKE摘要得到NUM_PERM个相互独立的32位哈希值；模板输出大量共用n-gram，按n-gram缓存
+    return hashlib.shake_128(shingle.encode("utf-8")).digest(NUM_PERM * 4)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """去除空白后的字符n-gram集合"""
+    text = _WHITESPACE.sub("", text or "")
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def signature(text):
+    """计算MinHash指纹，返回NUM_PERM个32位整数的元组"""
+    grams = shingles(text)
+    if not grams:
+        return (0xFFFFFFFF,) * NUM_PERM
+    return tuple(map(min, zip(*[_unpack(_shingle_hashes(gram)) for gram in grams])))
+
+
+def similarity(sig_a, sig_b):
+    """两个指纹的Jaccard相似度估计"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / float(len(sig_a))
+
+
+def to_bytes(sig):
+    """指纹序列化，用于持久化"""
+    return array("I", sig).tobytes()
+
+
+def from_bytes(data):
+    values = array("I")
+    values.frombytes(data)
+    return tuple(values)
+
+
+class NearDuplicateIndex(object):
+    """MinHash LSH索引
+
+    指纹按BANDS段分桶，任一段完全相同即为候选，再按完整指纹估算相似度；
+    Jaccard为0.8的两段内容成为候选的概率约98.5%，0.3时约6%。
+    最多保存capacity个不同指纹，超出后淘汰最早加入的；与已有指纹完全相同的不重复保存。
+
+    group 用于限定比较范围（如品牌ID），为None时与全部指纹比较
+    """
+
+    def __init__(self, capacity=100000, bands=BANDS, max_candidates=256):
+        if NUM_PERM % bands:
+            raise ValueError("bands必须整除指纹长度")
+        self.capacity = max(1, int(capacity))
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        # 环形缓冲：第seq个指纹保存在 seq % capacity 位置，写满前按需增长
+        self._signatures = array("I")
+        self._seqs = array("q")
+        self._groups = []
+        self._next_seq = 0
+        # 每段一个 {段哈希: seq 或 [seq, ...]}
+        self._buckets = [{} for _ in range(bands)]
+        self.duplicates = 0
+
+    def __len__(self):
+        return min(self._next_seq, self.capacity)
+
+    def _band_keys(self, sig):
+        rows = self.rows
+        return [hash(sig[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+
+    def _signature_at(self, pos):
+        start = pos * NUM_PERM
+        return self._signatures[start:start + NUM_PERM]
+
+    def _candidates_locked(self, keys, group):
+        """候选位置（去除已淘汰与不同分组的条目），新加入的优先"""
+        seen = set()
+        capacity = self.capacity
+        for bucket, key in zip(self._buckets, keys):
+            entry = bucket.get(key)
+            if entry is None:
+                continue
+            for seq in ((entry,) if isinstance(entry, int) else reversed(entry)):
+                if seq in seen:
+                    continue
+                seen.add(seq)
+                pos = seq % capacity
+                if self._seqs[pos] != seq:
+                    continue
+                if group is not None and self._groups[pos] != group:
+                    continue
+                yield pos
+                if len(seen) >= self.max_candidates:
+                    return
+
+    def _best_locked(self, sig, keys, group):
+        best, best_pos = 0.0, None
+        for pos in self._candidates_locked(keys, group):
+            score = similarity(sig, self._signature_at(pos))
+            if score > best:
+                best, best_pos = score, pos
+                if score == 1.0:
+                    break
+        return best, best_pos
+
+    def nearest(self, sig, group=None):
+        """已保存指纹中与sig的最高相似度，无候选时为0.0"""
+        keys = self._band_keys(sig)
+        with self._lock:
+            return self._best_locked(sig, keys, group)[0]
+
+    def add(self, sig, group=None):
+        """加入指纹，已存在完全相同的指纹时不重复保存，返回加入前的最高相似度"""
+        keys = self._band_keys(sig)
+        with self._lock:
+            best, _ = self._best_locked(sig, keys, group)
+            if best == 1.0:
+                self.duplicates += 1
+                return best
+            seq = self._next_seq
+            self._next_seq += 1
+            pos = seq % self.capacity
+            if pos == len(self._seqs):
+                self._signatures.extend(sig)
+                self._seqs.append(seq)
+                self._groups.append(group)
+            else:
+                self._unlink_locked(self._seqs[pos], self._band_keys(tuple(self._signature_at(pos))))
+                start = pos * NUM_PERM
+                self._signatures[start:start + NUM_PERM] = array("I", sig)
+                self._seqs[pos] = seq
+                self._groups[pos] = group
+            for bucket, key in zip(self._buckets, keys):
+                entry = bucket.get(key)
+                if entry is None:
+                    bucket[key] = seq
+                elif isinstance(entry, int):
+                    bucket[key] = [entry, seq]
+                else:
+                    entry.append(seq)
+            return best
+
+    def _unlink_locked(self, seq, keys):
+        # 被淘汰的总是最早加入的，位于各桶列表头部
+        for bucket, key in zip(self._buckets, keys):
+            entry = bucket.get(key)
+            if entry == seq:
+                del bucket[key]
+            elif isinstance(entry, list) and seq in entry:
+                entry.remove(seq)
+                if len(entry) == 1:
+                    bucket[key] = entry[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self),
+                "capacity": self.capacity,
+                "duplicates": self.duplicates,
+                "bands": self.bands,
+                "numPerm": NUM_PERM,
+            }
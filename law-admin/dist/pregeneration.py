@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预生成结果池
+按键保存后台预先生成的创作结果，请求到来时直接取用；数量低于水位时由后台线程补充，
+优先补充请求最频繁的键，全部结果占用的内存不超过预算
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class PregenerationPool(object):
+    """按键预先生成的结果池
+
+    produce(key)    生成一个结果，在后台线程中调用
+    size(result)    估算一个结果占用的字节数
+    capacity        每个键最多保存的结果数
+    low_watermark   剩余数量低于此值时后台补充到capacity
+    memory_budget   全部结果占用的字节上限，超出时先淘汰最冷键的结果
+    workers         后台生成线程数，首次需要补充时启动
+    half_life       请求热度的半衰期（秒）
+    max_keys        跟踪热度的键数上限，超出时丢弃最冷的键
+    """
+
+    def __init__(self, produce, size, capacity=4, low_watermark=2, memory_budget=32 * 1024 * 1024,
+                 workers=1, half_life=300.0, max_keys=1024, enabled=True, clock=time.monotonic):
+        self.produce = produce
+        self.size = size
+        self.capacity = max(1, int(capacity))
+        self.low_watermark = min(max(1, int(low_watermark)), self.capacity)
+        self.memory_budget = max(0, int(memory_budget))
+        self.workers = max(1, int(workers))
+        self.half_life = float(half_life)
+        self.max_keys = max(1, int(max_keys))
+        self.enabled = enabled and self.memory_budget > 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._items = {}
+        # 键 -> (热度, 更新时间)，热度按半衰期衰减
+        self._heat = {}
+        self._wanted = set()
+        self._threads = []
+        self._stopped = False
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.evicted = 0
+        self.failures = 0
+
+    def take(self, key):
+        """取出一个预生成结果，没有时返回None；同时记录请求热度并按需触发补充"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._touch(key)
+            items = self._items.get(key)
+            result = None
+            if items:
+                result, size = items.popleft()
+                self.bytes -= size
+                self.hits += 1
+            else:
+                self.misses += 1
+            if len(items or ()) < self.low_watermark and key not in self._wanted:
+                self._wanted.add(key)
+                self._start_workers()
+                self._wakeup.notify()
+            return result
+
+    def _heat_of(self, key, now):
+        score, updated = self._heat.get(key, (0.0, now))
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def _touch(self, key):
+        now = self._clock()
+        if key not in self._heat and len(self._heat) >= self.max_keys:
+            self._drop_key(min(self._heat, key=lambda k: self._heat_of(k, now)))
+        self._heat[key] = (self._heat_of(key, now) + 1.0, now)
+
+    def _drop_key(self, key):
+        for _, size in self._items.pop(key, ()):
+            self.bytes -= size
+            self.evicted += 1
+        self._heat.pop(key, None)
+        self._wanted.discard(key)
+
+    def _start_workers(self):
+        # 延迟到首次需要补充时启动，多进程服务不会在fork前启动线程
+        if self._threads or self._stopped:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"pregeneration-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_key(self):
+        """待补充的键中热度最高的一个"""
+        if not self._wanted:
+            return None
+        now = self._clock()
+        return max(self._wanted, key=lambda k: self._heat_of(k, now))
+
+    def _run(self):
+        while True:
+            with self._lock:
+                key = self._next_key()
+                while key is None and not self._stopped:
+                    self._wakeup.wait()
+                    key = self._next_key()
+                if self._stopped:
+                    return
+                # 同一键由一个线程补充，补充期间其他线程处理别的键
+                self._wanted.discard(key)
+            try:
+                result = self.produce(key)
+                size = self.size(result)
+            except Exception:
+                # 失败后不立即重试，等下次请求再触发补充
+                with self._lock:
+                    self.failures += 1
+                continue
+            with self._lock:
+                if self._store(key, result, size) and len(self._items[key]) < self.capacity:
+                    self._wanted.add(key)
+                    self._wakeup.notify()
+
+    def _store(self, key, result, size):
+        """加入结果池，必要时淘汰比该键更冷的键的结果；返回是否加入"""
+        if key not in self._heat:
+            return False
+        items = self._items.setdefault(key, deque())
+        if len(items) >= self.capacity:
+            return False
+        now = self._clock()
+        heat = self._heat_of(key, now)
+        while self.bytes + size > self.memory_budget:
+            colder = [k for k, v in self._items.items() if v and k != key and self._heat_of(k, now) < heat]
+            if not colder:
+                return False
+            coldest = min(colder, key=lambda k: self._heat_of(k, now))
+            _, evicted_size = self._items[coldest].pop()
+            self.bytes -= evicted_size
+            self.evicted += 1
+        items.append((result, size))
+        self.bytes += size
+        self.generated += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._wanted.clear()
+            self.bytes = 0
+
+    def shutdown(self):
+        """停止后台线程，正在生成的结果完成后丢弃"""
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify_all()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            now = self._clock()
+            hottest = sorted(self._heat, key=lambda k: -self._heat_of(k, now))[:10]
+            return {
+                "enabled": self.enabled,
+                "keys": len(self._heat),
+                "ready": sum(len(items) for items in self._items.values()),
+                "bytes": self.bytes,
+                "memoryBudget": self.memory_budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "generated": self.generated,
+                "evicted": self.evicted,
+                "failures": self.failures,
+                "hottest": [
+                    {"key": list(k), "heat": round(self._heat_of(k, now), 2), "ready": len(self._items.get(k, ()))}
+                    for k in hottest
+                ],
+            }
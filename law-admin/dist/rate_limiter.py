@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+创作接口准入控制
+按客户端（API Key或IP）的令牌桶限速与并发数上限，限额可按AI模型配置；
+状态保存在可替换的存储中：进程内存，或多进程共享的本地SQLite文件
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+
+# 并发槽位的租约秒数，持有进程异常退出时到期自动回收（仅SQLite存储）
+DEFAULT_SLOT_LEASE = 300.0
+
+REASON_RATE = "rate"
+REASON_CONCURRENCY = "concurrency"
+
+
+class RateLimitExceeded(Exception):
+    """请求超出限额"""
+
+    def __init__(self, reason, retry_after, limit):
+        Exception.__init__(self, reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.limit = limit
+
+    @property
+    def retry_after_header(self):
+        """Retry-After响应头的整数秒"""
+        return str(max(1, int(math.ceil(self.retry_after))))
+
+
+class RateLimit(object):
+    """一组限额：每秒补充的令牌数、桶容量与并发上限"""
+
+    __slots__ = ("rate", "burst", "concurrency")
+
+    def __init__(self, rate, burst, concurrency):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.concurrency = max(1, int(concurrency))
+
+    @classmethod
+    def from_dict(cls, data, default):
+        return cls(
+            data.get("rate", default.rate),
+            data.get("burst", default.burst),
+            data.get("concurrency", default.concurrency)
+        )
+
+    def to_dict(self):
+        return {"rate": self.rate, "burst": self.burst, "concurrency": self.concurrency}
+
+
+class MemoryRateLimitStore(object):
+    """进程内存储，单进程部署使用"""
+
+    name = "memory"
+
+    # 每处理多少次请求清理一次已回满的空闲令牌桶
+    PRUNE_EVERY = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._slots = {}
+        self._ops = 0
+
+    def consume(self, key, rate, burst, cost=1.0):
+        """从令牌桶取出cost个令牌，返回 (是否成功, 剩余令牌, 需等待秒数)"""
+        now = time.monotonic()
+        with self._lock:
+            self._ops += 1
+            if self._ops % self.PRUNE_EVERY == 0:
+                self._prune_locked(now)
+            tokens, last = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return True, tokens - cost, 0.0
+            self._buckets[key] = (tokens, now)
+        return False, tokens, (cost - tokens) / rate if rate > 0 else float("inf")
+
+    def _prune_locked(self, now):
+        # 只记录了时间与数量，无法知道各桶的速率；一小时未访问的桶视为已回满
+        idle = [key for key, (_, last) in self._buckets.items() if now - last > 3600]
+        for key in idle:
+            del self._buckets[key]
+
+    def acquire(self, key, limit, lease=DEFAULT_SLOT_LEASE):
+        """占用一个并发槽位，已达上限时返回None"""
+        with self._lock:
+            count = self._slots.get(key, 0)
+            if count >= limit:
+                return None
+            self._slots[key] = count + 1
+        return key
+
+    def release(self, key, slot):
+        """释放并发槽位"""
+        with self._lock:
+            count = self._slots.get(key, 0) - 1
+            if count > 0:
+                self._slots[key] = count
+            else:
+                self._slots.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "store": self.name,
+                "buckets": len(self._buckets),
+                "activeClients": len(self._slots),
+                "activeRequests": sum(self._slots.values()),
+            }
+
+
+class SQLiteRateLimitStore(object):
+    """本地SQLite文件存储，同一主机上的多个worker进程共享限额"""
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connect()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        # fork后的子进程不能复用父进程的连接
+        if conn is None or self._local.pid != os.getpid():
+            import sqlite3  # 延迟导入：只有SQLite存储需要
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_slots ("
+                "slot TEXT PRIMARY KEY, key TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS rate_slots_key ON rate_slots (key, expires)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def consume(self, key, rate, burst, cost=1.0):
+        """从令牌桶取出cost个令牌，返回 (是否成功, 剩余令牌, 需等待秒数)"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, last = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - last) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if allowed:
+            return True, tokens, 0.0
+        return False, tokens, (cost - tokens) / rate if rate > 0 else float("inf")
+
+    def acquire(self, key, limit, lease=DEFAULT_SLOT_LEASE):
+        """占用一个并发槽位，已达上限时返回None"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM rate_slots WHERE key = ? AND expires <= ?", (key, now))
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM rate_slots WHERE key = ?", (key,)
+            ).fetchone()
+            slot = None
+            if count < limit:
+                slot = os.urandom(16).hex()
+                conn.execute(
+                    "INSERT INTO rate_slots (slot, key, expires) VALUES (?, ?, ?)",
+                    (slot, key, now + lease)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return slot
+
+    def release(self, key, slot):
+        """释放并发槽位"""
+        self._connect().execute("DELETE FROM rate_slots WHERE slot = ?", (slot,))
+
+    def stats(self):
+        conn = self._connect()
+        (buckets,) = conn.execute("SELECT COUNT(*) FROM rate_buckets").fetchone()
+        clients, active = conn.execute(
+            "SELECT COUNT(DISTINCT key), COUNT(*) FROM rate_slots WHERE expires > ?", (time.time(),)
+        ).fetchone()
+        return {
+            "store": self.name,
+            "path": self.path,
+            "buckets": buckets,
+            "activeClients": clients,
+            "activeRequests": active,
+        }
+
+
+def create_store(spec):
+    """按配置创建存储："memory" 或 "sqlite:<文件路径>" """
+    spec = (spec or "memory").strip()
+    if spec == "memory":
+        return MemoryRateLimitStore()
+    if spec.startswith("sqlite:"):
+        path = spec[len("sqlite:"):]
+        if path.startswith("//"):
+            path = path[2:]
+        return SQLiteRateLimitStore(path)
+    raise ValueError(f"不支持的限流存储: {spec}")
+
+
+def api_key_digest(api_key):
+    """API Key的摘要，限流存储与指标中只保存摘要"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:24]
+
+
+def client_key(request, api_keys=frozenset()):
+    """客户端标识：已配置的API Key（api_keys 为其摘要集合）按Key计量，否则使用来源IP
+
+    未配置的Key不单独计量，避免每次请求换一个Key绕过限流
+    """
+    api_key = request.headers.get("X-API-Key")
+    if not api_key:
+        auth = request.headers.get("Authorization", "")
+        if auth[:7].lower() == "bearer ":
+            api_key = auth[7:].strip()
+    if api_key and api_keys:
+        digest = api_key_digest(api_key)
+        if digest in api_keys:
+            return "key:" + digest
+    return "ip:" + (request.remote_addr or "unknown")
+
+
+class Admission(object):
+    """一次已准入的请求，处理结束后调用release释放并发槽位（可重复调用）"""
+
+    __slots__ = ("_store", "_key", "_slot", "_lock")
+
+    def __init__(self, store=None, key=None, slot=None):
+        self._store = store
+        self._key = key
+        self._slot = slot
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            slot, self._slot = self._slot, None
+        if slot is not None:
+            self._store.release(self._key, slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class RateLimiter(object):
+    """令牌桶限速与并发上限
+
+    令牌桶按 (客户端, 模型) 计量，限额取该模型的配置，未配置的模型共用默认限额与默认桶；
+    并发槽位按客户端计量，上限取本次请求模型的配置
+    """
+
+    def __init__(self, store, default, model_limits=None, slot_lease=DEFAULT_SLOT_LEASE):
+        self.store = store
+        self.default = default
+        self.model_limits = dict(model_limits or {})
+        self.slot_lease = slot_lease
+
+    def limit_for(self, ai_model):
+        """返回 (桶名称, 限额)"""
+        limit = self.model_limits.get(ai_model)
+        if limit is None:
+            return "default", self.default
+        return ai_model, limit
+
+    def admit(self, client, ai_model, cost=1):
+        """准入检查，超限时抛出RateLimitExceeded；超过桶容量的请求按容量计费"""
+        bucket, limit = self.limit_for(ai_model)
+        slot = self.store.acquire(client, limit.concurrency, self.slot_lease)
+        if slot is None:
+            raise RateLimitExceeded(REASON_CONCURRENCY, 1.0, limit)
+        admission = Admission(self.store, client, slot)
+        try:
+            allowed, _, retry_after = self.store.consume(
+                f"{client}|{bucket}", limit.rate, limit.burst, min(float(cost), limit.burst)
+            )
+        except Exception:
+            admission.release()
+            raise
+        if not allowed:
+            admission.release()
+            raise RateLimitExceeded(REASON_RATE, retry_after, limit)
+        return admission
+
+    def stats(self):
+        stats = self.store.stats()
+        stats["default"] = self.default.to_dict()
+        stats["models"] = {name: limit.to_dict() for name, limit in self.model_limits.items()}
+        return stats
+
+
+# 关闭限流时使用的空准入
+NO_ADMISSION = Admission()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按请求抽样的性能剖析
+选中的请求在cProfile下执行，结果写入本地目录：.pstats 供 pstats/snakeviz 查看，
+.collapsed 为折叠调用栈（flamegraph.pl、speedscope 可直接读取，权重为微秒）；
+并保留最近剖析的请求及其耗时最多的函数，供排查延迟回退
+"""
+
+import hmac
+import os
+import random
+import threading
+import time
+from collections import deque
+
+
+def function_label(func):
+    """pstats 函数键 (文件, 行号, 函数名) 的显示名"""
+    filename, line, name = func
+    if filename == "~":
+        # 内置函数，如 <built-in method time.sleep>
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def top_functions(stats, limit=10):
+    """按自身耗时排列的函数，附调用次数与累计耗时（毫秒）"""
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:limit]
+    return [
+        {
+            "function": function_label(func),
+            "calls": nc,
+            "selfMs": round(tt * 1000.0, 3),
+            "cumulativeMs": round(ct * 1000.0, 3),
+        }
+        for func, (cc, nc, tt, ct, callers) in rows
+    ]
+
+
+def collapsed_stacks(stats, max_depth=64, min_us=5.0):
+    """由 cProfile 调用图展开折叠调用栈 {"根;…;函数": 自身耗时微秒}
+
+    cProfile 只记录调用者到被调用者的边，同一函数被多处调用时按各调用者的累计耗时比例分摊
+    """
+    entries = stats.stats
+    callees = {}
+    for func, (cc, nc, tt, ct, callers) in entries.items():
+        for caller, (c_cc, c_nc, c_tt, c_ct) in callers.items():
+            callees.setdefault(caller, []).append((func, c_ct))
+    stacks = {}
+
+    def walk(func, path, scale, depth):
+        path = path + (function_label(func),)
+        weight = entries[func][2] * scale * 1e6
+        if weight >= min_us:
+            key = ";".join(path)
+            stacks[key] = stacks.get(key, 0.0) + weight
+        if depth >= max_depth:
+            return
+        for callee, edge_ct in callees.get(func, ()):
+            callee_ct = entries[callee][3]
+            # 跳过递归与可忽略的分支，避免调用图展开爆炸
+            if callee == func or not callee_ct or edge_ct * scale * 1e6 < min_us:
+                continue
+            walk(callee, path, scale * min(1.0, edge_ct / callee_ct), depth + 1)
+
+    for func, entry in entries.items():
+        if not entry[4]:
+            walk(func, (), 1.0, 0)
+    return stacks
+
+
+class RequestProfiler(object):
+    """抽样或凭令牌剖析请求
+
+    directory    剖析文件目录
+    sample_rate  随机剖析的请求比例，0表示只剖析带令牌的请求
+    token        请求头携带该令牌时强制剖析，同时是查看剖析列表的凭证；空表示不启用
+    keep         保留的剖析记录与文件数，超出时删除最早的
+    top          每条记录保留的函数数
+    同一时刻只剖析一个请求（cProfile 在3.12起全局只能有一个启用），其余请求照常处理
+    """
+
+    def __init__(self, directory, sample_rate=0.0, token="", keep=50, top=10):
+        self.directory = directory
+        self.sample_rate = max(0.0, min(1.0, float(sample_rate)))
+        self.token = token or ""
+        self.keep = max(1, int(keep))
+        self.top = max(1, int(top))
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+        self._records = deque()
+        self._sequence = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or bool(self.token)
+
+    def authorized(self, token):
+        """校验请求携带的令牌（按UTF-8字节比较，str 形式的 compare_digest 不接受非ASCII字符）"""
+        if not (self.token and token):
+            return False
+        return hmac.compare_digest(token.encode("utf-8", "surrogateescape"), self.token.encode("utf-8"))
+
+    def start(self, token=None):
+        """决定是否剖析当前请求，选中时返回已启用的 cProfile.Profile，否则返回None"""
+        if not (self.authorized(token) or (self.sample_rate and random.random() < self.sample_rate)):
+            return None
+        if not self._active.acquire(blocking=False):
+            self.skipped += 1
+            return None
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # 其他剖析工具已启用
+            self._active.release()
+            self.skipped += 1
+            return None
+        return profile
+
+    def abandon(self, profile):
+        """停止剖析但不保存，用于请求异常结束"""
+        profile.disable()
+        self._active.release()
+
+    def finish(self, profile, method, path, status, duration):
+        """停止剖析并写入文件，返回剖析记录"""
+        profile.disable()
+        self._active.release()
+        import pstats
+        stats = pstats.Stats(profile)
+        with self._lock:
+            self._sequence += 1
+            profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence}"
+        base = os.path.join(self.directory, profile_id)
+        os.makedirs(self.directory, exist_ok=True)
+        stats.dump_stats(base + ".pstats")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, weight in sorted(collapsed_stacks(stats).items()):
+                f.write(f"{stack} {int(round(weight))}\n")
+        record = {
+            "id": profile_id,
+            "method": method,
+            "path": path,
+            "status": status,
+            "durationMs": round(duration * 1000.0, 3),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "files": {"pstats": base + ".pstats", "collapsed": base + ".collapsed"},
+            "topFunctions": top_functions(stats, self.top),
+        }
+        with self._lock:
+            self._records.append(record)
+            expired = self._records.popleft() if len(self._records) > self.keep else None
+        if expired is not None:
+            for filename in expired["files"].values():
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+        return record
+
+    def slowest(self, limit=20):
+        """最近剖析的请求中耗时最长的limit个"""
+        with self._lock:
+            records = list(self._records)
+        return sorted(records, key=lambda record: -record["durationMs"])[:limit]
+
+    def stats(self):
+        with self._lock:
+            profiled = len(self._records)
+        return {
+            "sampleRate": self.sample_rate,
+            "tokenEnabled": bool(self.token),
+            "directory": self.directory,
+            "profiled": profiled,
+            "skipped": self.skipped,
+        }
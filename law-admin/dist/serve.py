@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生产环境服务入口
+多进程 + 多线程运行AI创作API，品牌数据、模板与模型配置在fork前加载，由各工作进程写时复制共享
+
+用法:
+    python serve.py --workers 4 --threads 8
+    python -m serve
+
+优先使用 gunicorn（需 pip install gunicorn，仅限类Unix系统），
+未安装时依次回退到 waitress（单进程多线程）与 Werkzeug 线程服务器。
+--server uvicorn 时运行ASGI版本（asgi_app.py，需 pip install uvicorn），
+等待中的创作不占用线程，threads 为执行生成与分析的线程数。
+
+注意：异步任务（?async=1）的结果保存在各工作进程内存中，多进程部署时轮询请求需要会话粘滞，
+或将 workers 设为1并通过 threads 扩展并发。
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+
+
+# 各服务实现不支持、运行时会忽略的命令行参数
+UNSUPPORTED_OPTIONS = {
+    # waitress 只有连接无活动超时（channel_timeout），由 --timeout 设置，空闲长连接也按它关闭
+    "waitress": ("keepalive", "graceful_timeout"),
+    "werkzeug": ("keepalive", "timeout", "graceful_timeout"),
+}
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def parse_args(argv=None):
+    """命令行参数，默认值读取环境变量"""
+    parser = argparse.ArgumentParser(description="津脉智坊AI创作API服务")
+    parser.add_argument("--host", default=os.environ.get("AI_SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=env_int("AI_SERVER_PORT", 8080))
+    parser.add_argument("--workers", type=int, default=env_int("AI_SERVER_WORKERS", multiprocessing.cpu_count()),
+                        help="工作进程数")
+    parser.add_argument("--threads", type=int, default=env_int("AI_SERVER_THREADS", 8),
+                        help="每个工作进程的线程数")
+    parser.add_argument("--keepalive", type=int, default=env_int("AI_SERVER_KEEPALIVE", 5),
+                        help="HTTP keep-alive 秒数")
+    parser.add_argument("--timeout", type=int, default=env_int("AI_SERVER_TIMEOUT", 60),
+                        help="单个请求的最长处理秒数（waitress 为连接无活动秒数）")
+    parser.add_argument("--graceful-timeout", type=int, default=env_int("AI_SERVER_GRACEFUL_TIMEOUT", 30),
+                        help="收到退出信号后等待处理中请求完成的秒数")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "waitress", "werkzeug", "uvicorn"],
+                        default=os.environ.get("AI_SERVER_BACKEND", "auto"))
+    return parser.parse_args(argv)
+
+
+def load_app():
+    """导入并初始化应用（加载品牌、模板与模型）"""
+    from enhanced_ai_creation_server import create_app
+    return create_app()
+
+
+def shutdown_app(app):
+    """停止后台任务线程池，等待处理中的任务完成"""
+    shutdown = app.extensions.get("ai_creation_shutdown")
+    if shutdown:
+        shutdown()
+
+
+def print_banner(app, options, backend):
+    state = app.extensions.get("ai_creation_state", {})
+    print("🚀 启动津脉智坊增强版AI创作API服务器...")
+    print("📋 AI模型已加载:", state.get("models", 0))
+    print("📋 品牌数据已加载:", state.get("brands", 0))
+    print("📋 创作模板已加载:", state.get("templates", 0))
+    print(f"⚙️  服务: {backend}  地址: {options.host}:{options.port}  "
+          f"进程: {options.workers}  线程: {options.threads}")
+    print_rate_limit(app)
+    ignored = UNSUPPORTED_OPTIONS.get(backend)
+    if ignored:
+        names = "、".join("--" + name.replace("_", "-") for name in ignored)
+        print(f"⚠️  {backend} 不支持 {names}，已忽略")
+    sys.stdout.flush()
+
+
+def print_rate_limit(app):
+    """限流按客户端IP计量，代理之后未配置可信代理层数时给出提醒
+
+    说明由 create_app 写入应用状态；服务模块以脚本运行时为 __main__，此处不能再导入它
+    """
+    rate_limit = app.extensions.get("ai_creation_state", {}).get("rate_limit")
+    if rate_limit:
+        summary, warn = rate_limit
+        print(("⚠️  " if warn else "🛡️  ") + summary)
+
+
+def run_gunicorn(app, options):
+    from gunicorn.app.base import BaseApplication
+
+    class CreationApplication(BaseApplication):
+        """在主进程预加载应用的gunicorn包装"""
+
+        def load_config(self):
+            settings = {
+                "bind": f"{options.host}:{options.port}",
+                "workers": options.workers,
+                "threads": options.threads,
+                "worker_class": "gthread",
+                "keepalive": options.keepalive,
+                "timeout": options.timeout,
+                "graceful_timeout": options.graceful_timeout,
+                "preload_app": True,
+                "worker_exit": lambda server, worker: shutdown_app(app),
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    # 冻结预加载对象，避免fork后垃圾回收触碰其引用计数导致页面复制
+    gc.collect()
+    gc.freeze()
+    CreationApplication().run()
+
+
+def run_waitress(app, options):
+    from waitress import serve
+    try:
+        serve(app, host=options.host, port=options.port, threads=options.threads,
+              channel_timeout=options.timeout)
+    finally:
+        shutdown_app(app)
+
+
+def run_werkzeug(app, options):
+    from werkzeug.serving import run_simple
+    try:
+        run_simple(options.host, options.port, app, threaded=True)
+    finally:
+        shutdown_app(app)
+
+
+def run_uvicorn(app, options):
+    import uvicorn
+    # 各工作进程由uvicorn单独导入应用（app 只用于输出启动信息），通过环境变量传递线程数
+    os.environ["AI_ASGI_THREADS"] = str(options.threads)
+    print(f"⚙️  服务: uvicorn (ASGI)  地址: {options.host}:{options.port}  "
+          f"进程: {options.workers}  线程: {options.threads}")
+    print_rate_limit(app)
+    sys.stdout.flush()
+    uvicorn.run("asgi_app:app", host=options.host, port=options.port, workers=options.workers,
+                timeout_keep_alive=options.keepalive, timeout_graceful_shutdown=options.graceful_timeout,
+                lifespan="on", log_level="warning")
+
+
+def select_backend(name):
+    """按可用性选择服务实现"""
+    if name != "auto":
+        return name
+    if os.name == "posix":
+        try:
+            import gunicorn  # noqa: F401
+            return "gunicorn"
+        except ImportError:
+            pass
+    try:
+        import waitress  # noqa: F401
+        return "waitress"
+    except ImportError:
+        return "werkzeug"
+
+
+def run(app=None, argv=None):
+    """启动服务"""
+    options = parse_args(argv)
+    backend = select_backend(options.server)
+    app = app or load_app()
+    if backend == "uvicorn":
+        run_uvicorn(app, options)
+        return
+    print_banner(app, options, backend)
+    if backend == "gunicorn":
+        run_gunicorn(app, options)
+    elif backend == "waitress":
+        run_waitress(app, options)
+    else:
+        run_werkzeug(app, options)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相同请求合并（singleflight）
+同一键的计算进行中时，后到的调用不再重复计算，而是等待并共享第一次调用的结果或异常
+"""
+
+import threading
+
+
+class _Call(object):
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """按键合并并发的相同计算，线程与协程两种用法
+
+    do(key, fn, ...)              在当前线程执行或等待进行中的同键计算
+    await do_async(key, fn, ...)  fn 为协程函数；计算在独立任务中运行，发起者断开不影响等待者
+    两者返回 (结果, 是否共享了他人的计算)。enabled 为False时总是直接执行
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        if not self.enabled:
+            return fn(*args, **kwargs), False
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        if not self.enabled:
+            return await fn(*args, **kwargs), False
+        import asyncio
+        # 协程版本只在事件循环线程中访问 _tasks，计数仍加锁以便其他线程读取统计
+        task = self._tasks.get(key)
+        shared = task is not None
+        with self._lock:
+            if shared:
+                self.coalesced += 1
+            else:
+                self.leaders += 1
+        if not shared:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish_task(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finish_task(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 所有等待者都已取消时避免“异常未读取”警告
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        with self._lock:
+            calls = self.leaders + self.coalesced
+            return {
+                "enabled": self.enabled,
+                "inFlight": len(self._calls) + len(self._tasks),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalescedRate": round(self.coalesced / calls, 4) if calls else 0.0,
+            }
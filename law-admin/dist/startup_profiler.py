@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动耗时记录
+按阶段记录服务模块导入与初始化的耗时，以及首次使用时才加载的组件耗时；
+总耗时超出预算时输出警告，无服务器部署每个新实例都要经历一次冷启动
+"""
+
+import sys
+import threading
+import time
+
+
+class _Phase(object):
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.profiler._clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, (self.profiler._clock() - self.start) * 1000.0)
+
+
+class StartupProfiler(object):
+    """冷启动阶段计时
+
+    创建时开始计时；mark(name) 记录自上一标记以来的耗时，finish() 结束启动计时并检查预算。
+    phase(name) 计时一段代码：启动完成前计入启动阶段，之后计入延迟加载（首次请求承担的耗时）
+
+    budget_ms  启动总耗时预算（毫秒），None表示不检查
+    """
+
+    def __init__(self, budget_ms=None, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started = clock()
+        self._last = self.started
+        self.budget_ms = budget_ms
+        self.total_ms = None
+        self.phases = []
+        self.deferred = []
+
+    def mark(self, name):
+        """记录自上一标记（或开始计时）以来的阶段耗时"""
+        now = self._clock()
+        with self._lock:
+            self.phases.append((name, (now - self._last) * 1000.0))
+            self._last = now
+
+    def phase(self, name):
+        """计时一段代码的上下文管理器"""
+        return _Phase(self, name)
+
+    def _record(self, name, elapsed_ms):
+        with self._lock:
+            if self.total_ms is None:
+                self.phases.append((name, elapsed_ms))
+                self._last = self._clock()
+            else:
+                self.deferred.append((name, elapsed_ms))
+
+    def finish(self, budget_ms=None):
+        """结束启动计时，返回是否在预算内；超出时写入标准错误"""
+        if budget_ms is not None:
+            self.budget_ms = budget_ms
+        with self._lock:
+            self.total_ms = (self._clock() - self.started) * 1000.0
+        within = self.within_budget
+        if not within:
+            slowest = max(self.phases, key=lambda item: item[1]) if self.phases else ("-", 0.0)
+            sys.stderr.write(
+                f"冷启动耗时 {self.total_ms:.1f} ms 超出预算 {self.budget_ms:.0f} ms，"
+                f"最慢阶段: {slowest[0]} {slowest[1]:.1f} ms\n"
+            )
+        return within
+
+    @property
+    def within_budget(self):
+        if not self.budget_ms or self.total_ms is None:
+            return True
+        return self.total_ms <= self.budget_ms
+
+    def report(self):
+        """各阶段耗时（毫秒），按记录顺序排列"""
+        with self._lock:
+            phases = list(self.phases)
+            deferred = list(self.deferred)
+        return {
+            "totalMs": round(self.total_ms, 3) if self.total_ms is not None else None,
+            "budgetMs": self.budget_ms,
+            "withinBudget": self.within_budget,
+            "phases": [{"name": name, "ms": round(ms, 3)} for name, ms in phases],
+            "deferred": [{"name": name, "ms": round(ms, 3)} for name, ms in deferred],
+        }
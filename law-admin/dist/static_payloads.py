@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预序列化静态响应
+运行期不变的数据只序列化一次，附带内容哈希与预压缩版本，按ETag返回304
+"""
+
+import gzip
+import hashlib
+import threading
+
+from flask import Response
+
+from json_provider import dumps_bytes
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+# 小于该字节数的响应不压缩
+MIN_COMPRESS_SIZE = 256
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match请求头是否包含该ETag（弱比较）"""
+    for tag in (if_none_match or "").split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag.strip('"') == etag:
+            return True
+    return False
+
+
+def accepts_encoding(accept_encoding, encoding):
+    """Accept-Encoding请求头是否接受该压缩格式（q=0表示拒绝）"""
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.partition(";")
+        if name.strip().lower() not in (encoding, "*"):
+            continue
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class StaticPayload(object):
+    """一份静态响应的原始字节、ETag及压缩版本"""
+
+    __slots__ = ("body", "etag", "variants", "mimetype")
+
+    def __init__(self, body, mimetype="application/json"):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=11)
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+
+    @classmethod
+    def from_object(cls, obj):
+        return cls(dumps_bytes(obj))
+
+    def response(self, request, max_age=300):
+        """按请求头生成响应：ETag匹配时返回304，否则选择客户端支持的压缩版本"""
+        headers = {
+            "ETag": f'W/"{self.etag}"',
+            "Cache-Control": f"public, max-age={int(max_age)}",
+            "Vary": "Accept-Encoding",
+        }
+        if request.if_none_match.contains_weak(self.etag):
+            return Response(status=304, headers=headers)
+
+        body = self.body
+        for encoding in ("br", "gzip"):
+            variant = self.variants.get(encoding)
+            if variant is not None and request.accept_encodings.quality(encoding) > 0:
+                body = variant
+                headers["Content-Encoding"] = encoding
+                break
+        return Response(body, mimetype=self.mimetype, headers=headers)
+
+    def negotiate(self, if_none_match=None, accept_encoding=None, max_age=300):
+        """不依赖Flask请求对象的内容协商（供ASGI服务使用），返回 (状态码, 响应头, 响应体)"""
+        headers = {
+            "ETag": f'W/"{self.etag}"',
+            "Cache-Control": f"public, max-age={int(max_age)}",
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(if_none_match, self.etag):
+            return 304, headers, b""
+
+        body = self.body
+        for encoding in ("br", "gzip"):
+            variant = self.variants.get(encoding)
+            if variant is not None and accepts_encoding(accept_encoding, encoding):
+                body = variant
+                headers["Content-Encoding"] = encoding
+                break
+        headers["Content-Type"] = self.mimetype
+        return 200, headers, body
+
+
+class StaticPayloadStore(object):
+    """按名称保存静态响应，数据版本变化时重新序列化"""
+
+    def __init__(self):
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, version, builder):
+        """返回名称对应的静态响应；version与缓存不一致时调用builder重新生成"""
+        entry = self._payloads.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        payload = StaticPayload.from_object(builder())
+        with self._lock:
+            self._payloads[name] = (version, payload)
+        return payload
+
+    def invalidate(self, name=None):
+        """清除指定或全部静态响应"""
+        with self._lock:
+            if name is None:
+                self._payloads.clear()
+            else:
+                self._payloads.pop(name, None)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+创作建议索引
+启动时按创作类型预计算提示词、相关主题与标签；提示词中的 {brand} 为品牌名占位符，由前端替换
+"""
+
+
+def _unique(items):
+    return list(dict.fromkeys(item for item in items if item))
+
+
+class SuggestionIndex(object):
+    """按创作类型预计算的创作建议
+
+    type_fields    {创作类型: 该类型模板引用的字段}
+    type_prompts   {创作类型: [提示词, ...]}，排在最前
+    field_prompts  {模板字段: 提示词}，模板引用了该字段时加入
+    type_topics    {创作类型: [相关主题, ...]}，同时生成"围绕主题"的提示词
+    type_tags      {创作类型: [标签, ...]}
+    brand_details  fn(brand_data, creation_type) -> (提示词, 相关主题, 标签)，指定品牌时的补充
+    """
+
+    MAX_PROMPTS = 8
+    TOPIC_PROMPT = "围绕「{topic}」介绍{{brand}}"
+
+    def __init__(self, type_fields, type_prompts, field_prompts, type_topics, type_tags, brand_details=None):
+        self.brand_details = brand_details
+        self._by_type = {}
+        for creation_type, fields in type_fields.items():
+            topics = list(type_topics.get(creation_type, ()))
+            prompts = _unique(
+                list(type_prompts.get(creation_type, ()))
+                + [field_prompts.get(field) for field in fields]
+                + [self.TOPIC_PROMPT.format(topic=topic) for topic in topics]
+            )
+            self._by_type[creation_type] = {
+                "creationType": creation_type,
+                "prompts": prompts[:self.MAX_PROMPTS],
+                "relatedTopics": topics,
+                "tags": list(type_tags.get(creation_type, ())),
+            }
+
+    def __contains__(self, creation_type):
+        return creation_type in self._by_type
+
+    @property
+    def creation_types(self):
+        return list(self._by_type)
+
+    def get(self, creation_type, brand_data=None):
+        """返回 {"creationType", "prompts", "relatedTopics", "tags"[, "brand"]}，未指定品牌时为共享的预计算结果"""
+        entry = self._by_type[creation_type]
+        if brand_data is None or self.brand_details is None:
+            return entry
+        prompts, topics, tags = self.brand_details(brand_data, creation_type)
+        return {
+            "creationType": creation_type,
+            "brand": brand_data.info() if hasattr(brand_data, "info") else {"id": brand_data["id"]},
+            "prompts": _unique(list(prompts) + entry["prompts"])[:self.MAX_PROMPTS],
+            "relatedTopics": _unique(list(topics) + entry["relatedTopics"]),
+            "tags": _unique(list(tags) + entry["tags"]),
+        }
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI创作异步任务队列
+提交后立即返回任务ID，由有界的后台线程池执行创作，结果按TTL过期清理
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# 任务状态
+STATUS_PENDING = "PENDING"
+STATUS_PROCESSING = "PROCESSING"
+STATUS_COMPLETED = "COMPLETED"
+STATUS_FAILED = "FAILED"
+
+
+class QueueFullError(Exception):
+    """任务队列已满"""
+
+
+class _TaskRecord(object):
+    """单个任务的状态记录"""
+
+    __slots__ = ("task_id", "status", "result", "error", "submit_time", "finish_time", "done")
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.status = STATUS_PENDING
+        self.result = None
+        self.error = None
+        self.submit_time = time.time()
+        self.finish_time = None
+        self.done = threading.Event()
+
+    def snapshot(self):
+        """导出任务状态"""
+        return {
+            "taskId": self.task_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitTime": self.submit_time,
+            "finishTime": self.finish_time,
+        }
+
+
+class CreationTaskQueue(object):
+    """有界的后台创作任务队列
+
+    max_workers   并发执行的任务数
+    max_pending   等待执行的任务上限，超出时拒绝提交（背压）
+    result_ttl    已完成任务结果的保留秒数
+    """
+
+    def __init__(self, max_workers=4, max_pending=64, result_ttl=600):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(0, int(max_pending))
+        self.result_ttl = float(result_ttl)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._tasks = {}
+        # 已完成任务按完成时间排序，便于按TTL从头部淘汰
+        self._finished = OrderedDict()
+        self._inflight = 0
+
+    @property
+    def capacity(self):
+        """队列可容纳的未完成任务总数"""
+        return self.max_workers + self.max_pending
+
+    def _get_executor(self):
+        # 延迟创建线程池，避免在fork前启动线程，也不在冷启动时导入concurrent.futures
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="ai-creation"
+            )
+        return self._executor
+
+    def submit(self, task_id, fn, *args, **kwargs):
+        """提交任务，队列已满时抛出QueueFullError"""
+        with self._lock:
+            self._evict_expired_locked()
+            if self._inflight >= self.capacity:
+                raise QueueFullError("任务队列已满")
+            record = _TaskRecord(task_id)
+            self._tasks[task_id] = record
+            self._inflight += 1
+            executor = self._get_executor()
+
+        try:
+            executor.submit(self._run, record, fn, args, kwargs)
+        except RuntimeError:
+            # 线程池已关闭
+            with self._lock:
+                self._tasks.pop(task_id, None)
+                self._inflight -= 1
+            raise QueueFullError("任务队列已关闭")
+        return record.snapshot()
+
+    def _run(self, record, fn, args, kwargs):
+        record.status = STATUS_PROCESSING
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            record.error = str(e)
+            record.status = STATUS_FAILED
+        else:
+            record.result = result
+            record.status = STATUS_COMPLETED
+        finally:
+            record.finish_time = time.time()
+            with self._lock:
+                self._inflight -= 1
+                self._finished[record.task_id] = record.finish_time
+            record.done.set()
+
+    def get(self, task_id):
+        """查询任务状态，不存在或已过期时返回None"""
+        with self._lock:
+            self._evict_expired_locked()
+            record = self._tasks.get(task_id)
+        return record.snapshot() if record else None
+
+    def wait(self, task_id, timeout):
+        """长轮询：等待任务完成或超时后返回任务状态"""
+        with self._lock:
+            record = self._tasks.get(task_id)
+        if record is None:
+            return None
+        if timeout > 0:
+            record.done.wait(timeout)
+        return self.get(task_id)
+
+    def _evict_expired_locked(self):
+        deadline = time.time() - self.result_ttl
+        while self._finished:
+            task_id, finish_time = next(iter(self._finished.items()))
+            if finish_time > deadline:
+                break
+            self._finished.popitem(last=False)
+            self._tasks.pop(task_id, None)
+
+    def stats(self):
+        """队列统计信息"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "maxPending": self.max_pending,
+                "inflight": self._inflight,
+                "stored": len(self._tasks),
+                "resultTtl": self.result_ttl,
+            }
+
+    def shutdown(self, wait=True):
+        """关闭线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预编译模板引擎
+创作模板在某类型首次使用时解析为渲染器，渲染时只计算模板实际引用的字段
+"""
+
+import random
+import threading
+from datetime import datetime
+from string import Formatter
+
+_formatter = Formatter()
+
+
+class CompiledTemplate(object):
+    """预解析的模板：字面量与占位字段交替排列"""
+
+    __slots__ = ("source", "parts", "fields")
+
+    def __init__(self, source):
+        self.source = source
+        parts = []
+        fields = []
+        for literal, field_name, format_spec, conversion in _formatter.parse(source):
+            if literal:
+                parts.append((literal, None, None, None))
+            if field_name is not None:
+                parts.append((None, field_name, format_spec or "", conversion))
+                if field_name not in fields:
+                    fields.append(field_name)
+        self.parts = tuple(parts)
+        self.fields = tuple(fields)
+
+    def render(self, values):
+        """用已解析的字段值渲染模板"""
+        out = []
+        for literal, field_name, format_spec, conversion in self.parts:
+            if field_name is None:
+                out.append(literal)
+                continue
+            value = values[field_name]
+            if conversion:
+                value = _formatter.convert_field(value, conversion)
+            out.append(format(value, format_spec) if format_spec else str(value))
+        return "".join(out)
+
+
+class TemplateEngine(object):
+    """按创作类型管理预编译模板
+
+    templates        {创作类型: {"templates": [...], ...}}
+    context_builder  brand_data -> 品牌静态字段字典，结果按品牌缓存
+    choice_fields    {字段名: 候选值列表}，渲染时随机选取
+    lazy_fields      {字段名: fn(brand_data, creation_type, custom_prompt)}，仅在模板引用时计算
+
+    各类型的模板在首次渲染或查询字段时才解析，冷启动不承担解析开销
+    """
+
+    def __init__(self, templates, context_builder, choice_fields=None, lazy_fields=None):
+        self.context_builder = context_builder
+        self.choice_fields = dict(choice_fields or {})
+        self.lazy_fields = dict(lazy_fields or {})
+        self._sources = {
+            creation_type: tuple(spec.get("templates", []))
+            for creation_type, spec in templates.items()
+        }
+        self.compiled = {}
+        self._brand_cache = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, creation_type):
+        return bool(self._sources.get(creation_type))
+
+    @property
+    def creation_types(self):
+        return list(self._sources)
+
+    def templates(self, creation_type):
+        """该类型的预解析模板，首次调用时解析；类型不存在时抛出KeyError"""
+        compiled = self.compiled.get(creation_type)
+        if compiled is None:
+            compiled = tuple(CompiledTemplate(t) for t in self._sources[creation_type])
+            self.compiled[creation_type] = compiled
+        return compiled
+
+    def fields(self, creation_type):
+        """该类型模板引用的全部字段，按出现顺序"""
+        return [field for template in self.templates(creation_type) for field in template.fields]
+
+    def brand_context(self, brand_data):
+        """获取品牌静态字段，按品牌ID缓存；品牌数据替换或跨年时重新计算"""
+        key = brand_data.get("id")
+        year = datetime.now().year
+        cached = self._brand_cache.get(key)
+        if cached is not None and cached[0] is brand_data and cached[1] == year:
+            return cached[2]
+        context = self.context_builder(brand_data)
+        with self._lock:
+            self._brand_cache[key] = (brand_data, year, context)
+        return context
+
+    def render(self, brand_data, creation_type, custom_prompt="", brand_context=None, rng=random):
+        """随机选取一个模板并渲染"""
+        template = rng.choice(self.templates(creation_type))
+        static = brand_context if brand_context is not None else self.brand_context(brand_data)
+        values = {}
+        for field in template.fields:
+            if field in static:
+                values[field] = static[field]
+            elif field in self.choice_fields:
+                values[field] = rng.choice(self.choice_fields[field])
+            elif field in self.lazy_fields:
+                values[field] = self.lazy_fields[field](brand_data, creation_type, custom_prompt)
+            else:
+                raise KeyError(field)
+        return template.render(values)
+
+    def clear_cache(self):
+        """清空品牌字段缓存"""
+        with self._lock:
+            self._brand_cache.clear()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""创作历史：分页游标与全文检索"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from creation_store import CreationStore, encode_cursor
+from models import Brand, CreationResult
+
+BRAND = Brand.from_dict({"id": 1, "name": "泥人张", "category": "传统手工艺", "status": "active"})
+
+
+def make_result(index, create_time, title="泥人张的传奇故事"):
+    return CreationResult.create(
+        task_id=f"task_{index}", title=title, content=f"第{index}篇：彩塑技艺代代相传。",
+        summary="", creation_type="STORY", ai_model="text-generator-v2", confidence=0.9,
+        tags=[], keywords=["彩塑"], reading_time=1, word_count=12,
+        characteristics={"style": "", "tone": "", "complexity": "", "originality": ""},
+        suggestions=[], related_topics=[], brand=BRAND, quality_score=0.8, originality_score=1.0,
+        fingerprint=None, create_time=create_time
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CreationStore(str(tmp_path / "creations.db"), flush_interval=0.01)
+    base = datetime(2026, 1, 1)
+    # task_2 与 task_3 创建时间相同，按rowid区分先后
+    times = [base, base + timedelta(seconds=1), base + timedelta(seconds=2), base + timedelta(seconds=2),
+             base + timedelta(seconds=3)]
+    for index, create_time in enumerate(times):
+        store.save(make_result(index, create_time))
+    store.flush()
+    yield store
+    store.close()
+
+
+def page_through(fetch):
+    seen = []
+    cursor = None
+    while True:
+        items, cursor = fetch(cursor)
+        seen.extend(item["taskId"] for item in items)
+        if cursor is None:
+            return seen
+
+
+def test_list_cursor_visits_every_result_once_newest_first(store):
+    seen = page_through(lambda cursor: store.list(cursor, limit=2))
+    assert seen == ["task_4", "task_3", "task_2", "task_1", "task_0"]
+
+
+def test_search_cursor_visits_every_match_once(store):
+    store.save(make_result(9, datetime(2026, 1, 2), title="津门风物"))
+    store.flush()
+    seen = page_through(lambda cursor: store.search("泥人", cursor, limit=2))
+    assert sorted(seen) == ["task_0", "task_1", "task_2", "task_3", "task_4"]
+    assert [item["taskId"] for item in store.search("风物")[0]] == ["task_9"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!", encode_cursor({"a": 1}), encode_cursor([1]), encode_cursor([1, 2, 3]),
+    encode_cursor([[1], {"a": 1}]), encode_cursor([True, 1]),
+])
+def test_list_rejects_malformed_cursor(store, cursor):
+    with pytest.raises(ValueError):
+        store.list(cursor)
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor([-1]), encode_cursor([1.5]), encode_cursor([1, 2])])
+def test_search_rejects_malformed_cursor(store, cursor):
+    with pytest.raises(ValueError):
+        store.search("泥人", cursor)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""令牌桶限速、并发上限与客户端标识"""
+
+import pytest
+
+import rate_limiter
+from rate_limiter import (MemoryRateLimitStore, RateLimit, RateLimiter, RateLimitExceeded, SQLiteRateLimitStore,
+                          api_key_digest, client_key)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    if request.param == "memory":
+        return MemoryRateLimitStore()
+    return SQLiteRateLimitStore(str(tmp_path / "limits.db"))
+
+
+def test_bucket_refills_at_configured_rate(store, clock):
+    limiter = RateLimiter(store, RateLimit(rate=0.5, burst=2, concurrency=10))
+    limiter.admit("ip:1", None).release()
+    limiter.admit("ip:1", None).release()
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.admit("ip:1", None)
+    assert exc.value.reason == rate_limiter.REASON_RATE
+    assert exc.value.retry_after == pytest.approx(2.0)
+    assert exc.value.retry_after_header == "2"
+
+    # 其他客户端不受影响
+    limiter.admit("ip:2", None).release()
+
+    clock.advance(1.0)
+    with pytest.raises(RateLimitExceeded):
+        limiter.admit("ip:1", None)
+    clock.advance(1.0)
+    limiter.admit("ip:1", None).release()
+
+
+def test_concurrency_slots_are_released(store):
+    limiter = RateLimiter(store, RateLimit(rate=100, burst=100, concurrency=1))
+    admission = limiter.admit("ip:1", None)
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.admit("ip:1", None)
+    assert exc.value.reason == rate_limiter.REASON_CONCURRENCY
+    admission.release()
+    admission.release()
+    limiter.admit("ip:1", None).release()
+
+
+def test_model_limits_use_their_own_bucket(store):
+    limiter = RateLimiter(store, RateLimit(rate=0.1, burst=1, concurrency=10),
+                          {"cultural-ai": RateLimit(rate=0.1, burst=1, concurrency=10)})
+    limiter.admit("ip:1", "text-generator-v2").release()
+    limiter.admit("ip:1", "cultural-ai").release()
+    with pytest.raises(RateLimitExceeded):
+        limiter.admit("ip:1", "story-teller")
+
+
+class _Request(object):
+    def __init__(self, headers, remote_addr="10.0.0.1"):
+        self.headers = headers
+        self.remote_addr = remote_addr
+
+
+def test_client_key_only_meters_configured_api_keys():
+    api_keys = frozenset([api_key_digest("good")])
+    assert client_key(_Request({"X-API-Key": "good"}), api_keys) == "key:" + api_key_digest("good")
+    assert client_key(_Request({"Authorization": "Bearer good"}), api_keys) == "key:" + api_key_digest("good")
+    assert client_key(_Request({"X-API-Key": "unknown"}), api_keys) == "ip:10.0.0.1"
+    assert client_key(_Request({"X-API-Key": "good"})) == "ip:10.0.0.1"
+
+
+def test_create_endpoint_returns_429_with_retry_after(monkeypatch):
+    import enhanced_ai_creation_server as server
+
+    limiter = RateLimiter(MemoryRateLimitStore(), RateLimit(rate=0.25, burst=1, concurrency=4))
+    monkeypatch.setattr(server, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(server, "rate_limiter", limiter)
+    client = server.app.test_client()
+
+    assert client.post("/api/ai/creations", json={"brandId": 1}).status_code == 200
+    response = client.post("/api/ai/creations", json={"brandId": 1})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.get_json()["error"] == "请求过多"
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""相同请求合并：并发调用只计算一次"""
+
+import asyncio
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.001)
+
+
+def run_concurrently(flights, key, fn, callers):
+    """先启动一个调用并等到计算开始，其余调用加入后再让计算结束"""
+    results = [None] * callers
+    errors = [None] * callers
+
+    def call(index):
+        try:
+            results[index] = flights.do(key, fn)
+        except Exception as e:
+            errors[index] = e
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    threads[0].start()
+    wait_until(lambda: flights.stats()["inFlight"] == 1)
+    for thread in threads[1:]:
+        thread.start()
+    wait_until(lambda: flights.coalesced == callers - 1)
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_computation():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"content": "结果"}
+    threads, results, errors = run_concurrently(flights, "key", compute, 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert errors == [None] * 4
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert all(result is results[0][0] for result, _ in results)
+    assert flights.stats()["inFlight"] == 0
+
+
+def test_error_is_raised_to_every_waiter():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise RuntimeError("生成失败")
+    threads, results, errors = run_concurrently(flights, "key", compute, 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert [str(e) for e in errors] == ["生成失败"] * 3
+    # 失败后不保留，下一次调用重新计算
+    assert flights.do("key", lambda: "ok") == ("ok", False)
+
+
+def test_disabled_flights_always_compute():
+    flights = SingleFlight(enabled=False)
+    assert flights.do("key", lambda: 1) == (1, False)
+    assert flights.stats()["leaders"] == 0
+
+
+def test_async_callers_share_one_task():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "结果"
+
+    async def main():
+        return await asyncio.gather(*[flights.do_async("key", compute) for _ in range(5)])
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["结果"] * 5
+    assert sum(shared for _, shared in results) == 4
+
+
+def test_coalesced_creations_generate_once(monkeypatch):
+    import enhanced_ai_creation_server as server
+
+    monkeypatch.setattr(server.creation_flights, "enabled", True)
+    original = server.prepare_ai_creation
+    calls = []
+
+    def prepare(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.3)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(server, "prepare_ai_creation", prepare)
+
+    brand = server.brand_repository.get(1)
+    barrier = threading.Barrier(4)
+    results = []
+
+    def create():
+        barrier.wait()
+        results.append(server.process_ai_creation(server.generate_task_id(), brand, "STORY", "text-generator-v2", ""))
+    threads = [threading.Thread(target=create) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({result.content for result in results}) == 1
+    # 共享结果的请求保留各自的任务ID
+    assert len({result.task_id for result in results}) == 4
+
+
+def test_unique_creations_are_not_coalesced():
+    import enhanced_ai_creation_server as server
+
+    brand = server.brand_repository.get(1)
+    args = (brand, "STORY", "text-generator-v2", "", None, None, None, False)
+    assert server.creation_flight_key(*args, False) is not None
+    assert server.creation_flight_key(*args, True) is None
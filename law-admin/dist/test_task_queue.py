@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""异步任务队列：背压与结果过期"""
+
+import threading
+
+import pytest
+
+import task_queue
+from task_queue import CreationTaskQueue, QueueFullError, STATUS_COMPLETED, STATUS_FAILED
+
+
+def test_submit_rejects_when_workers_and_pending_are_full():
+    queue = CreationTaskQueue(max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        queue.submit("a", release.wait, 5)
+        queue.submit("b", release.wait, 5)
+        with pytest.raises(QueueFullError):
+            queue.submit("c", release.wait, 5)
+        assert queue.get("c") is None
+
+        release.set()
+        assert queue.wait("b", 5)["status"] == STATUS_COMPLETED
+        queue.submit("d", lambda: "ok")
+        assert queue.wait("d", 5)["result"] == "ok"
+    finally:
+        release.set()
+        queue.shutdown()
+
+
+def test_failed_task_keeps_error_message():
+    queue = CreationTaskQueue(max_workers=1, max_pending=0)
+
+    def fail():
+        raise RuntimeError("生成失败")
+    try:
+        queue.submit("a", fail)
+        task = queue.wait("a", 5)
+        assert task["status"] == STATUS_FAILED
+        assert task["error"] == "生成失败"
+    finally:
+        queue.shutdown()
+
+
+def test_finished_results_expire_after_ttl(monkeypatch, clock):
+    monkeypatch.setattr(task_queue, "time", clock)
+    queue = CreationTaskQueue(max_workers=1, max_pending=0, result_ttl=60)
+    try:
+        queue.submit("a", lambda: "ok")
+        assert queue.wait("a", 5)["status"] == STATUS_COMPLETED
+
+        clock.advance(59)
+        assert queue.get("a")["result"] == "ok"
+        clock.advance(2)
+        assert queue.get("a") is None
+        assert queue.stats()["stored"] == 0
+    finally:
+        queue.shutdown()
+
+
+def test_create_endpoint_returns_429_when_queue_is_full(monkeypatch):
+    import enhanced_ai_creation_server as server
+
+    def full(*args, **kwargs):
+        raise QueueFullError("任务队列已满")
+    monkeypatch.setattr(server, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(server.creation_queue, "submit", full)
+    response = server.app.test_client().post("/api/ai/creations?async=1", json={"brandId": 1})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert response.get_json()["error"] == "创作任务过多"